@@ -1,7 +1,7 @@
-from flask import Flask, current_app
+from flask import Flask
 from flask_login import current_user
 from .extensions import db, migrate, login_manager
-from .models import User, CompanionAccess
+from .models import configure_sqlite_engine
 
 # Import blueprints
 from .view.auth import auth as auth_blueprint
@@ -11,6 +11,7 @@ from .view.pages import pages as pages_blueprint
 from .view.report import report as report_blueprint
 from .view.connection import connection as connection_blueprint
 from .view.companion import companion as companion_blueprint
+from .view.events import events as events_blueprint
 
 # Import services
 from .services.auth_service import AuthService
@@ -19,6 +20,20 @@ from .services.medication_service import MedicationService
 # from .services.report_service import ReportService
 from .services.connection_service import ConnectionService
 from .services.companion_service import CompanionService
+from .services.import_service import ImportService
+from .services.report_job_service import ReportJobService
+from .services.badge_service import badge_counter
+from .services.access_service import access_cache
+from .services.identity_service import identity_cache
+from .services.password_service import password_hasher
+from .services.query_stats_service import query_monitor
+from .services.profiler_service import sampling_profiler
+from .services.chart_service import ChartService
+from .services.analytics_service import AnalyticsService
+from .services.alert_service import AlertThresholdService, threshold_engine
+from .services.outbox_service import NotificationOutboxService, load_channels
+from .services.event_service import event_broker
+from .services.reminder_service import reminder_scheduler
 
 from config import get_config
 
@@ -33,6 +48,15 @@ def create_app(config_name=None):
     db.init_app(app)
     login_manager.init_app(app)
     migrate.init_app(app, db)
+    badge_counter.init_app(app)
+    access_cache.init_app(app)
+    identity_cache.init_app(app)
+    password_hasher.init_app(app)
+    query_monitor.init_app(app)
+    sampling_profiler.init_app(app)
+    threshold_engine.init_app(app)
+    event_broker.init_app(app)
+    reminder_scheduler.init_app(app)
 
     # Set up login manager
     login_manager.login_view = 'auth.login'
@@ -41,12 +65,44 @@ def create_app(config_name=None):
     # Initialize services
     # Store services in app context for access in routes
     with app.app_context():
+        if app.config['SQLITE_TUNING']:
+            configure_sqlite_engine(db.engine, app.config['SQLITE_PRAGMAS'])
         app.auth_service = AuthService(db)
-        app.health_service = HealthService(db)
+        app.health_service = HealthService(db, use_outbox=app.config['NOTIFICATION_OUTBOX_ENABLED'])
         app.medication_service = MedicationService(db)
         # app.report_service = ReportService(db)
         app.connection_service = ConnectionService(db)
         app.companion_service = CompanionService(db)
+        app.chart_service = ChartService(db)
+        app.analytics_service = AnalyticsService(db)
+        app.alert_threshold_service = AlertThresholdService(db)
+        app.outbox_service = NotificationOutboxService(
+            db,
+            app.health_service,
+            channels=load_channels(app.config['NOTIFICATION_CHANNELS']),
+            batch_size=app.config['NOTIFICATION_BATCH_SIZE'],
+            max_attempts=app.config['NOTIFICATION_MAX_ATTEMPTS'],
+            backoff_seconds=app.config['NOTIFICATION_BACKOFF_SECONDS']
+        )
+        app.import_service = ImportService(
+            db,
+            app.health_service,
+            batch_size=app.config['IMPORT_BATCH_SIZE'],
+            max_rows=app.config['IMPORT_MAX_ROWS']
+        )
+        app.report_job_service = ReportJobService(
+            db,
+            app,
+            job_dir=app.config['REPORT_JOB_DIR'],
+            ttl_seconds=app.config['REPORT_JOB_TTL'],
+            max_workers=app.config['REPORT_JOB_WORKERS']
+        )
+
+    # Queued alerts are delivered by `manage.py notification-worker`, or by this process when opted in
+    if app.config['NOTIFICATION_OUTBOX_ENABLED'] and app.config['NOTIFICATION_WORKER_IN_PROCESS']:
+        @app.before_request
+        def drain_notification_outbox():
+            app.outbox_service.ensure_running(app, app.config['NOTIFICATION_WORKER_INTERVAL'])
 
     # Register blueprints
     app.register_blueprint(auth_blueprint)
@@ -56,18 +112,14 @@ def create_app(config_name=None):
     app.register_blueprint(report_blueprint)
     app.register_blueprint(connection_blueprint)
     app.register_blueprint(companion_blueprint)
+    app.register_blueprint(events_blueprint)
 
     @app.context_processor
     def utility_processor():
         def get_pending_connections_count():
             if not current_user.is_authenticated or current_user.user_type != "PATIENT":
                 return 0
-            return CompanionAccess.query.filter_by(
-                patient_id=current_user.id,
-                medication_access="NONE",
-                glucose_access="NONE",
-                blood_pressure_access="NONE"
-            ).count()
+            return badge_counter.pending_connections(current_user.id)
         return dict(pending_connections_count=get_pending_connections_count())
     
     @app.context_processor
@@ -77,13 +129,13 @@ def create_app(config_name=None):
         """
         notifications_count = 0
         if current_user.is_authenticated and current_user.user_type == "COMPANION":
-            success, notifications = current_app.companion_service.get_notifications(current_user.id)
-            notifications_count = len(notifications) if success else 0
+            notifications_count = badge_counter.unread_notifications(current_user.id)
         return {'notifications_count': notifications_count}
 
     # Configure Flask-Login
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # A cached identity; the full User is only loaded if a view needs more than id/username/user_type
+        return identity_cache.get(int(user_id))
 
     return app
\ No newline at end of file
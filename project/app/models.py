@@ -21,6 +21,21 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.close()
 
+def configure_sqlite_engine(engine, pragmas):
+    """
+    Apply the configured PRAGMA profile to every new connection of a SQLite engine.
+    Other databases are left untouched.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_profile(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
 # engine = create_engine('sqlite:///database.db', echo=True)
 # db_session = scoped_session(sessionmaker(autocommit=False,
 #                                          autoflush=False,
@@ -61,6 +76,8 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True)
     password_hash = db.Column(db.String(255))
     user_type = db.Column(db.String(20), nullable=False)
+    # Bumped whenever the row changes, so cached identities can tell they are stale
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     medications = db.relationship('Medication', backref='user', lazy=True)
     glucose_records = db.relationship('GlucoseRecord', backref='user', lazy='dynamic')
     blood_pressure_records = db.relationship('BloodPressureRecord', backref='user', lazy='dynamic')
@@ -88,6 +105,14 @@ class User(UserMixin, db.Model):
             self.user_type = str(value).upper()
 
 
+def bump_user_version(mapper, connection, target):
+    """Advance the version stamp on every flush that changes a user's columns."""
+    if db.session.is_modified(target, include_collections=False):
+        target.version = (target.version or 0) + 1
+
+event.listen(User, 'before_update', bump_user_version)
+
+
 class CompanionAccess(db.Model):
     __tablename__ = 'companion_access'
     
@@ -160,6 +185,10 @@ class MedicationLog(db.Model):
     # Remove the duplicate relationship definitions
     user = db.relationship('User', backref='medication_logs', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_medication_logs_medication_taken_at', 'medication_id', 'taken_at'),
+    )
+
 class Notification(db.Model):
     __tablename__ = 'notifications'
     
@@ -174,10 +203,73 @@ class Notification(db.Model):
     def __repr__(self):
         return f'<Notification {self.message} to User {self.user_id}>'
     
+class NotificationOutbox(db.Model):
+    """
+    A companion alert waiting for delivery. Written in the same transaction
+    as the reading that triggered it and drained by the notification worker.
+    """
+    __tablename__ = 'notification_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    patient_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    data_type = db.Column(db.String(30), nullable=False)
+    message = db.Column(db.String(255), nullable=False)
+    # pending -> processing -> done, or back to pending with a later next_attempt_at until failed
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = db.Column(db.String(32))
+    # Set once the in-app Notification rows exist, so retries only redo external channels
+    notified_at = db.Column(db.DateTime)
+    processed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_notification_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} {self.status}>'
+
+class AlertThreshold(db.Model):
+    """A patient's personal alert target for one metric; missing metrics use the defaults."""
+    __tablename__ = 'alert_thresholds'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    metric = db.Column(db.String(30), nullable=False)
+    severe_low = db.Column(db.Integer, nullable=False)
+    low = db.Column(db.Integer, nullable=False)
+    high = db.Column(db.Integer, nullable=False)
+    severe_high = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'metric', name='uix_alert_threshold_user_metric'),
+    )
+
+    def __repr__(self):
+        return f'<AlertThreshold {self.metric} for User {self.user_id}>'
+
 class GlucoseType(Enum):
     FASTING = 'FASTING'
     POSTPRANDIAL = 'POSTPRANDIAL'
 
+RECORD_DATE_FORMAT = '%Y-%m-%d'
+RECORD_TIME_FORMATS = ('%H:%M', '%H:%M:%S')
+
+def parse_recorded_at(date_str, time_str):
+    """
+    Combine the legacy date/time strings of a health record into a datetime.
+    Raises ValueError if either part is malformed.
+    """
+    for time_format in RECORD_TIME_FORMATS:
+        try:
+            return datetime.strptime(f"{date_str} {time_str}", f"{RECORD_DATE_FORMAT} {time_format}")
+        except (TypeError, ValueError):
+            continue
+    raise ValueError(f"Invalid date/time: {date_str} {time_str}")
+
 class GlucoseRecord(db.Model):
     __tablename__ = 'glucose_records'
     
@@ -186,10 +278,13 @@ class GlucoseRecord(db.Model):
     glucose_type = db.Column(SQLAlchemyEnum(GlucoseType, native_enum=False), nullable=False)
     date = db.Column(db.String(10), nullable=False)
     time = db.Column(db.String(5), nullable=False)
+    # Native timestamp derived from date/time; used for ordering and range queries
+    recorded_at = db.Column(db.DateTime, nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     __table_args__ = (
         CheckConstraint('glucose_level >= 50 AND glucose_level <= 350', name='check_glucose_level'),
+        db.Index('ix_glucose_records_user_recorded_at', 'user_id', 'recorded_at'),
         # Optional: Unique constraint to prevent duplicate records
         # db.UniqueConstraint('user_id', 'date', 'time', name='uix_user_date_time_glucose')
     )
@@ -205,16 +300,88 @@ class BloodPressureRecord(db.Model):
     diastolic = db.Column(db.Integer, nullable=False)
     date = db.Column(db.String(10), nullable=False)
     time = db.Column(db.String(5), nullable=False)
+    # Native timestamp derived from date/time; used for ordering and range queries
+    recorded_at = db.Column(db.DateTime, nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
     __table_args__ = (
         CheckConstraint('systolic >= 50 AND systolic <= 300', name='check_systolic'),
         CheckConstraint('diastolic >= 30 AND diastolic <= 200', name='check_diastolic'),
+        db.Index('ix_blood_pressure_records_user_recorded_at', 'user_id', 'recorded_at'),
         # Optional: Unique constraint to prevent duplicate records
         # db.UniqueConstraint('user_id', 'date', 'time', name='uix_user_date_time')
     )
     
     def __repr__(self):
         return f'<BloodPressureRecord {self.systolic}/{self.diastolic}>'
+
+def sync_recorded_at(mapper, connection, target):
+    """Keep recorded_at in step with the date/time strings on every flush."""
+    target.recorded_at = parse_recorded_at(target.date, target.time)
+
+for _record_model in (GlucoseRecord, BloodPressureRecord):
+    event.listen(_record_model, 'before_insert', sync_recorded_at)
+    event.listen(_record_model, 'before_update', sync_recorded_at)
+
+class GlucoseDailyRollup(db.Model):
+    """Per-user, per-day glucose aggregates for one GlucoseType."""
+    __tablename__ = 'glucose_daily_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    glucose_type = db.Column(SQLAlchemyEnum(GlucoseType, native_enum=False), nullable=False)
+    reading_count = db.Column(db.Integer, nullable=False)
+    min_level = db.Column(db.Integer, nullable=False)
+    max_level = db.Column(db.Integer, nullable=False)
+    sum_level = db.Column(db.Integer, nullable=False)
+    # Time-in-range buckets (mg/dL): <54, 54-69, 70-180, 181-250, >250
+    very_low_count = db.Column(db.Integer, nullable=False, default=0)
+    low_count = db.Column(db.Integer, nullable=False, default=0)
+    in_range_count = db.Column(db.Integer, nullable=False, default=0)
+    high_count = db.Column(db.Integer, nullable=False, default=0)
+    very_high_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'glucose_type', name='uix_glucose_rollup_user_day_type'),
+    )
+
+    @property
+    def mean_level(self):
+        return self.sum_level / self.reading_count if self.reading_count else None
+
+    def __repr__(self):
+        return f'<GlucoseDailyRollup {self.day} {self.glucose_type.value} n={self.reading_count}>'
+
+class BloodPressureDailyRollup(db.Model):
+    """Per-user, per-day systolic and diastolic aggregates."""
+    __tablename__ = 'blood_pressure_daily_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    reading_count = db.Column(db.Integer, nullable=False)
+    min_systolic = db.Column(db.Integer, nullable=False)
+    max_systolic = db.Column(db.Integer, nullable=False)
+    sum_systolic = db.Column(db.Integer, nullable=False)
+    min_diastolic = db.Column(db.Integer, nullable=False)
+    max_diastolic = db.Column(db.Integer, nullable=False)
+    sum_diastolic = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uix_blood_pressure_rollup_user_day'),
+    )
+
+    @property
+    def mean_systolic(self):
+        return self.sum_systolic / self.reading_count if self.reading_count else None
+
+    @property
+    def mean_diastolic(self):
+        return self.sum_diastolic / self.reading_count if self.reading_count else None
+
+    def __repr__(self):
+        return f'<BloodPressureDailyRollup {self.day} n={self.reading_count}>'
+
 # # Create tables.
 # Base.metadata.create_all(bind=engine)
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, Optional, Tuple
+from flask import g, has_request_context
+from sqlalchemy.orm import make_transient_to_detached
+from app.models import CompanionAccess
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 10000
+
+# Categories a companion can be granted, by CompanionAccess column
+ACCESS_COLUMNS = {
+    'medication': 'medication_access',
+    'glucose': 'glucose_access',
+    'blood_pressure': 'blood_pressure_access',
+}
+READ_LEVELS = ('VIEW', 'EDIT')
+
+_GRANT_FIELDS = ('id', 'patient_id', 'companion_id', 'medication_access',
+                 'glucose_access', 'blood_pressure_access', 'export_access')
+
+
+class AccessGrant(namedtuple('AccessGrant', _GRANT_FIELDS)):
+    """A companion's effective access to one patient, for every category at once."""
+    __slots__ = ()
+
+    def level(self, category: str) -> str:
+        return getattr(self, ACCESS_COLUMNS[category])
+
+    def allows(self, category: str, levels: Tuple[str, ...] = READ_LEVELS) -> bool:
+        return self.level(category) in levels
+
+    def attach(self, session) -> CompanionAccess:
+        """The CompanionAccess row these values came from, without querying for it."""
+        access = CompanionAccess(**self._asdict())
+        make_transient_to_detached(access)
+        return session.merge(access, load=False)
+
+# Cached in place of a grant when the companion has no link to the patient
+_NO_LINK = object()
+
+
+class AccessCache:
+    """
+    Companion access per (patient, companion), resolved in one lookup for
+    all categories. Grants are memoized for the rest of the request and in
+    a bounded LRU shared across requests. ConnectionService and
+    CompanionManager invalidate a pair when they change it; the TTL bounds
+    how long other processes keep using a grant that was changed elsewhere.
+    """
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._grants: "OrderedDict[Tuple[int, int], Tuple[object, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('ACCESS_CACHE_TTL', DEFAULT_TTL_SECONDS)
+        self.max_entries = app.config.get('ACCESS_CACHE_SIZE', DEFAULT_MAX_ENTRIES)
+        self.clear()
+
+    def get(self, patient_id: int, companion_id: int) -> Optional[AccessGrant]:
+        """The companion's grant for the patient, or None if they are not linked."""
+        key = (patient_id, companion_id)
+        memo = g.setdefault('_companion_access', {}) if has_request_context() else None
+        if memo is not None and key in memo:
+            return memo[key]
+
+        grant = self._cached(key)
+        if grant is None:
+            row = CompanionAccess.query.filter_by(
+                patient_id=patient_id,
+                companion_id=companion_id
+            ).with_entities(*(getattr(CompanionAccess, field) for field in _GRANT_FIELDS)).first()
+            grant = AccessGrant(*row) if row else _NO_LINK
+            self._store(key, grant)
+
+        grant = None if grant is _NO_LINK else grant
+        if memo is not None:
+            memo[key] = grant
+        return grant
+
+    def allows(self, patient_id: int, companion_id: int, category: str,
+               levels: Tuple[str, ...] = READ_LEVELS) -> bool:
+        grant = self.get(patient_id, companion_id)
+        return grant is not None and grant.allows(category, levels)
+
+    def invalidate(self, patient_id: int, companion_id: int):
+        key = (patient_id, companion_id)
+        with self._lock:
+            self._grants.pop(key, None)
+        if has_request_context():
+            g.get('_companion_access', {}).pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._grants.clear()
+
+    def _cached(self, key):
+        now = self.clock()
+        with self._lock:
+            cached = self._grants.get(key)
+            if cached is None:
+                return None
+            if cached[1] <= now:
+                del self._grants[key]
+                return None
+            self._grants.move_to_end(key)
+            return cached[0]
+
+    def _store(self, key, grant):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._grants[key] = (grant, self.clock() + self.ttl)
+            self._grants.move_to_end(key)
+            while len(self._grants) > self.max_entries:
+                self._grants.popitem(last=False)
+
+
+# Shared so connection changes invalidate the grants every service checks
+access_cache = AccessCache()
@@ -0,0 +1,192 @@
+import math
+import threading
+import time
+from bisect import bisect_right
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+from app.models import AlertThreshold
+
+GLUCOSE_ALERT_TYPES = ('fasting_glucose', 'postprandial_glucose')
+ALERT_METRICS = GLUCOSE_ALERT_TYPES + ('systolic', 'diastolic')
+
+# (severe_low, low, high, severe_high) per metric, used when a patient has no target of their own
+DEFAULT_THRESHOLDS = {
+    'fasting_glucose': (54, 70, 180, 250),
+    'postprandial_glucose': (54, 90, 200, 250),
+    'systolic': (70, 90, 140, 180),
+    'diastolic': (40, 60, 90, 120),
+}
+
+# Severity of each band a rule splits readings into; NORMAL_BAND is in range
+SEVERITIES = ('Critical Low', 'Low', None, 'High', 'Critical High')
+NORMAL_BAND = 2
+
+DEFAULT_CACHE_TTL = 300
+MAX_CACHED_PATIENTS = 10000
+
+
+class ThresholdRule:
+    """
+    A metric's thresholds compiled into sorted band boundaries. Lows are
+    exclusive and highs inclusive (a reading equal to 'high' is still in
+    range), so the upper boundaries are nudged to the next float and a
+    single right bisect finds the band.
+    """
+    __slots__ = ('bounds',)
+
+    def __init__(self, severe_low, low, high, severe_high):
+        self.bounds = (
+            float(severe_low),
+            float(low),
+            math.nextafter(float(high), math.inf),
+            math.nextafter(float(severe_high), math.inf),
+        )
+
+    def band(self, value) -> int:
+        return bisect_right(self.bounds, value)
+
+    def severity(self, value) -> Optional[str]:
+        return SEVERITIES[self.band(value)]
+
+    def bands(self, values) -> np.ndarray:
+        """Band index of every reading in an array at once."""
+        return np.searchsorted(self.bounds, np.asarray(values, dtype=float), side='right')
+
+DEFAULT_RULES = {metric: ThresholdRule(*limits) for metric, limits in DEFAULT_THRESHOLDS.items()}
+
+def validate_thresholds(severe_low, low, high, severe_high) -> Optional[str]:
+    if not severe_low < low < high < severe_high:
+        return "Thresholds must satisfy severe low < low < high < severe high."
+    return None
+
+def glucose_alert_message(data_type, glucose_level, severity):
+    reading_type = 'Fasting' if data_type == 'fasting_glucose' else 'Postprandial'
+    if severity == 'Low':
+        advice = 'Consider consuming fast-acting carbohydrates.'
+    elif severity == 'High':
+        advice = 'Consult with healthcare provider.'
+    else:
+        advice = 'Immediate medical attention recommended.'
+    return f"{reading_type} glucose level: {glucose_level} mg/dL - {severity}. {advice}"
+
+def blood_pressure_alert_message(systolic, diastolic, systolic_severity, diastolic_severity):
+    severities = list(dict.fromkeys(filter(None, [systolic_severity, diastolic_severity])))
+    if 'High' in severities or 'Low' in severities:
+        advice = 'Consult with healthcare provider.'
+    else:
+        advice = 'Immediate medical attention recommended.'
+    return f"Blood pressure reading: {systolic}/{diastolic} mm Hg - {', '.join(severities)}. {advice}"
+
+
+class ThresholdEngine:
+    """
+    Per-patient alert rules, compiled once and cached. AlertThresholdService
+    invalidates a patient after changing their targets; the TTL bounds how
+    long other processes keep classifying with the old rules.
+    """
+    def __init__(self, ttl_seconds: int = DEFAULT_CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self._rules: Dict[int, Tuple[Dict[str, ThresholdRule], float]] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('ALERT_THRESHOLD_CACHE_TTL', DEFAULT_CACHE_TTL)
+        self.clear()
+
+    def rules_for(self, user_id: Optional[int]) -> Dict[str, ThresholdRule]:
+        """Compiled rules for a patient, falling back to the defaults per metric."""
+        if user_id is None:
+            return DEFAULT_RULES
+
+        now = self.clock()
+        with self._lock:
+            cached = self._rules.get(user_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        rules = dict(DEFAULT_RULES)
+        for target in AlertThreshold.query.filter_by(user_id=user_id).all():
+            rules[target.metric] = ThresholdRule(target.severe_low, target.low, target.high, target.severe_high)
+
+        if self.ttl > 0:
+            with self._lock:
+                if len(self._rules) >= MAX_CACHED_PATIENTS:
+                    self._rules.clear()
+                self._rules[user_id] = (rules, now + self.ttl)
+        return rules
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._rules.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._rules.clear()
+
+
+# Shared so target changes invalidate the rules every HealthService classifies with
+threshold_engine = ThresholdEngine()
+
+
+class AlertThresholdService:
+    """
+    Reads and updates a patient's personal alert targets.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def get_thresholds(self, user_id: int) -> Tuple[bool, Dict[str, Dict], Optional[str]]:
+        """
+        Effective thresholds per metric, flagging which ones are personalised.
+        """
+        try:
+            targets = {t.metric: t for t in AlertThreshold.query.filter_by(user_id=user_id).all()}
+            thresholds = {}
+            for metric in ALERT_METRICS:
+                target = targets.get(metric)
+                limits = (target.severe_low, target.low, target.high, target.severe_high) if target else DEFAULT_THRESHOLDS[metric]
+                thresholds[metric] = dict(zip(('severe_low', 'low', 'high', 'severe_high'), limits), custom=target is not None)
+            return True, thresholds, None
+        except Exception as e:
+            return False, {}, str(e)
+
+    def set_thresholds(self, user_id: int, metric: str, severe_low: int, low: int,
+                       high: int, severe_high: int) -> Tuple[bool, Optional[str]]:
+        if metric not in ALERT_METRICS:
+            return False, f"Unknown alert metric: {metric}"
+        error = validate_thresholds(severe_low, low, high, severe_high)
+        if error:
+            return False, error
+
+        try:
+            target = AlertThreshold.query.filter_by(user_id=user_id, metric=metric).first()
+            if target is None:
+                target = AlertThreshold(user_id=user_id, metric=metric)
+                self.db.session.add(target)
+            target.severe_low = severe_low
+            target.low = low
+            target.high = high
+            target.severe_high = severe_high
+            self.db.session.commit()
+            threshold_engine.invalidate(user_id)
+            return True, None
+        except Exception as e:
+            self.db.session.rollback()
+            return False, str(e)
+
+    def reset_thresholds(self, user_id: int, metric: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Drop a patient's personal target for one metric, or all of them.
+        """
+        try:
+            query = AlertThreshold.query.filter_by(user_id=user_id)
+            if metric is not None:
+                query = query.filter_by(metric=metric)
+            query.delete()
+            self.db.session.commit()
+            threshold_engine.invalidate(user_id)
+            return True, None
+        except Exception as e:
+            self.db.session.rollback()
+            return False, str(e)
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from app.models import GlucoseRecord
+from app.services.rollup_service import TIME_IN_RANGE_BUCKETS
+
+def gmi(mean):
+    """Glucose Management Indicator (%) from mean glucose in mg/dL."""
+    return 3.31 + 0.02392 * mean
+
+def estimated_a1c(mean):
+    """ADAG estimated A1c (%) from mean glucose in mg/dL."""
+    return (mean + 46.7) / 28.7
+
+def mage(levels: np.ndarray, sd: float) -> Optional[float]:
+    """
+    Mean Amplitude of Glycemic Excursions: the mean rise or fall between
+    consecutive turning points of the series, counting only excursions
+    larger than one standard deviation. None if there is no such excursion.
+    """
+    if levels.size < 3 or not sd:
+        return None
+    diffs = np.diff(levels)
+    # Plateaus carry no direction; drop them so turning points line up
+    moving = np.flatnonzero(diffs)
+    if moving.size < 2:
+        return None
+    direction = np.sign(diffs[moving])
+    turns = moving[1:][direction[1:] != direction[:-1]]
+    # Turning points are the first point, every direction change and the last point
+    points = levels[np.concatenate(([0], turns, [levels.size - 1]))]
+    amplitudes = np.abs(np.diff(points))
+    amplitudes = amplitudes[amplitudes > sd]
+    return float(amplitudes.mean()) if amplitudes.size else None
+
+def glycemic_metrics(levels: np.ndarray) -> Dict:
+    """
+    Summary metrics for one patient's glucose readings in time order.
+    Time in range is the share of readings in each band, as a percentage.
+    """
+    levels = np.asarray(levels, dtype=float)
+    count = int(levels.size)
+    if not count:
+        return {'readings': 0}
+
+    mean = float(levels.mean())
+    sd = float(levels.std(ddof=1)) if count > 1 else None
+    metrics = {
+        'readings': count,
+        'mean': mean,
+        'sd': sd,
+        'cv': sd / mean * 100 if sd is not None else None,
+        'gmi': gmi(mean),
+        'ea1c': estimated_a1c(mean),
+        'mage': mage(levels, sd),
+        'min': float(levels.min()),
+        'max': float(levels.max()),
+    }
+    metrics.update(_time_in_range(levels, count))
+    return metrics
+
+def _time_in_range(levels, count):
+    bands = {}
+    for name, low, high in TIME_IN_RANGE_BUCKETS:
+        mask = np.ones(levels.shape, dtype=bool)
+        if low is not None:
+            mask &= levels >= low
+        if high is not None:
+            mask &= levels <= high
+        bands[name.replace('_count', '')] = float(mask.sum()) / count * 100
+    return {
+        'time_in_range': bands,
+        'time_below_range': bands['very_low'] + bands['low'],
+        'time_above_range': bands['high'] + bands['very_high'],
+    }
+
+
+class AnalyticsService:
+    """
+    Glycemic summary metrics computed with NumPy. A patient's readings are
+    fetched in one columnar query ordered by time, so no ORM objects are
+    built however long the history is.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def get_glucose_metrics(self, user_id: int, start: Optional[datetime] = None,
+                            end: Optional[datetime] = None) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Metrics for one patient's readings recorded within [start, end).
+        """
+        try:
+            return True, glycemic_metrics(self._load_levels(user_id, start, end)), None
+        except Exception as e:
+            return False, None, str(e)
+
+    def _load_levels(self, user_id, start, end):
+        statement = select(GlucoseRecord.glucose_level).where(GlucoseRecord.user_id == user_id)
+        if start is not None:
+            statement = statement.where(GlucoseRecord.recorded_at >= start)
+        if end is not None:
+            statement = statement.where(GlucoseRecord.recorded_at < end)
+        statement = statement.order_by(GlucoseRecord.recorded_at)
+        return np.array(self.db.session.scalars(statement).all(), dtype=float)
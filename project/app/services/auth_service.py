@@ -1,11 +1,16 @@
+import logging
 from typing import Optional, Tuple
-from werkzeug.security import check_password_hash
-from app.models import User
+from sqlalchemy import exists, select
+from app.models import User, CompanionAccess
 from app.extensions import db
+from app.services.password_service import HasherBusy, PasswordHasher, password_hasher
+
+logger = logging.getLogger(__name__)
 
 class AuthService:
-    def __init__(self, db):
+    def __init__(self, db, hasher: Optional[PasswordHasher] = None):
         self.db = db
+        self.hasher = hasher or password_hasher
 
     def authenticate_user(self, email: str, password: str, user_type: str) -> Tuple[bool, Optional[User], Optional[str], Optional[str]]:
         """
@@ -18,16 +23,21 @@ class AuthService:
             if not user:
                 return False, None, None, 'User not found.'
                 
-            if not user.check_password(password):
+            if not self.hasher.verify(user.password_hash, password):
                 return False, None, None, 'Invalid password.'
 
+            if self.hasher.needs_rehash(user.password_hash):
+                self._upgrade_hash(user, password)
+
             # Determine redirect for companion users
             redirect_url = None
-            if user.user_type == 'COMPANION' and not user.patients:
+            if user.user_type == 'COMPANION' and not self.has_linked_patients(user.id):
                 redirect_url = 'companion.companion_setup'
                 
             return True, user, redirect_url, None
             
+        except HasherBusy:
+            return False, None, None, 'Too many sign-ins right now. Please try again in a moment.'
         except Exception as e:
             return False, None, None, f'Authentication error: {str(e)}'
 
@@ -50,7 +60,7 @@ class AuthService:
                 email=email,
                 user_type=user_type
             )
-            user.set_password(password)
+            user.password_hash = self.hasher.hash(password)
             
             self.db.session.add(user)
             self.db.session.commit()
@@ -60,10 +70,29 @@ class AuthService:
             
             return True, user, redirect_url, None
             
+        except HasherBusy:
+            return False, None, None, 'Too many sign-ups right now. Please try again in a moment.'
         except Exception as e:
             self.db.session.rollback()
             return False, None, None, f'Registration error: {str(e)}'
 
+    def has_linked_patients(self, companion_id: int) -> bool:
+        """Whether the companion is linked to any patient, without loading the links."""
+        return self.db.session.execute(
+            select(exists().where(CompanionAccess.companion_id == companion_id))
+        ).scalar()
+
+    def _upgrade_hash(self, user: User, password: str):
+        # Re-hash with the configured parameters while the plain password is at hand
+        try:
+            user.password_hash = self.hasher.hash(password)
+            self.db.session.commit()
+        except HasherBusy:
+            pass
+        except Exception:
+            self.db.session.rollback()
+            logger.exception("Could not upgrade password hash for user %s", user.id)
+
     def initiate_password_reset(self, email: str) -> Tuple[bool, Optional[str]]:
         """
         Start password reset process for user.
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Callable, Dict, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models import CompanionAccess, Notification
+
+DEFAULT_TTL_SECONDS = 30
+MAX_ENTRIES = 10000
+
+PENDING_CONNECTIONS = 'pending_connections'
+UNREAD_NOTIFICATIONS = 'unread_notifications'
+
+
+class BadgeCounter:
+    """
+    Per-user cache of the navbar badge counts. Services invalidate a user's
+    count when they change connections or notifications, so a render only
+    queries after a change. The TTL bounds staleness for changes made by
+    other processes, which cannot reach this cache.
+    """
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self._counts: Dict[Tuple[str, int], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('BADGE_COUNT_TTL', DEFAULT_TTL_SECONDS)
+        self.clear()
+        if not event.contains(Session, 'after_commit', _invalidate_pending):
+            event.listen(Session, 'after_commit', _invalidate_pending)
+            event.listen(Session, 'after_rollback', _discard_pending)
+
+    def pending_connections(self, patient_id: int) -> int:
+        """Number of companion requests waiting for the patient's approval."""
+        return self._get(PENDING_CONNECTIONS, patient_id, lambda: CompanionAccess.query.filter_by(
+            patient_id=patient_id,
+            medication_access="NONE",
+            glucose_access="NONE",
+            blood_pressure_access="NONE"
+        ).count())
+
+    def unread_notifications(self, user_id: int) -> int:
+        """Number of unread notifications for the user."""
+        return self._get(UNREAD_NOTIFICATIONS, user_id, lambda: Notification.query.filter_by(
+            user_id=user_id,
+            is_read=False
+        ).count())
+
+    def invalidate_pending_connections(self, *patient_ids: int):
+        self._invalidate(PENDING_CONNECTIONS, patient_ids)
+
+    def invalidate_notifications(self, *user_ids: int):
+        self._invalidate(UNREAD_NOTIFICATIONS, user_ids)
+
+    def invalidate_notifications_after_commit(self, session, *user_ids: int):
+        """
+        Invalidate once the session's current transaction commits; dropping
+        the count earlier would let a concurrent render cache the old one again.
+        """
+        session.info.setdefault('pending_badge_invalidations', []).append((self, UNREAD_NOTIFICATIONS, user_ids))
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+    def _get(self, kind, user_id, load):
+        key = (kind, user_id)
+        now = self.clock()
+        with self._lock:
+            cached = self._counts.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        count = load()
+        if self.ttl > 0:
+            with self._lock:
+                if len(self._counts) >= MAX_ENTRIES:
+                    self._prune(now)
+                self._counts[key] = (count, now + self.ttl)
+        return count
+
+    def _invalidate(self, kind, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._counts.pop((kind, user_id), None)
+
+    def _prune(self, now):
+        expired = [key for key, (_, expires_at) in self._counts.items() if expires_at <= now]
+        for key in expired:
+            del self._counts[key]
+        if len(self._counts) >= MAX_ENTRIES:
+            self._counts.clear()
+
+def _invalidate_pending(session):
+    for counter, kind, user_ids in session.info.pop('pending_badge_invalidations', ()):
+        counter._invalidate(kind, user_ids)
+
+def _discard_pending(session):
+    session.info.pop('pending_badge_invalidations', None)
+
+
+# Shared by every service so invalidations reach the counts the navbar reads
+badge_counter = BadgeCounter()
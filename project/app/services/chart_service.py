@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from app.models import GlucoseRecord, BloodPressureRecord
+
+DEFAULT_CHART_POINTS = 500
+MIN_CHART_POINTS = 3
+# Naive reference point so timestamps convert without local-time/DST surprises
+EPOCH = datetime(1970, 1, 1)
+
+CHART_KINDS = {
+    'glucose': {
+        'model': GlucoseRecord,
+        'series': ('glucose_level',),
+    },
+    'blood_pressure': {
+        'model': BloodPressureRecord,
+        'series': ('systolic', 'diastolic'),
+    },
+}
+
+def lttb(points: Sequence[Tuple[float, float]], threshold: int) -> List[Tuple[float, float]]:
+    """
+    Downsample (x, y) points sorted by x to at most `threshold` points with
+    Largest-Triangle-Three-Buckets. The first and last points are always kept,
+    and each bucket keeps the point forming the largest triangle with the
+    previously kept point and the average of the next bucket, which preserves
+    peaks and troughs far better than plain striding.
+    """
+    n = len(points)
+    if threshold >= n or threshold < MIN_CHART_POINTS:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third corner of the triangle
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_bucket = points[next_start:next_end]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+
+        ax, ay = points[a]
+        best_area = -1.0
+        best = start = int(i * bucket_size) + 1
+        for j in range(start, int((i + 1) * bucket_size) + 1):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+class ChartService:
+    """
+    Builds fixed-size time series for the insight charts. Only the timestamp
+    and value columns are loaded, and each series is reduced server-side so
+    the response size depends on the requested point count, not the history.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def get_series(self, user_id: int, kind: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   max_points: int = DEFAULT_CHART_POINTS) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Downsampled series for readings recorded within [start, end).
+        Returns (success, {'total', 'series': {name: [{'x', 'y'}, ...]}}, error_message).
+        """
+        spec = CHART_KINDS.get(kind)
+        if spec is None:
+            return False, None, f"Unknown chart kind: {kind}"
+
+        try:
+            model = spec['model']
+            statement = select(model.recorded_at, *(getattr(model, name) for name in spec['series'])).where(
+                model.user_id == user_id
+            )
+            if start is not None:
+                statement = statement.where(model.recorded_at >= start)
+            if end is not None:
+                statement = statement.where(model.recorded_at < end)
+            rows = self.db.session.execute(statement.order_by(model.recorded_at)).all()
+
+            timestamps = [(row[0] - EPOCH).total_seconds() for row in rows]
+            series = {}
+            for column, name in enumerate(spec['series'], start=1):
+                sampled = lttb([(ts, row[column]) for ts, row in zip(timestamps, rows)], max_points)
+                series[name] = [
+                    {'x': (EPOCH + timedelta(seconds=x)).isoformat(timespec='minutes'), 'y': y}
+                    for x, y in sampled
+                ]
+            return True, {'kind': kind, 'total': len(rows), 'series': series}, None
+        except Exception as e:
+            return False, None, str(e)
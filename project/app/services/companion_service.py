@@ -1,6 +1,10 @@
 from app.models import User, CompanionAccess, GlucoseRecord, BloodPressureRecord, Medication, Notification
 from app.extensions import db
+from app.services.access_service import access_cache
+from app.services.badge_service import badge_counter
+from flask import abort
 from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 from flask_login import current_user
 
 
@@ -56,6 +60,8 @@ class CompanionManager:
 
         self.db.session.add(link)
         self.db.session.commit()
+        badge_counter.invalidate_pending_connections(patient.id)
+        access_cache.invalidate(patient.id, companion_id)
         return True, 'Successfully linked with patient. Waiting for access approval.'
 
 
@@ -67,7 +73,7 @@ class CompanionManager:
                 CompanionAccess.glucose_access != "NONE",
                 CompanionAccess.blood_pressure_access != "NONE"
             )
-        ).all()
+        ).options(joinedload(CompanionAccess.patient)).all()
         return True, connections
 
     def get_pending_connections(self, companion_id):
@@ -76,25 +82,29 @@ class CompanionManager:
             medication_access="NONE",
             glucose_access="NONE",
             blood_pressure_access="NONE"
-        ).all()
+        ).options(joinedload(CompanionAccess.patient)).all()
         return True, pending_connections
     
 
     def get_patient_data(self, companion_id, patient_id):
-        access = CompanionAccess.query.filter_by(
-            patient_id=patient_id,
-            companion_id=companion_id
-        ).first_or_404()
+        grant = access_cache.get(patient_id, companion_id)
+        if grant is None:
+            abort(404)
+        access = grant.attach(self.db.session)
 
         patient = User.query.get_or_404(patient_id)
 
         glucose_data = []
         if access.glucose_access != "NONE":
-            glucose_data = GlucoseRecord.query.filter_by(user_id=patient_id).all()
+            glucose_data = GlucoseRecord.query.filter_by(user_id=patient_id).order_by(
+                GlucoseRecord.recorded_at.desc(), GlucoseRecord.id.desc()
+            ).all()
 
         blood_pressure_data = []
         if access.blood_pressure_access != "NONE":
-            blood_pressure_data = BloodPressureRecord.query.filter_by(user_id=patient_id).all()
+            blood_pressure_data = BloodPressureRecord.query.filter_by(user_id=patient_id).order_by(
+                BloodPressureRecord.recorded_at.desc(), BloodPressureRecord.id.desc()
+            ).all()
 
         medication_data = []
         if access.medication_access != "NONE":
@@ -115,4 +125,5 @@ class CompanionManager:
             return False, 'Unauthorized action.'
         notification.is_read = True
         self.db.session.commit()
+        badge_counter.invalidate_notifications(companion_id)
         return True, 'Notification marked as read.'
@@ -1,7 +1,10 @@
 # app/services/connection_service.py
 from typing import Optional, Tuple, List, Dict
+from sqlalchemy.orm import joinedload
 from app.models import CompanionAccess
 from app.extensions import db
+from app.services.access_service import access_cache
+from app.services.badge_service import badge_counter
 
 class ConnectionService:
     def __init__(self, db):
@@ -23,12 +26,13 @@ class ConnectionService:
     def get_connections(self, patient_id: int) -> Tuple[bool, Dict, str]:
         """Get both pending and active connections for a patient"""
         try:
+            # The page shows each companion's name and email; load them with the links
             pending_connections = CompanionAccess.query.filter_by(
                 patient_id=patient_id,
                 medication_access="NONE",
                 glucose_access="NONE",
                 blood_pressure_access="NONE"
-            ).all()
+            ).options(joinedload(CompanionAccess.companion)).all()
             
             active_connections = CompanionAccess.query.filter(
                 CompanionAccess.patient_id == patient_id,
@@ -37,7 +41,7 @@ class ConnectionService:
                     CompanionAccess.glucose_access != "NONE",
                     CompanionAccess.blood_pressure_access != "NONE"
                 )
-            ).all()
+            ).options(joinedload(CompanionAccess.companion)).all()
             
             return True, {
                 'pending': pending_connections,
@@ -57,6 +61,8 @@ class ConnectionService:
             connection.blood_pressure_access = access_levels.get('blood_pressure', 'NONE')
             
             self.db.session.commit()
+            badge_counter.invalidate_pending_connections(patient_id)
+            access_cache.invalidate(patient_id, connection.companion_id)
             return True, connection, None
         except Exception as e:
             self.db.session.rollback()
@@ -68,8 +74,11 @@ class ConnectionService:
             if connection.patient_id != patient_id:
                 return False, "Unauthorized access"
             
+            companion_id = connection.companion_id
             self.db.session.delete(connection)
             self.db.session.commit()
+            badge_counter.invalidate_pending_connections(patient_id)
+            access_cache.invalidate(patient_id, companion_id)
             return True, None
         except Exception as e:
             self.db.session.rollback()
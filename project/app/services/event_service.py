@@ -0,0 +1,207 @@
+import json
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, Optional, Set
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+from werkzeug.utils import import_string
+
+DEFAULT_QUEUE_SIZE = 100
+REDIS_CHANNEL = 'diabetesease:events'
+
+logger = logging.getLogger(__name__)
+
+Event = namedtuple('Event', ['name', 'data'])
+
+def format_sse(event: Event) -> str:
+    """Encode an event in the text/event-stream wire format."""
+    return f"event: {event.name}\ndata: {json.dumps(event.data)}\n\n"
+
+
+class EventBackend(ABC):
+    """
+    Carries events between processes. The broker starts the backend with a
+    deliver(user_id, event) callback, which must be called for every event
+    published in any process, including this one. cross_process says whether
+    streams in other processes hear about it too.
+    """
+    cross_process = False
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url
+        self.deliver: Optional[Callable[[int, Event], None]] = None
+
+    def start(self, deliver: Callable[[int, Event], None]):
+        self.deliver = deliver
+
+    @abstractmethod
+    def publish(self, user_id: int, event: Event):
+        """Send the event to every process, this one included."""
+
+    def close(self):
+        pass
+
+
+class LocalBackend(EventBackend):
+    """Delivers within this process only; enough for a single web process."""
+    def publish(self, user_id, event):
+        self.deliver(user_id, event)
+
+
+class RedisBackend(EventBackend):
+    """
+    Fans events out through a Redis pub/sub channel so streams held by one
+    process see events published by another (other web workers, the
+    notification worker). Needs the 'redis' package.
+    """
+    cross_process = True
+
+    def __init__(self, url: Optional[str] = None):
+        super().__init__(url)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("EVENT_BACKEND is RedisBackend, but the 'redis' package is not installed; "
+                               "install requirements.txt or use LocalBackend")
+        self.client = redis.Redis.from_url(url or 'redis://localhost:6379/0')
+        self._thread = None
+
+    def start(self, deliver):
+        super().start(deliver)
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{REDIS_CHANNEL: self._on_message})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def publish(self, user_id, event):
+        self.client.publish(REDIS_CHANNEL, json.dumps({'user_id': user_id, 'name': event.name, 'data': event.data}))
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+
+    def _on_message(self, message):
+        try:
+            payload = json.loads(message['data'])
+            self.deliver(payload['user_id'], Event(payload['name'], payload['data']))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed event message: %r", message.get('data'))
+
+
+class Subscription:
+    """One open stream's queue of events for a user."""
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize)
+
+    def put(self, event: Event):
+        # A stalled client loses its oldest events rather than blocking publishers
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float) -> Optional[Event]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """
+    In-process pub/sub for the live event stream. Publishing goes through
+    the configured backend, which hands every event back to the broker of
+    each process to be queued for that user's open streams.
+    """
+    def __init__(self, backend: Optional[EventBackend] = None, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.backend = None
+        self.set_backend(backend or LocalBackend())
+
+    def init_app(self, app):
+        self.queue_size = app.config.get('EVENT_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)
+        backend_class = import_string(app.config.get('EVENT_BACKEND', 'app.services.event_service.LocalBackend'))
+        self.set_backend(backend_class(app.config.get('EVENT_BACKEND_URL')))
+        if not sa_event.contains(Session, 'after_commit', _publish_pending):
+            sa_event.listen(Session, 'after_commit', _publish_pending)
+            sa_event.listen(Session, 'after_rollback', _discard_pending)
+
+    @property
+    def cross_process(self) -> bool:
+        """Whether events published here reach streams held by other processes."""
+        return self.backend.cross_process
+
+    def set_backend(self, backend: EventBackend):
+        if self.backend is not None:
+            self.backend.close()
+        self.backend = backend
+        backend.start(self._dispatch)
+
+    def subscribe(self, user_id: int, limit: Optional[int] = None) -> Optional[Subscription]:
+        """Open a stream for the user, or return None if they already hold limit streams here."""
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            subscriptions = self._subscribers.setdefault(user_id, set())
+            if limit is not None and len(subscriptions) >= limit:
+                return None
+            subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self, user_id: Optional[int] = None) -> int:
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def publish(self, user_ids: Iterable[int], name: str, data: Dict):
+        """Send an event to every open stream of the given users, now."""
+        event = Event(name, data)
+        for user_id in user_ids:
+            try:
+                self.backend.publish(user_id, event)
+            except Exception as e:
+                # Live events are best effort; the data itself is already stored
+                logger.warning("Could not publish %s event for user %s: %s", name, user_id, e)
+
+    def publish_after_commit(self, session, user_ids: Iterable[int], name: str, data: Dict):
+        """
+        Publish once the session's current transaction commits, so streams
+        never see rows that end up rolled back. Dropped on rollback.
+        """
+        session.info.setdefault('pending_events', []).append((self, list(user_ids), name, data))
+
+    def _dispatch(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+def _publish_pending(session):
+    for broker, user_ids, name, data in session.info.pop('pending_events', ()):
+        broker.publish(user_ids, name, data)
+
+def _discard_pending(session):
+    session.info.pop('pending_events', None)
+
+
+# Shared by the stream view and every service that publishes
+event_broker = EventBroker()
@@ -1,168 +1,303 @@
-from app.models import GlucoseRecord, CompanionAccess, GlucoseType, User, BloodPressureRecord, Notification
+from app.models import GlucoseRecord, CompanionAccess, GlucoseType, User, BloodPressureRecord, Notification, NotificationOutbox, parse_recorded_at
 from app.extensions import db
+from app.services.access_service import ACCESS_COLUMNS
+from app.services.badge_service import badge_counter
+from app.services.event_service import event_broker
+from app.services.rollup_service import RollupService
+from app.services.alert_service import (
+    threshold_engine, glucose_alert_message, blood_pressure_alert_message,
+    GLUCOSE_ALERT_TYPES, SEVERITIES, NORMAL_BAND
+)
+from flask import abort
 from flask_login import current_user
+from sqlalchemy import and_, or_, insert
+from collections import namedtuple
+from datetime import datetime
+import base64
+import numpy as np
+
+DEFAULT_PAGE_SIZE = 50
+
+# Accepted reading ranges, mirroring the model check constraints
+MIN_GLUCOSE = 50
+MAX_GLUCOSE = 350
+MIN_SYSTOLIC = 50
+MAX_SYSTOLIC = 300
+MIN_DIASTOLIC = 30
+MAX_DIASTOLIC = 200
+
+# Companion access levels that may edit or delete a patient's readings, plus the owner's own
+OWNER_ACCESS = 'OWNER'
+EDIT_ACCESS_LEVELS = (OWNER_ACCESS, 'EDIT', 'VIEW')
+
+RECORD_MODELS = {
+    'glucose': GlucoseRecord,
+    'blood_pressure': BloodPressureRecord,
+}
+
+
+class AuthorizedRecord(namedtuple('AuthorizedRecord', ['record', 'access'])):
+    """
+    A health record with the loading user's access to it: OWNER, or the
+    companion's EDIT/VIEW/NONE level for the record's category.
+    """
+    __slots__ = ()
+
+    @property
+    def can_edit(self):
+        return self.access in EDIT_ACCESS_LEVELS
+
+def encode_cursor(record):
+    """
+    Build an opaque page cursor from a record's (recorded_at, id) sort key.
+    """
+    raw = f"{record.recorded_at.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """
+    Decode a page cursor back into its (recorded_at, id) sort key.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        recorded_at, record_id = raw.split('|')
+        return datetime.fromisoformat(recorded_at), int(record_id)
+    except Exception:
+        raise ValueError("Invalid page cursor.")
+
+def paginate_records(model, user_id, cursor=None, direction='next', page_size=DEFAULT_PAGE_SIZE):
+    """
+    Keyset pagination over a user's health records, newest first.
+    recorded_at mirrors the (date, time) strings, so (recorded_at, id)
+    gives the same stable order as (date, time, id) while staying on the
+    (user_id, recorded_at) index.
+    """
+    query = model.query.filter_by(user_id=user_id)
+    newest_first = (model.recorded_at.desc(), model.id.desc())
+    oldest_first = (model.recorded_at.asc(), model.id.asc())
+
+    if cursor is None:
+        rows = query.order_by(*newest_first).limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        records = rows[:page_size]
+        has_newer, has_older = False, has_more
+    else:
+        cursor_at, cursor_id = decode_cursor(cursor)
+        if direction == 'prev':
+            rows = query.filter(or_(
+                model.recorded_at > cursor_at,
+                and_(model.recorded_at == cursor_at, model.id > cursor_id)
+            )).order_by(*oldest_first).limit(page_size + 1).all()
+            has_more = len(rows) > page_size
+            records = list(reversed(rows[:page_size]))
+            has_newer, has_older = has_more, True
+        else:
+            rows = query.filter(or_(
+                model.recorded_at < cursor_at,
+                and_(model.recorded_at == cursor_at, model.id < cursor_id)
+            )).order_by(*newest_first).limit(page_size + 1).all()
+            has_more = len(rows) > page_size
+            records = rows[:page_size]
+            has_newer, has_older = True, has_more
+
+    return {
+        'records': records,
+        'page_size': page_size,
+        'next_cursor': encode_cursor(records[-1]) if records and has_older else None,
+        'prev_cursor': encode_cursor(records[0]) if records and has_newer else None,
+    }
 
 class HealthService:
-    def __init__(self, db):
+    def __init__(self, db, use_outbox=False):
         self.db = db
+        # With the outbox, alerts are queued with the reading and fanned out by the notification worker
+        self.use_outbox = use_outbox
+        self.rollup_service = RollupService(db)
         self.glucose_manager = GlucoseManager(db, self)
         self.blood_pressure_manager = BloodPressureManager(db, self)
 
+    def get_authorized_record(self, kind, record_id, user_id):
+        """
+        Load a glucose or blood pressure record together with the user's
+        access to it, joining the companion link in the same query.
+        Returns an AuthorizedRecord, or None if the record does not exist.
+        """
+        model = RECORD_MODELS[kind]
+        row = self.db.session.query(model, getattr(CompanionAccess, ACCESS_COLUMNS[kind])).outerjoin(
+            CompanionAccess, and_(
+                CompanionAccess.patient_id == model.user_id,
+                CompanionAccess.companion_id == user_id
+            )
+        ).filter(model.id == record_id).first()
+        if row is None:
+            return None
+
+        record, level = row
+        if record.user_id == user_id:
+            return AuthorizedRecord(record, OWNER_ACCESS)
+        if current_user.user_type == "COMPANION":
+            return AuthorizedRecord(record, level or 'NONE')
+        return AuthorizedRecord(record, 'NONE')
+
     # Glucose methods
-    def get_glucose_records(self, user_id):
-        return self.glucose_manager.get_glucose_records(user_id)
+    def get_glucose_records(self, user_id, start=None, end=None):
+        return self.glucose_manager.get_glucose_records(user_id, start=start, end=end)
+
+    def get_glucose_records_page(self, user_id, cursor=None, direction='next', page_size=DEFAULT_PAGE_SIZE):
+        return self.glucose_manager.get_glucose_records_page(user_id, cursor, direction, page_size)
 
     def add_glucose_record(self, user_id, glucose_level, glucose_type, date, time):
         return self.glucose_manager.add_glucose_record(user_id, glucose_level, glucose_type, date, time)
 
-    def update_glucose_record(self, record_id, user_id, glucose_level, glucose_type, date, time):
-        return self.glucose_manager.update_glucose_record(record_id, user_id, glucose_level, glucose_type, date, time)
+    def update_glucose_record(self, record_id, user_id, glucose_level, glucose_type, date, time, loaded=None):
+        return self.glucose_manager.update_glucose_record(record_id, user_id, glucose_level, glucose_type, date, time, loaded)
 
     def delete_glucose_record(self, record_id, user_id):
         return self.glucose_manager.delete_glucose_record(record_id, user_id)
 
     # Blood Pressure methods
-    def get_blood_pressure_records(self, user_id):
-        return self.blood_pressure_manager.get_blood_pressure_records(user_id)
+    def get_blood_pressure_records(self, user_id, start=None, end=None):
+        return self.blood_pressure_manager.get_blood_pressure_records(user_id, start=start, end=end)
+
+    def get_blood_pressure_records_page(self, user_id, cursor=None, direction='next', page_size=DEFAULT_PAGE_SIZE):
+        return self.blood_pressure_manager.get_blood_pressure_records_page(user_id, cursor, direction, page_size)
 
     def add_blood_pressure_record(self, user_id, systolic, diastolic, date, time):
         return self.blood_pressure_manager.add_blood_pressure_record(user_id, systolic, diastolic, date, time)
 
-    def update_blood_pressure_record(self, record_id, user_id, systolic, diastolic, date, time):
-        return self.blood_pressure_manager.update_blood_pressure_record(record_id, user_id, systolic, diastolic, date, time)
+    def update_blood_pressure_record(self, record_id, user_id, systolic, diastolic, date, time, loaded=None):
+        return self.blood_pressure_manager.update_blood_pressure_record(record_id, user_id, systolic, diastolic, date, time, loaded)
 
     def delete_blood_pressure_record(self, record_id, user_id):
         return self.blood_pressure_manager.delete_blood_pressure_record(record_id, user_id)
     
-    def notify_companions(self, user_id, data_type, value):
+    def classify_reading(self, data_type, value, user_id=None):
         """
-        Notify companion users when health data is in a risky range.
+        Build the companion alert message for a reading, or None if it is in range.
+        Uses the patient's own targets when user_id is given.
         """
-        companions = CompanionAccess.query.filter_by(patient_id=user_id).all()
-        thresholds = {
-            'fasting_glucose': {
-                'low': 70,
-                'normal_max': 100,
-                'high': 180,
-                'severe_low': 54,
-                'severe_high': 250
-            },
-            'postprandial_glucose': {
-                'low': 90,
-                'normal_max': 180,
-                'high': 200,
-                'severe_low': 54,
-                'severe_high': 250
-            },
-            'blood_pressure': {
-                'systolic': {
-                    'low': 90,
-                    'normal_max': 120,
-                    'high': 140,
-                    'severe_low': 70,
-                    'severe_high': 180
-                },
-                'diastolic': {
-                    'low': 60,
-                    'normal_max': 80,
-                    'high': 90,
-                    'severe_low': 40,
-                    'severe_high': 120
-                }
-            }
-        }
-
-        messages = []
-
-        if data_type in ['fasting_glucose', 'postprandial_glucose']:
+        rules = threshold_engine.rules_for(user_id)
+
+        if data_type in GLUCOSE_ALERT_TYPES:
             glucose_level = value.get('glucose_level')
             if glucose_level is not None:
-                gt = thresholds[data_type]
-                reading_type = 'Fasting' if data_type == 'fasting_glucose' else 'Postprandial'
-
-                if glucose_level < gt['severe_low']:
-                    severity = 'Critical Low'
-                    advice = 'Immediate medical attention recommended.'
-                elif glucose_level < gt['low']:
-                    severity = 'Low'
-                    advice = 'Consider consuming fast-acting carbohydrates.'
-                elif glucose_level > gt['severe_high']:
-                    severity = 'Critical High'
-                    advice = 'Immediate medical attention recommended.'
-                elif glucose_level > gt['high']:
-                    severity = 'High'
-                    advice = 'Consult with healthcare provider.'
-                else:
-                    severity = None  # Normal readings don't need notifications
-
+                severity = rules[data_type].severity(glucose_level)
                 if severity:
-                    for companion in companions:
-                        if companion.glucose_access == 'NONE':
-                            continue
-                        else:
-                            message = (f"{reading_type} glucose level: {glucose_level} mg/dL - {severity}. {advice}")
-                            messages.append(message)
+                    return glucose_alert_message(data_type, glucose_level, severity)
 
         elif data_type == 'blood_pressure':
             systolic = value.get('systolic')
             diastolic = value.get('diastolic')
             if systolic is not None and diastolic is not None:
-                st = thresholds['blood_pressure']['systolic']
-                dt = thresholds['blood_pressure']['diastolic']
-
-                bp_reading = f"{systolic}/{diastolic} mm Hg"
-
-                # Determine severity for systolic
-                if systolic < st['severe_low']:
-                    sys_severity = 'Critical Low'
-                elif systolic < st['low']:
-                    sys_severity = 'Low'
-                elif systolic > st['severe_high']:
-                    sys_severity = 'Critical High'
-                elif systolic > st['high']:
-                    sys_severity = 'High'
-                else:
-                    sys_severity = None
-
-                # Determine severity for diastolic
-                if diastolic < dt['severe_low']:
-                    dia_severity = 'Critical Low'
-                elif diastolic < dt['low']:
-                    dia_severity = 'Low'
-                elif diastolic > dt['severe_high']:
-                    dia_severity = 'Critical High'
-                elif diastolic > dt['high']:
-                    dia_severity = 'High'
-                else:
-                    dia_severity = None
-
-                # Consolidate severity
-                severities = set(filter(None, [sys_severity, dia_severity]))
-                if severities:
-                    for companion in companions:
-                        if companion.blood_pressure_access == 'NONE':
-                            continue
-                        else:
-                            severity = ', '.join(severities)
-                            advice = 'Consult with healthcare provider.' if 'High' in severities or 'Low' in severities else 'Immediate medical attention recommended.'
-                            message = (f"Blood pressure reading: {bp_reading} - {severity}. {advice}")
-                            messages.append(message)
-
-        # Send notifications if there are any messages
-        if messages:
-            full_message = ' '.join(messages)
-            for companion in companions:
-                companion_user = User.query.get(companion.companion_id)
-                if companion_user:
-                    notification = Notification(
-                        user_id=companion_user.id,
-                        message=full_message
+                systolic_severity = rules['systolic'].severity(systolic)
+                diastolic_severity = rules['diastolic'].severity(diastolic)
+                if systolic_severity or diastolic_severity:
+                    return blood_pressure_alert_message(systolic, diastolic, systolic_severity, diastolic_severity)
+
+        return None
+
+    def classify_readings(self, user_id, readings):
+        """
+        Alert messages for the out-of-range readings among (data_type, value)
+        pairs, in input order. Each metric is classified as one array.
+        """
+        rules = threshold_engine.rules_for(user_id)
+        messages = [None] * len(readings)
+
+        by_type = {}
+        for i, (data_type, value) in enumerate(readings):
+            by_type.setdefault(data_type, []).append(i)
+
+        for data_type, indices in by_type.items():
+            values = [readings[i][1] for i in indices]
+            if data_type in GLUCOSE_ALERT_TYPES:
+                levels = [value['glucose_level'] for value in values]
+                bands = rules[data_type].bands(levels)
+                for j in np.flatnonzero(bands != NORMAL_BAND):
+                    messages[indices[j]] = glucose_alert_message(data_type, levels[j], SEVERITIES[bands[j]])
+            elif data_type == 'blood_pressure':
+                systolic = [value['systolic'] for value in values]
+                diastolic = [value['diastolic'] for value in values]
+                systolic_bands = rules['systolic'].bands(systolic)
+                diastolic_bands = rules['diastolic'].bands(diastolic)
+                for j in np.flatnonzero((systolic_bands != NORMAL_BAND) | (diastolic_bands != NORMAL_BAND)):
+                    messages[indices[j]] = blood_pressure_alert_message(
+                        systolic[j], diastolic[j], SEVERITIES[systolic_bands[j]], SEVERITIES[diastolic_bands[j]]
                     )
-                    self.db.session.add(notification)
 
-            self.db.session.commit()
-        
+        return [message for message in messages if message]
+
+    def notify_companions(self, user_id, data_type, value):
+        """
+        Notify companion users when health data is in a risky range.
+        Notifications (or, with the outbox, one queued alert) are added to the
+        current transaction; the caller commits them together with the reading.
+        """
+        message = self.classify_reading(data_type, value, user_id)
+        if not message:
+            return []
+        # Both paths report an alert only when someone will receive it
+        companion_ids = self.get_alert_recipients(user_id, data_type)
+        if not companion_ids:
+            return []
+        if self.use_outbox:
+            self.enqueue_alert(user_id, data_type, message)
+        else:
+            self.add_notifications(companion_ids, message)
+        return [message]
+
+    def notify_companions_batch(self, user_id, readings):
+        """
+        Evaluate a batch of readings and send each companion a single summary alert.
+        readings is a list of (data_type, value) pairs of one category; the caller commits.
+        """
+        messages = self.classify_readings(user_id, readings)
+        if not messages:
+            return []
+
+        companion_ids = self.get_alert_recipients(user_id, readings[0][0])
+        if not companion_ids:
+            return []
+        summary = f"{len(messages)} out-of-range readings imported. Latest: {messages[-1]}"
+        if self.use_outbox:
+            self.enqueue_alert(user_id, readings[0][0], summary)
+        else:
+            self.add_notifications(companion_ids, summary)
         return messages
+
+    def enqueue_alert(self, user_id, data_type, message):
+        """
+        Queue an alert in the notification outbox without committing.
+        """
+        self.db.session.add(NotificationOutbox(patient_id=user_id, data_type=data_type, message=message))
+
+    def get_alert_recipients(self, user_id, data_type):
+        """
+        Ids of the patient's companions allowed to see this kind of reading, in one joined query.
+        """
+        access_column = CompanionAccess.blood_pressure_access if data_type == 'blood_pressure' else CompanionAccess.glucose_access
+        rows = self.db.session.query(CompanionAccess.companion_id).join(
+            User, User.id == CompanionAccess.companion_id
+        ).filter(
+            CompanionAccess.patient_id == user_id,
+            access_column != 'NONE'
+        ).all()
+        return [companion_id for (companion_id,) in rows]
+
+    def add_notifications(self, companion_ids, message, live=True):
+        """
+        Bulk insert one notification per companion without committing;
+        unless live is False, their open event streams are told once the
+        transaction commits.
+        """
+        if companion_ids:
+            self.db.session.execute(insert(Notification), [
+                {'user_id': companion_id, 'message': message} for companion_id in companion_ids
+            ])
+            badge_counter.invalidate_notifications_after_commit(self.db.session, *companion_ids)
+            if live:
+                event_broker.publish_after_commit(self.db.session, companion_ids, 'notification', {'message': message})
     #------------------------------------------
 
 
@@ -171,32 +306,52 @@ class GlucoseManager:
         self.db = db
         self.health_service = health_service
 
-    def get_glucose_records(self, user_id):
+    def get_glucose_records(self, user_id, start=None, end=None):
         """
-        Retrieve all glucose records for a user.
+        Retrieve glucose records for a user, newest first.
+        Optionally restricted to recorded_at within [start, end).
         """
         try:
-            records = GlucoseRecord.query.filter_by(user_id=user_id).order_by(
-                GlucoseRecord.date.desc(), GlucoseRecord.time.desc()
+            query = GlucoseRecord.query.filter_by(user_id=user_id)
+            if start is not None:
+                query = query.filter(GlucoseRecord.recorded_at >= start)
+            if end is not None:
+                query = query.filter(GlucoseRecord.recorded_at < end)
+            records = query.order_by(
+                GlucoseRecord.recorded_at.desc(), GlucoseRecord.id.desc()
             ).all()
             return True, records, None
         except Exception as e:
             return False, None, str(e)
 
+    def get_glucose_records_page(self, user_id, cursor=None, direction='next', page_size=DEFAULT_PAGE_SIZE):
+        """
+        Retrieve one page of glucose records for a user, newest first.
+        Returns the page dict with records and next/prev cursors.
+        """
+        try:
+            page = paginate_records(GlucoseRecord, user_id, cursor, direction, page_size)
+            return True, page, None
+        except Exception as e:
+            return False, None, str(e)
+
     def add_glucose_record(self, user_id, glucose_level, glucose_type, date, time):
         """
         Add a new glucose record.
+        Returns (success, record, error_message, alert_messages).
         """
         try:
             # Validate glucose level boundaries
-            MIN_GLUCOSE = 50
-            MAX_GLUCOSE = 350
-
             if not (MIN_GLUCOSE <= glucose_level <= MAX_GLUCOSE):
-                return False, None, f"Glucose level must be between {MIN_GLUCOSE} and {MAX_GLUCOSE} mg/dL."
+                return False, None, f"Glucose level must be between {MIN_GLUCOSE} and {MAX_GLUCOSE} mg/dL.", []
+
+            try:
+                recorded_at = parse_recorded_at(date, time)
+            except ValueError:
+                return False, None, "Invalid date or time format.", []
 
             if self.is_duplicate_record(user_id, date, time):
-                return False, None, "A glucose record for this date and time already exists."
+                return False, None, "A glucose record for this date and time already exists.", []
 
             record = GlucoseRecord(
                 user_id=user_id,
@@ -206,45 +361,59 @@ class GlucoseManager:
                 time=time
             )
 
+            self.db.session.add(record)
+            self.health_service.rollup_service.add_readings('glucose', user_id, [{
+                'recorded_at': recorded_at, 'glucose_level': glucose_level, 'glucose_type': glucose_type
+            }])
+
+            # Alerts are written in the same transaction as the reading
             value = {'glucose_level': glucose_level}
-            data_type = 'fasting_glucose' if glucose_type == 'FASTING' else 'postprandial_glucose'
+            data_type = 'fasting_glucose' if GlucoseType(glucose_type) == GlucoseType.FASTING else 'postprandial_glucose'
             msg = self.health_service.notify_companions(user_id, data_type, value)
-
-            self.db.session.add(record)
             self.db.session.commit()
             return True, record, None, msg
         except Exception as e:
             self.db.session.rollback()
             return False, None, str(e), []
 
-    def update_glucose_record(self, record_id, user_id, glucose_level, glucose_type, date, time):
+    def update_glucose_record(self, record_id, user_id, glucose_level, glucose_type, date, time, loaded=None):
         """
-        Update an existing glucose record.
+        Update an existing glucose record. Pass the AuthorizedRecord the caller
+        already loaded as `loaded` to skip loading it again.
         """
         try:
-            record = GlucoseRecord.query.get_or_404(record_id)
+            loaded = loaded or self.load_record(record_id, user_id)
+            if loaded is None:
+                abort(404)
+            record = loaded.record
 
-            if not self.has_permission(record, user_id):
+            if not loaded.can_edit:
                 return False, "You do not have permission to edit this record."
 
             # Validate glucose level boundaries
-            MIN_GLUCOSE = 50
-            MAX_GLUCOSE = 350
-
             if not (MIN_GLUCOSE <= glucose_level <= MAX_GLUCOSE):
                 return False, f"Glucose level must be between {MIN_GLUCOSE} and {MAX_GLUCOSE} mg/dL."
 
-            if (date != record.date or time != record.time) and self.is_duplicate_record(user_id, date, time):
+            try:
+                recorded_at = parse_recorded_at(date, time)
+            except ValueError:
+                return False, "Invalid date or time format."
+
+            if recorded_at != record.recorded_at and self.is_duplicate_record(user_id, date, time):
                 return False, "A glucose record for this date and time already exists."
 
             # Update the record
+            previous_day = record.recorded_at.date()
             record.glucose_level = glucose_level
             record.glucose_type = glucose_type
             record.date = date
             record.time = time
+            self.health_service.rollup_service.refresh_days(
+                'glucose', record.user_id, [previous_day, recorded_at.date()]
+            )
             value = {'glucose_level': glucose_level}
-            data_type = 'fasting_glucose' if glucose_type == GlucoseType.FASTING else 'postprandial_glucose'
-            msg = self.health_service.notify_companions(user_id, data_type, value)
+            data_type = 'fasting_glucose' if GlucoseType(glucose_type) == GlucoseType.FASTING else 'postprandial_glucose'
+            msg = self.health_service.notify_companions(record.user_id, data_type, value)
             self.db.session.commit()
             return True, None, msg
         except Exception as e:
@@ -256,75 +425,88 @@ class GlucoseManager:
         Delete an existing glucose record.
         """
         try:
-            record = GlucoseRecord.query.get_or_404(record_id)
+            loaded = self.load_record(record_id, user_id)
+            if loaded is None:
+                abort(404)
+            record = loaded.record
 
-            if not self.has_permission(record, user_id):
+            if not loaded.can_edit:
                 return False, "You do not have permission to delete this record."
 
             self.db.session.delete(record)
+            self.health_service.rollup_service.refresh_days('glucose', record.user_id, [record.recorded_at.date()])
             self.db.session.commit()
             return True, None
         except Exception as e:
             self.db.session.rollback()
             return False, str(e)
 
-    def has_permission(self, record, user_id):
+    def load_record(self, record_id, user_id):
         """
-        Check if the current user has permission to edit or delete the record.
+        Load a glucose record with the user's access to it in one query.
         """
-        if record.user_id == user_id:
-            return True
-        elif current_user.user_type == "COMPANION":
-            # Check companion access
-            access = CompanionAccess.query.filter_by(
-                patient_id=record.user_id,
-                companion_id=user_id,
-            ).first()
-            if access and access.glucose_access in ["EDIT", "VIEW"]:
-                return True
-        return False
+        return self.health_service.get_authorized_record('glucose', record_id, user_id)
 
     def is_duplicate_record(self, user_id, date_str, time_str):
         """
         Check if a record with the same date and time already exists for the user.
         """
-        return GlucoseRecord.query.filter_by(user_id=user_id, date=date_str, time=time_str).first() is not None
+        recorded_at = parse_recorded_at(date_str, time_str)
+        return GlucoseRecord.query.filter_by(user_id=user_id, recorded_at=recorded_at).first() is not None
 
 class BloodPressureManager:
     def __init__(self, db, health_service):
         self.db = db
         self.health_service = health_service
 
-    def get_blood_pressure_records(self, user_id):
+    def get_blood_pressure_records(self, user_id, start=None, end=None):
         """
-        Retrieve all blood pressure records for a user.
+        Retrieve blood pressure records for a user, newest first.
+        Optionally restricted to recorded_at within [start, end).
         """
         try:
-            records = BloodPressureRecord.query.filter_by(user_id=user_id).order_by(
-                BloodPressureRecord.date.desc(), BloodPressureRecord.time.desc()
+            query = BloodPressureRecord.query.filter_by(user_id=user_id)
+            if start is not None:
+                query = query.filter(BloodPressureRecord.recorded_at >= start)
+            if end is not None:
+                query = query.filter(BloodPressureRecord.recorded_at < end)
+            records = query.order_by(
+                BloodPressureRecord.recorded_at.desc(), BloodPressureRecord.id.desc()
             ).all()
             return True, records, None
         except Exception as e:
             return False, None, str(e)
 
+    def get_blood_pressure_records_page(self, user_id, cursor=None, direction='next', page_size=DEFAULT_PAGE_SIZE):
+        """
+        Retrieve one page of blood pressure records for a user, newest first.
+        Returns the page dict with records and next/prev cursors.
+        """
+        try:
+            page = paginate_records(BloodPressureRecord, user_id, cursor, direction, page_size)
+            return True, page, None
+        except Exception as e:
+            return False, None, str(e)
+
     def add_blood_pressure_record(self, user_id, systolic, diastolic, date, time):
         """
         Add a new blood pressure record.
+        Returns (success, record, error_message, alert_messages).
         """
         try:
             # Validate blood pressure values
-            MIN_SYSTOLIC = 50
-            MAX_SYSTOLIC = 300
-            MIN_DIASTOLIC = 30
-            MAX_DIASTOLIC = 200
-
             if not (MIN_SYSTOLIC <= systolic <= MAX_SYSTOLIC):
-                return False, None, f"Systolic value must be between {MIN_SYSTOLIC} and {MAX_SYSTOLIC} mm Hg."
+                return False, None, f"Systolic value must be between {MIN_SYSTOLIC} and {MAX_SYSTOLIC} mm Hg.", []
             if not (MIN_DIASTOLIC <= diastolic <= MAX_DIASTOLIC):
-                return False, None, f"Diastolic value must be between {MIN_DIASTOLIC} and {MAX_DIASTOLIC} mm Hg."
+                return False, None, f"Diastolic value must be between {MIN_DIASTOLIC} and {MAX_DIASTOLIC} mm Hg.", []
+
+            try:
+                recorded_at = parse_recorded_at(date, time)
+            except ValueError:
+                return False, None, "Invalid date or time format.", []
 
             if self.is_duplicate_record(user_id, date, time):
-                return False, None, "A blood pressure record for this date and time already exists."
+                return False, None, "A blood pressure record for this date and time already exists.", []
 
             record = BloodPressureRecord(
                 user_id=user_id,
@@ -334,47 +516,59 @@ class BloodPressureManager:
                 time=time
             )
 
+            self.db.session.add(record)
+            self.health_service.rollup_service.add_readings('blood_pressure', user_id, [{
+                'recorded_at': recorded_at, 'systolic': systolic, 'diastolic': diastolic
+            }])
+
+            # Alerts are written in the same transaction as the reading
             value = {'systolic': systolic, 'diastolic': diastolic}
             msg = self.health_service.notify_companions(user_id, 'blood_pressure', value)
-
-            self.db.session.add(record)
             self.db.session.commit()
             return True, record, None, msg
         except Exception as e:
             self.db.session.rollback()
             return False, None, str(e), []
 
-    def update_blood_pressure_record(self, record_id, user_id, systolic, diastolic, date, time):
+    def update_blood_pressure_record(self, record_id, user_id, systolic, diastolic, date, time, loaded=None):
         """
-        Update an existing blood pressure record.
+        Update an existing blood pressure record. Pass the AuthorizedRecord the caller
+        already loaded as `loaded` to skip loading it again.
         """
         try:
-            record = BloodPressureRecord.query.get_or_404(record_id)
+            loaded = loaded or self.load_record(record_id, user_id)
+            if loaded is None:
+                abort(404)
+            record = loaded.record
 
-            if not self.has_permission(record, user_id):
+            if not loaded.can_edit:
                 return False, "You do not have permission to edit this record."
 
             # Validate blood pressure values
-            MIN_SYSTOLIC = 50
-            MAX_SYSTOLIC = 300
-            MIN_DIASTOLIC = 30
-            MAX_DIASTOLIC = 200
-
             if not (MIN_SYSTOLIC <= systolic <= MAX_SYSTOLIC):
                 return False, f"Systolic value must be between {MIN_SYSTOLIC} and {MAX_SYSTOLIC} mm Hg."
             if not (MIN_DIASTOLIC <= diastolic <= MAX_DIASTOLIC):
                 return False, f"Diastolic value must be between {MIN_DIASTOLIC} and {MAX_DIASTOLIC} mm Hg."
 
-            if (date != record.date or time != record.time) and self.is_duplicate_record(user_id, date, time):
+            try:
+                recorded_at = parse_recorded_at(date, time)
+            except ValueError:
+                return False, "Invalid date or time format."
+
+            if recorded_at != record.recorded_at and self.is_duplicate_record(user_id, date, time):
                 return False, "A blood pressure record for this date and time already exists."
 
             # Update the record
+            previous_day = record.recorded_at.date()
             record.systolic = systolic
             record.diastolic = diastolic
             record.date = date
             record.time = time
+            self.health_service.rollup_service.refresh_days(
+                'blood_pressure', record.user_id, [previous_day, recorded_at.date()]
+            )
             value = {'systolic': systolic, 'diastolic': diastolic}
-            msg = self.health_service.notify_companions(user_id, 'blood_pressure', value)
+            msg = self.health_service.notify_companions(record.user_id, 'blood_pressure', value)
             self.db.session.commit()
             return True, None, msg
         except Exception as e:
@@ -386,36 +580,31 @@ class BloodPressureManager:
         Delete an existing blood pressure record.
         """
         try:
-            record = BloodPressureRecord.query.get_or_404(record_id)
+            loaded = self.load_record(record_id, user_id)
+            if loaded is None:
+                abort(404)
+            record = loaded.record
 
-            if not self.has_permission(record, user_id):
+            if not loaded.can_edit:
                 return False, "You do not have permission to delete this record."
 
             self.db.session.delete(record)
+            self.health_service.rollup_service.refresh_days('blood_pressure', record.user_id, [record.recorded_at.date()])
             self.db.session.commit()
             return True, None
         except Exception as e:
             self.db.session.rollback()
             return False, str(e)
 
-    def has_permission(self, record, user_id):
+    def load_record(self, record_id, user_id):
         """
-        Check if the current user has permission to edit or delete the record.
+        Load a blood pressure record with the user's access to it in one query.
         """
-        if record.user_id == user_id:
-            return True
-        elif current_user.user_type == "COMPANION":
-            # Check companion access
-            access = CompanionAccess.query.filter_by(
-                patient_id=record.user_id,
-                companion_id=user_id,
-            ).first()
-            if access and access.blood_pressure_access in ["EDIT", "VIEW"]:
-                return True
-        return False
+        return self.health_service.get_authorized_record('blood_pressure', record_id, user_id)
 
     def is_duplicate_record(self, user_id, date_str, time_str):
         """
         Check if a record with the same date and time already exists for the user.
         """
-        return BloodPressureRecord.query.filter_by(user_id=user_id, date=date_str, time=time_str).first() is not None
\ No newline at end of file
+        recorded_at = parse_recorded_at(date_str, time_str)
+        return BloodPressureRecord.query.filter_by(user_id=user_id, recorded_at=recorded_at).first() is not None
\ No newline at end of file
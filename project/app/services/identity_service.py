@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, Optional
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.extensions import db
+from app.models import User
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 10000
+
+IdentityRecord = namedtuple('IdentityRecord', ['id', 'username', 'user_type', 'version'])
+
+
+class CachedIdentity(UserMixin):
+    """
+    The logged-in user as most requests need it: id, username, user_type and
+    version, with no User row behind it. Any other attribute (email,
+    relationships...) loads the full User on first use in the request.
+    """
+    def __init__(self, record: IdentityRecord, cache: 'IdentityCache'):
+        self.id = record.id
+        self.username = record.username
+        self.user_type = record.user_type
+        self.version = record.version
+        self._cache = cache
+        self._user = None
+
+    @property
+    def user(self) -> User:
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+            if self._user is not None and self._user.version != self.version:
+                self._cache.invalidate(self.id)
+        return self._user
+
+    def __getattr__(self, name):
+        # Only reached for attributes the identity does not carry itself
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __repr__(self):
+        return f'<CachedIdentity {self.id} {self.username} v{self.version}>'
+
+
+class IdentityCache:
+    """
+    Bounded LRU of the identity fields Flask-Login's user_loader hands to
+    each request. ORM changes to a user invalidate its entry in this
+    process once they commit; the TTL bounds staleness for changes made by other processes,
+    and a version mismatch spotted when the full User is loaded drops the
+    entry early.
+    """
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._identities: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', DEFAULT_TTL_SECONDS)
+        self.max_entries = app.config.get('IDENTITY_CACHE_SIZE', DEFAULT_MAX_ENTRIES)
+        self.clear()
+        if not event.contains(User, 'after_update', _queue_invalidation):
+            event.listen(User, 'after_update', _queue_invalidation)
+            event.listen(User, 'after_delete', _queue_invalidation)
+            event.listen(Session, 'after_commit', _invalidate_pending)
+            event.listen(Session, 'after_rollback', _discard_pending)
+
+    def get(self, user_id: int) -> Optional[CachedIdentity]:
+        """The user's identity, or None if there is no such user."""
+        record = self._cached(user_id)
+        if record is None:
+            row = db.session.query(User.id, User.username, User.user_type, User.version).filter(
+                User.id == user_id
+            ).first()
+            if row is None:
+                return None
+            record = IdentityRecord(*row)
+            self._store(user_id, record)
+        return CachedIdentity(record, self)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._identities.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._identities.clear()
+
+    def _cached(self, user_id):
+        now = self.clock()
+        with self._lock:
+            cached = self._identities.get(user_id)
+            if cached is None:
+                return None
+            if cached[1] <= now:
+                del self._identities[user_id]
+                return None
+            self._identities.move_to_end(user_id)
+            return cached[0]
+
+    def _store(self, user_id, record):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._identities[user_id] = (record, self.clock() + self.ttl)
+            self._identities.move_to_end(user_id)
+            while len(self._identities) > self.max_entries:
+                self._identities.popitem(last=False)
+
+def _queue_invalidation(mapper, connection, target):
+    # Flush runs before commit; dropping the entry now would let another request cache the old row again
+    object_session(target).info.setdefault('pending_identity_invalidations', set()).add(target.id)
+
+def _invalidate_pending(session):
+    for user_id in session.info.pop('pending_identity_invalidations', ()):
+        identity_cache.invalidate(user_id)
+
+def _discard_pending(session):
+    session.info.pop('pending_identity_invalidations', None)
+
+
+# Shared by the user_loader and the User change listeners
+identity_cache = IdentityCache()
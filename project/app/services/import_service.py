@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from app.models import GlucoseRecord, BloodPressureRecord, GlucoseType, parse_recorded_at
+from app.services.health_service import (
+    MIN_GLUCOSE, MAX_GLUCOSE, MIN_SYSTOLIC, MAX_SYSTOLIC, MIN_DIASTOLIC, MAX_DIASTOLIC
+)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_ROWS = 100000
+MAX_REPORTED_ERRORS = 100
+
+READING_KINDS = {
+    'glucose': {
+        'model': GlucoseRecord,
+        'columns': ('date', 'time', 'glucose_level', 'glucose_type'),
+        'ranges': (
+            ('glucose_level', MIN_GLUCOSE, MAX_GLUCOSE, "Glucose level must be between {low} and {high} mg/dL."),
+        ),
+    },
+    'blood_pressure': {
+        'model': BloodPressureRecord,
+        'columns': ('date', 'time', 'systolic', 'diastolic'),
+        'ranges': (
+            ('systolic', MIN_SYSTOLIC, MAX_SYSTOLIC, "Systolic value must be between {low} and {high} mm Hg."),
+            ('diastolic', MIN_DIASTOLIC, MAX_DIASTOLIC, "Diastolic value must be between {low} and {high} mm Hg."),
+        ),
+    },
+}
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_timestamp(date_str, time_str):
+    # Records are stored to the minute, so readings seconds apart are the same reading
+    try:
+        return parse_recorded_at(date_str, time_str).replace(second=0, microsecond=0)
+    except ValueError:
+        return None
+
+def _to_glucose_type(value):
+    try:
+        return GlucoseType(str(value).strip().upper())
+    except ValueError:
+        return None
+
+
+class ImportService:
+    """
+    Bulk import of glucose and blood pressure readings from CSV or JSON.
+    Validation runs column by column over the whole upload, duplicates are
+    found with one range query per upload, and rows are inserted in batches
+    with one commit and one companion alert pass per batch.
+    """
+    def __init__(self, db, health_service, batch_size: int = DEFAULT_BATCH_SIZE, max_rows: int = DEFAULT_MAX_ROWS):
+        self.db = db
+        self.health_service = health_service
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+
+    def parse_readings(self, content, fmt: str) -> Tuple[bool, Optional[List[Dict]], Optional[str]]:
+        """
+        Parse CSV (with a header row) or JSON (a list, or an object with a
+        'readings' list) into a list of reading dicts.
+        """
+        try:
+            if isinstance(content, bytes):
+                content = content.decode('utf-8-sig')
+            if fmt == 'json':
+                payload = json.loads(content)
+                rows = payload.get('readings') if isinstance(payload, dict) else payload
+                if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                    return False, None, "JSON must be a list of readings."
+            elif fmt == 'csv':
+                rows = [
+                    {key.strip(): value.strip() if isinstance(value, str) else value
+                     for key, value in row.items() if key}
+                    for row in csv.DictReader(io.StringIO(content))
+                ]
+            else:
+                return False, None, f"Unsupported format: {fmt}"
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            return False, None, f"Could not parse {fmt.upper()} upload: {str(e)}"
+
+        if len(rows) > self.max_rows:
+            return False, None, f"Uploads are limited to {self.max_rows} readings."
+        return True, rows, None
+
+    def import_file(self, user_id: int, kind: str, content, fmt: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Parse an upload and import it for the user.
+        """
+        success, rows, error = self.parse_readings(content, fmt)
+        if not success:
+            return False, None, error
+        return self.import_readings(user_id, kind, rows)
+
+    def import_readings(self, user_id: int, kind: str, rows: List[Dict]) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Validate, de-duplicate and insert readings for a user.
+        Returns (success, summary, error_message).
+        """
+        spec = READING_KINDS.get(kind)
+        if spec is None:
+            return False, None, f"Unknown reading kind: {kind}"
+
+        model = spec['model']
+        columns, errors = self._validate(spec, rows)
+
+        # Drop readings repeated within the upload, keeping the first one
+        seen = set()
+        duplicates = 0
+        for i, recorded_at in enumerate(columns['recorded_at']):
+            if errors[i] is None:
+                if recorded_at in seen:
+                    errors[i] = "Duplicate reading in upload."
+                    duplicates += 1
+                seen.add(recorded_at)
+
+        # One range query finds every reading that already exists
+        existing = set()
+        if seen:
+            existing = {
+                recorded_at.replace(second=0, microsecond=0)
+                for (recorded_at,) in self.db.session.query(model.recorded_at).filter(
+                    model.user_id == user_id,
+                    model.recorded_at >= min(seen),
+                    model.recorded_at < max(seen) + timedelta(minutes=1)
+                )
+            }
+        for i, recorded_at in enumerate(columns['recorded_at']):
+            if errors[i] is None and recorded_at in existing:
+                errors[i] = "A record for this date and time already exists."
+                duplicates += 1
+
+        accepted = sorted(
+            (i for i, error in enumerate(errors) if error is None),
+            key=lambda i: columns['recorded_at'][i]
+        )
+        invalid = [{'row': i + 1, 'error': error} for i, error in enumerate(errors) if error is not None]
+
+        summary = {
+            'kind': kind,
+            'received': len(rows),
+            'imported': 0,
+            'duplicates': duplicates,
+            'invalid': len(invalid) - duplicates,
+            'errors': invalid[:MAX_REPORTED_ERRORS],
+            'alerts': 0,
+        }
+
+        for start in range(0, len(accepted), self.batch_size):
+            batch = [self._build_row(kind, user_id, columns, i) for i in accepted[start:start + self.batch_size]]
+            try:
+                self.db.session.execute(insert(model), batch)
+                self.health_service.rollup_service.add_readings(kind, user_id, batch)
+                messages = self.health_service.notify_companions_batch(
+                    user_id, [self._alert_reading(kind, row) for row in batch]
+                )
+                self.db.session.commit()
+            except Exception as e:
+                self.db.session.rollback()
+                return False, summary, str(e)
+            summary['imported'] += len(batch)
+            summary['alerts'] += len(messages)
+
+        return True, summary, None
+
+    def _validate(self, spec, rows):
+        """
+        Convert and check each column over the whole upload at once.
+        Returns the converted columns and the first error found per row.
+        """
+        columns = {name: [row.get(name) for row in rows] for name in spec['columns']}
+        errors = [None] * len(rows)
+
+        def flag(failing, message):
+            for i in failing:
+                if errors[i] is None:
+                    errors[i] = message
+
+        for name, values in columns.items():
+            flag((i for i, value in enumerate(values) if value is None or value == ''), f"Missing {name}.")
+
+        for name, low, high, message in spec['ranges']:
+            values = [_to_int(value) for value in columns[name]]
+            flag((i for i, value in enumerate(values) if value is None or not low <= value <= high),
+                 message.format(low=low, high=high))
+            columns[name] = values
+
+        if 'glucose_type' in columns:
+            columns['glucose_type'] = [_to_glucose_type(value) for value in columns['glucose_type']]
+            flag((i for i, value in enumerate(columns['glucose_type']) if value is None), "Invalid glucose type.")
+
+        columns['recorded_at'] = [_to_timestamp(date, time) for date, time in zip(columns['date'], columns['time'])]
+        flag((i for i, value in enumerate(columns['recorded_at']) if value is None), "Invalid date or time format.")
+
+        return columns, errors
+
+    def _build_row(self, kind, user_id, columns, i):
+        recorded_at = columns['recorded_at'][i]
+        row = {
+            'user_id': user_id,
+            'date': recorded_at.strftime('%Y-%m-%d'),
+            'time': recorded_at.strftime('%H:%M'),
+            'recorded_at': recorded_at,
+        }
+        if kind == 'glucose':
+            row['glucose_level'] = columns['glucose_level'][i]
+            row['glucose_type'] = columns['glucose_type'][i]
+        else:
+            row['systolic'] = columns['systolic'][i]
+            row['diastolic'] = columns['diastolic'][i]
+        return row
+
+    def _alert_reading(self, kind, row):
+        if kind == 'glucose':
+            data_type = 'fasting_glucose' if row['glucose_type'] == GlucoseType.FASTING else 'postprandial_glucose'
+            return data_type, {'glucose_level': row['glucose_level']}
+        return 'blood_pressure', {'systolic': row['systolic'], 'diastolic': row['diastolic']}
@@ -1,7 +1,10 @@
 from typing import Optional, Tuple, List, Dict
-from datetime import datetime, time
-from app.models import Medication, MedicationLog, CompanionAccess
+from datetime import datetime, time, timedelta
+from sqlalchemy import and_, func
+from app.models import Medication, MedicationLog
 from app.extensions import db
+from app.services.access_service import access_cache
+from app.services.reminder_service import reminder_scheduler
 
 class MedicationManager:
     """
@@ -42,6 +45,7 @@ class MedicationManager:
             
             self.db.session.add(medication)
             self.db.session.commit()
+            reminder_scheduler.schedule(medication)
             return True, None
         except Exception as e:
             self.db.session.rollback()
@@ -58,6 +62,7 @@ class MedicationManager:
             
             self.db.session.delete(medication)
             self.db.session.commit()
+            reminder_scheduler.unschedule(medication_id)
             return True, None
         except Exception as e:
             self.db.session.rollback()
@@ -74,6 +79,7 @@ class MedicationManager:
             medication.time = time
             
             self.db.session.commit()
+            reminder_scheduler.schedule(medication)
             return True, None
         except Exception as e:
             self.db.session.rollback()
@@ -86,12 +92,7 @@ class MedicationManager:
             if medication.user_id == user_id:
                 return True, medication, None
                 
-            access = CompanionAccess.query.filter_by(
-                patient_id=medication.user_id,
-                companion_id=user_id
-            ).first()
-            
-            if access and access.medication_access == "EDIT":
+            if access_cache.allows(medication.user_id, user_id, 'medication', ('EDIT',)):
                 return True, medication, None
                 
             return False, None, "Unauthorized access"
@@ -107,52 +108,63 @@ class ScheduleManager:
     def __init__(self, db):
         self.db = db
 
+    def get_medications_with_taken(self, user_id: int, day=None) -> List[Tuple[Medication, bool]]:
+        """
+        Return each of the user's medications with whether it was taken on the
+        given day (today by default), using one LEFT JOIN against that day's logs.
+        """
+        day = day or datetime.now().date()
+        day_start = datetime.combine(day, datetime.min.time())
+        taken = func.count(MedicationLog.id) > 0
+        return (
+            self.db.session.query(Medication, taken)
+            .outerjoin(MedicationLog, and_(
+                MedicationLog.medication_id == Medication.id,
+                MedicationLog.taken_at >= day_start,
+                MedicationLog.taken_at < day_start + timedelta(days=1)
+            ))
+            .filter(Medication.user_id == user_id)
+            .group_by(Medication.id)
+            .order_by(Medication.id)
+            .all()
+        )
+
     def get_daily_medications(self, user_id: int) -> Tuple[bool, List[Dict], Optional[str]]:
-        medications = Medication.query.filter_by(user_id=user_id).all()
-        today = datetime.now().date()
         medication_list = []
-        
-        for med in medications:
-            # Check if medication was taken today
-            taken = MedicationLog.query.filter(
-                MedicationLog.medication_id == med.id,
-                MedicationLog.taken_at >= datetime.combine(today, datetime.min.time())
-            ).first() is not None
-            
+
+        for med, taken in self.get_medications_with_taken(user_id):
             medication_list.append({
                 'id': med.id,
                 'name': med.name,
                 'dosage': med.dosage,
                 'time': med.time.strftime('%I:%M %p'),
-                'taken': taken
+                'taken': bool(taken)
             })
         
         return True, medication_list, None
 
     def get_upcoming_reminders(self, user_id: int, minutes_ahead: int = 15) -> Tuple[bool, List[Dict], Optional[str]]:
+        """
+        The user's doses due within the next minutes_ahead minutes and not yet
+        taken on their day, with one medications-and-logs query per day the
+        window touches. A window running past midnight includes tomorrow's early doses.
+        """
         now = datetime.now()
-        today = now.date()
-        medications = Medication.query.filter_by(user_id=user_id).all()
-        upcoming_medications = []
+        end = now + timedelta(minutes=minutes_ahead)
 
-        for med in medications:
-            med_time = datetime.combine(today, med.time)
-            time_diff = (med_time - now).total_seconds() / 60
-            
-            if 0 <= time_diff <= minutes_ahead:
-                taken = MedicationLog.query.filter(
-                    MedicationLog.medication_id == med.id,
-                    MedicationLog.taken_at >= datetime.combine(today, datetime.min.time())
-                ).first() is not None
-                
-                if not taken:
+        upcoming_medications = []
+        day = now.date()
+        while day <= end.date():
+            for med, taken in self.get_medications_with_taken(user_id, day):
+                if not taken and now <= datetime.combine(day, med.time) <= end:
                     upcoming_medications.append({
                         'id': med.id,
                         'name': med.name,
                         'dosage': med.dosage,
                         'time': med.time.strftime('%I:%M %p')
                     })
-        
+            day += timedelta(days=1)
+
         return True, upcoming_medications, None
 
     def log_medication_taken(self, medication_id: int, user_id: int) -> Tuple[bool, Optional[str]]:
@@ -0,0 +1,180 @@
+import logging
+from abc import ABC, abstractmethod
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import or_, select, update
+from werkzeug.utils import import_string
+from app.models import NotificationOutbox
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 3600
+DEFAULT_LEASE_SECONDS = 300
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryChannel(ABC):
+    """
+    Base class for outbound alert delivery (email, SMS, push...). Channels
+    are called after the in-app notifications exist and should raise on
+    failure so the entry is retried. Delivery is at-least-once: a retry
+    calls every channel again, so channels should tolerate repeats.
+    """
+    name = 'channel'
+
+    @abstractmethod
+    def send(self, entry: NotificationOutbox, companion_ids: List[int]):
+        """Deliver the entry's message to the companions, raising on failure."""
+
+
+class LogChannel(DeliveryChannel):
+    """Writes each alert to the application log."""
+    name = 'log'
+
+    def send(self, entry, companion_ids):
+        logger.info("Alert for patient %s sent to companions %s: %s", entry.patient_id, companion_ids, entry.message)
+
+def load_channels(paths: Iterable[str]) -> List[DeliveryChannel]:
+    """Instantiate channels from import paths such as 'app.services.outbox_service.LogChannel'."""
+    return [import_string(path)() for path in paths]
+
+
+class NotificationOutboxService:
+    """
+    Drains the notification outbox. Each batch is claimed with a lease
+    so several workers can run side by side; entries whose worker died
+    become claimable again when the lease runs out. Failed deliveries are
+    retried with exponential backoff until max_attempts. With live_events
+    off, the in-app notifications are written without telling open streams,
+    for workers whose event backend cannot reach the web process.
+    """
+    def __init__(self, db, health_service, channels: Iterable[DeliveryChannel] = (),
+                 batch_size: int = DEFAULT_BATCH_SIZE, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 backoff_seconds: int = DEFAULT_BACKOFF_SECONDS, lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                 live_events: bool = True):
+        self.db = db
+        self.health_service = health_service
+        self.channels = list(channels)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.lease = timedelta(seconds=lease_seconds)
+        self.live_events = live_events
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def process_batch(self, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """
+        Deliver one batch of due entries. Returns (delivered, failed) counts,
+        where failed includes entries scheduled for a retry.
+        """
+        now = now or datetime.utcnow()
+        delivered = failed = 0
+        for entry in self._claim(now):
+            entry_id = entry.id
+            try:
+                self._deliver(entry, now)
+                delivered += 1
+            except Exception as e:
+                self.db.session.rollback()
+                self._record_failure(entry_id, str(e), now)
+                failed += 1
+        return delivered, failed
+
+    def run(self, interval: float, stop: Optional[threading.Event] = None):
+        """Deliver batches until stopped, waiting interval seconds whenever nothing was due."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            delivered = failed = 0
+            try:
+                delivered, failed = self.process_batch()
+            except Exception:
+                logger.exception("Notification outbox batch failed")
+            finally:
+                self.db.session.remove()
+            if not (delivered or failed):
+                stop.wait(interval)
+
+    def ensure_running(self, app, interval: float):
+        """Drain the outbox from a background thread of this process, once."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            stop = self._stop = threading.Event()
+
+            def target():
+                with app.app_context():
+                    self.run(interval, stop)
+
+            self._thread = threading.Thread(target=target, name='notification-outbox', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def pending_count(self) -> int:
+        return NotificationOutbox.query.filter(NotificationOutbox.status.in_(('pending', 'processing'))).count()
+
+    def _claim(self, now):
+        token = uuid.uuid4().hex
+        due = (
+            select(NotificationOutbox.id)
+            .where(
+                or_(NotificationOutbox.status == 'pending', NotificationOutbox.status == 'processing'),
+                NotificationOutbox.next_attempt_at <= now
+            )
+            .order_by(NotificationOutbox.id)
+            .limit(self.batch_size)
+            .scalar_subquery()
+        )
+        # The status/time condition is re-checked by the UPDATE, so two workers never claim the same row
+        self.db.session.execute(
+            update(NotificationOutbox)
+            .where(
+                NotificationOutbox.id.in_(due),
+                NotificationOutbox.next_attempt_at <= now,
+                NotificationOutbox.status.in_(('pending', 'processing'))
+            )
+            .values(status='processing', claimed_by=token, next_attempt_at=now + self.lease)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        return NotificationOutbox.query.filter_by(claimed_by=token, status='processing').order_by(NotificationOutbox.id).all()
+
+    def _deliver(self, entry, now):
+        companion_ids = self.health_service.get_alert_recipients(entry.patient_id, entry.data_type)
+        if entry.notified_at is None:
+            self.health_service.add_notifications(companion_ids, entry.message, live=self.live_events)
+            entry.notified_at = now
+            self.db.session.commit()
+
+        if companion_ids:
+            for channel in self.channels:
+                channel.send(entry, companion_ids)
+
+        entry.status = 'done'
+        entry.processed_at = now
+        entry.last_error = None
+        self.db.session.commit()
+
+    def _record_failure(self, entry_id, error, now):
+        entry = self.db.session.get(NotificationOutbox, entry_id)
+        entry.attempts += 1
+        entry.last_error = error[:255]
+        if entry.attempts >= self.max_attempts:
+            entry.status = 'failed'
+            entry.processed_at = now
+        else:
+            entry.status = 'pending'
+            delay = min(self.backoff_seconds * 2 ** (entry.attempts - 1), MAX_BACKOFF_SECONDS)
+            entry.next_attempt_at = now + timedelta(seconds=delay)
+        self.db.session.commit()
+        logger.warning("Notification outbox entry %s failed (attempt %s): %s", entry_id, entry.attempts, error)
@@ -0,0 +1,108 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# werkzeug's own default, spelled out so stored hashes can be compared against it
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+DEFAULT_SALT_LENGTH = 16
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_QUEUE_TIMEOUT = 5
+DEFAULT_MEMORY_BUDGET = 128 * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def stored_method(method: str) -> str:
+    """
+    The method prefix werkzeug writes for a configured method, which fills
+    in defaults for short forms ('scrypt' is stored as 'scrypt:32768:8:1').
+    Found by hashing once, so it follows whatever the installed werkzeug does.
+    """
+    return generate_password_hash('', method=method, salt_length=1).partition('$')[0]
+
+
+def hash_memory(method: str) -> int:
+    """Bytes one hash with the method allocates: 128 * N * r for scrypt, negligible otherwise."""
+    name, _, params = stored_method(method).partition(':')
+    if name != 'scrypt':
+        return 0
+    n, r, _ = (int(value) for value in params.split(':'))
+    return 128 * n * r
+
+
+class HasherBusy(Exception):
+    """Raised when no hashing slot frees up within the queue timeout."""
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords on a small dedicated thread pool. At most
+    max_workers hashes run at once and at most queue_size more wait for a
+    slot, so a burst of logins is held to a fixed share of the CPU and
+    callers past that fail fast instead of piling up. Only running hashes
+    hold scrypt memory, so max_workers is lowered until they fit in
+    memory_budget bytes. Hashes stored with parameters other than the
+    configured method are reported by needs_rehash, to be upgraded the
+    next time the plain password is known.
+    """
+    def __init__(self, method: str = DEFAULT_METHOD, salt_length: int = DEFAULT_SALT_LENGTH,
+                 max_workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 queue_timeout: float = DEFAULT_QUEUE_TIMEOUT, memory_budget: Optional[int] = DEFAULT_MEMORY_BUDGET):
+        self.method = method
+        self.salt_length = salt_length
+        self.queue_timeout = queue_timeout
+        self.memory_budget = memory_budget
+        self.executor = None
+        self._configure_pool(max_workers, queue_size)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', DEFAULT_SALT_LENGTH)
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT)
+        budget_mb = app.config.get('PASSWORD_HASH_MEMORY_MB')
+        self.memory_budget = budget_mb * 1024 * 1024 if budget_mb else None
+        self._configure_pool(app.config.get('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS),
+                             app.config.get('PASSWORD_HASH_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, method=self.method, salt_length=self.salt_length)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Whether the hash was made with other parameters than the configured method."""
+        method, _, rest = (password_hash or '').partition('$')
+        salt = rest.partition('$')[0]
+        return method != stored_method(self.method) or len(salt) != self.salt_length
+
+    def _configure_pool(self, max_workers, queue_size):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        per_hash = hash_memory(self.method)
+        if max_workers and self.memory_budget and per_hash:
+            # One worker always runs, even if a single hash is over budget
+            max_workers = max(1, min(max_workers, self.memory_budget // per_hash))
+        self.max_workers = max_workers
+        # max_workers=0 hashes inline, which keeps tests and scripts deterministic
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hash') if max_workers else None
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size) if max_workers else None
+
+    def _run(self, func: Callable, *args, **kwargs):
+        if self.executor is None:
+            return func(*args, **kwargs)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HasherBusy()
+        try:
+            # hashlib releases the GIL while hashing, so other requests keep running
+            return self.executor.submit(func, *args, **kwargs).result()
+        finally:
+            self._slots.release()
+
+
+# Shared by AuthService instances, which views create at import time
+password_hasher = PasswordHasher()
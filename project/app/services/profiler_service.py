@@ -0,0 +1,180 @@
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from flask import request
+
+DEFAULT_INTERVAL_MS = 20
+DEFAULT_MAX_DEPTH = 100
+UNMATCHED_ENDPOINT = 'unmatched'
+
+logger = logging.getLogger(__name__)
+
+def frame_label(frame) -> str:
+    """module:function, or file:function for code without a module, such as compiled Jinja templates."""
+    code = frame.f_code
+    module = frame.f_globals.get('__name__') or os.path.basename(code.co_filename)
+    return f'{module}:{code.co_name}'
+
+def collapse(frame, max_depth: int = DEFAULT_MAX_DEPTH) -> str:
+    """A thread's stack as one collapsed line, outermost frame first, keeping the innermost max_depth frames."""
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for request threads. A background thread wakes
+    every interval, reads the stack of each thread currently serving a
+    request and counts it under that request's endpoint; nothing is traced,
+    so the requests themselves run at full speed. Counts are written as
+    collapsed stacks, one .folded file per endpoint, for flamegraph.pl or
+    speedscope, when the dump signal arrives or every dump_interval seconds.
+    """
+    def __init__(self, interval_ms: float = DEFAULT_INTERVAL_MS, max_depth: int = DEFAULT_MAX_DEPTH,
+                 output_dir: Optional[str] = None, dump_interval: int = 0):
+        self.enabled = False
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self.output_dir = output_dir
+        self.dump_interval = dump_interval
+        self.samples_taken = 0
+        self.sampling_seconds = 0.0
+        self._active: Dict[int, str] = {}
+        self._stacks: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._dump_requested = threading.Event()
+
+    def init_app(self, app):
+        self.stop()
+        self.enabled = app.config.get('PROFILER_ENABLED', False)
+        self.interval = app.config.get('PROFILER_INTERVAL_MS', DEFAULT_INTERVAL_MS) / 1000
+        self.max_depth = app.config.get('PROFILER_MAX_DEPTH', DEFAULT_MAX_DEPTH)
+        self.output_dir = app.config.get('PROFILER_OUTPUT_DIR', self.output_dir)
+        self.dump_interval = app.config.get('PROFILER_DUMP_INTERVAL', 0)
+        self.reset()
+        app.before_request(self._enter)
+        app.teardown_request(self._exit)
+        if self.enabled:
+            self._install_signal(app.config.get('PROFILER_DUMP_SIGNAL'))
+
+    def _install_signal(self, name: Optional[str]):
+        # Handlers can only be set from the main thread, and not every platform has SIGUSR2
+        signum = getattr(signal, name, None) if name else None
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return
+        # The sampler thread writes the files, so the handler never waits on the sample lock
+        signal.signal(signum, lambda *_: self._dump_requested.set())
+
+    def _enter(self):
+        if self.enabled:
+            self._active[threading.get_ident()] = request.endpoint or UNMATCHED_ENDPOINT
+            self.ensure_running()
+
+    def _exit(self, exc=None):
+        self._active.pop(threading.get_ident(), None)
+
+    def sample(self):
+        """Count the current stack of every thread serving a request."""
+        started = time.perf_counter()
+        frames = sys._current_frames()
+        stacks = []
+        for ident, endpoint in list(self._active.items()):
+            frame = frames.get(ident)
+            if frame is not None:
+                stacks.append((endpoint, collapse(frame, self.max_depth)))
+        del frames
+        with self._lock:
+            for endpoint, stack in stacks:
+                self._stacks.setdefault(endpoint, Counter())[stack] += 1
+            self.samples_taken += len(stacks)
+            self.sampling_seconds += time.perf_counter() - started
+
+    def stacks(self) -> Dict[str, Counter]:
+        """A copy of the counts collected since the last dump or reset, by endpoint."""
+        with self._lock:
+            return {endpoint: Counter(counter) for endpoint, counter in self._stacks.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stacks = {}
+            self.samples_taken = 0
+            self.sampling_seconds = 0.0
+
+    def dump(self, output_dir: Optional[str] = None, reset: bool = True) -> List[str]:
+        """
+        Write the collected stacks under a new timestamped directory of
+        output_dir, one <endpoint>.folded file per endpoint. Returns the paths written.
+        """
+        with self._lock:
+            stacks, samples, overhead = self._stacks, self.samples_taken, self.sampling_seconds
+            if reset:
+                self._stacks, self.samples_taken, self.sampling_seconds = {}, 0, 0.0
+            else:
+                stacks = {endpoint: Counter(counter) for endpoint, counter in stacks.items()}
+        if not stacks:
+            return []
+
+        directory = os.path.join(output_dir or self.output_dir,
+                                 f'{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}')
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for endpoint, counter in sorted(stacks.items()):
+            path = os.path.join(directory, re.sub(r'[^\w.-]', '_', endpoint) + '.folded')
+            with open(path, 'w') as f:
+                for stack, count in counter.most_common():
+                    f.write(f'{stack} {count}\n')
+            paths.append(path)
+        logger.info("Wrote %d samples for %d endpoints to %s (%.1f ms spent sampling)",
+                    samples, len(paths), directory, overhead * 1000)
+        return paths
+
+    def request_dump(self):
+        """Have the sampler thread write the stacks at its next wake-up."""
+        self._dump_requested.set()
+
+    def run(self, stop: Optional[threading.Event] = None):
+        """Sample every interval until stopped, dumping when asked or every dump_interval seconds."""
+        stop = stop or threading.Event()
+        last_dump = time.monotonic()
+        while not stop.wait(self.interval):
+            try:
+                self.sample()
+                due = self.dump_interval and time.monotonic() - last_dump >= self.dump_interval
+                if self._dump_requested.is_set() or due:
+                    self._dump_requested.clear()
+                    last_dump = time.monotonic()
+                    self.dump()
+            except Exception:
+                logger.exception("Profiler sample failed")
+
+    def ensure_running(self):
+        """Start sampling in a background thread of this process, once."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self.run, args=(self._stop,), name='sampling-profiler',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+
+# Shared so the signal handler and request hooks reach the one sampler of this process
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,115 @@
+import json
+import logging
+import time
+from collections import Counter
+from typing import List, Tuple
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_REPEAT_THRESHOLD = 3
+MAX_LOGGED_STATEMENT = 300
+
+
+class QueryStats:
+    """Statements issued while serving one request, and the time spent on them."""
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        self.statements[statement] += 1
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """Identical statements run at least threshold times, most repeated first; the shape of an N+1."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+class QueryMonitor:
+    """
+    Counts the SQL each Flask request issues, through engine cursor events.
+    In debug the totals go out as response headers (and a Server-Timing
+    entry the browser dev tools show); with QUERY_STATS_LOG on, each request
+    is logged as one JSON line, at WARNING when a statement repeats often
+    enough to suggest an N+1. Statements issued outside a request, or while
+    a streamed response body is being sent, are not counted.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.headers = False
+        self.log = False
+        self.repeat_threshold = DEFAULT_REPEAT_THRESHOLD
+        self.logger = logging.getLogger('app.queries')
+
+    def init_app(self, app):
+        self.enabled = app.config.get('QUERY_STATS_ENABLED', True)
+        self.headers = app.config.get('QUERY_STATS_HEADERS', app.debug)
+        self.log = app.config.get('QUERY_STATS_LOG', False)
+        self.repeat_threshold = app.config.get('QUERY_STATS_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+        # A child of the app logger, so the lines reach Flask's handler without the app logging at INFO
+        self.logger = app.logger.getChild('queries')
+        if self.log:
+            self.logger.setLevel(logging.INFO)
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def current(self):
+        """This request's stats, or None outside a monitored request."""
+        return g.get('_query_stats') if has_request_context() else None
+
+    def _start(self):
+        if self.enabled:
+            g._query_stats = QueryStats()
+
+    def _finish(self, response):
+        stats = self.current()
+        if stats is None:
+            return response
+        repeated = stats.repeated(self.repeat_threshold)
+        if self.headers:
+            response.headers['X-Query-Count'] = str(stats.count)
+            response.headers['X-Query-Time-Ms'] = f'{stats.duration_ms:.1f}'
+            response.headers['X-Query-Repeated'] = str(sum(count - 1 for _, count in repeated))
+            response.headers.add('Server-Timing', f'db;desc="{stats.count} queries";dur={stats.duration_ms:.1f}')
+        if self.log:
+            self._log(stats, repeated, response)
+        return response
+
+    def _log(self, stats, repeated, response):
+        line = {
+            'event': 'request_sql',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(stats.duration_ms, 1),
+            'repeated': [
+                {'statement': statement[:MAX_LOGGED_STATEMENT], 'count': count} for statement, count in repeated
+            ],
+        }
+        self.logger.log(logging.WARNING if repeated else logging.INFO, json.dumps(line))
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and query_monitor.current() is not None:
+        context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    stats = query_monitor.current()
+    if started is not None and stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+# Shared so the engine listeners find the running app's settings
+query_monitor = QueryMonitor()
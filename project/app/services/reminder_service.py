@@ -0,0 +1,233 @@
+import logging
+import threading
+import time as systime
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import select
+from app.models import Medication, MedicationLog
+from app.services.event_service import event_broker
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_LEAD_MINUTES = 15
+DEFAULT_REFRESH_SECONDS = 300
+
+logger = logging.getLogger(__name__)
+
+ScheduledDose = namedtuple('ScheduledDose', ['medication_id', 'user_id', 'name', 'dosage', 'time'])
+
+def daily_doses(dose_time: time, start: datetime, end: datetime) -> Iterator[datetime]:
+    """Occurrences of a once-daily dose within [start, end], across midnight if need be."""
+    day = start.date()
+    while day <= end.date():
+        dose_at = datetime.combine(day, dose_time)
+        if start <= dose_at <= end:
+            yield dose_at
+        day += timedelta(days=1)
+
+def taken_doses(session, doses: Iterable[Tuple[int, datetime]]) -> Set[Tuple[int, object]]:
+    """
+    (medication_id, date) for each of the given doses already logged as taken
+    on its own day, in one query over just those medications.
+    """
+    doses = list(doses)
+    if not doses:
+        return set()
+    first_day = datetime.combine(min(dose_at for _, dose_at in doses).date(), time.min)
+    last_day = datetime.combine(max(dose_at for _, dose_at in doses).date(), time.min) + timedelta(days=1)
+    rows = session.execute(
+        select(MedicationLog.medication_id, MedicationLog.taken_at).where(
+            MedicationLog.medication_id.in_({medication_id for medication_id, _ in doses}),
+            MedicationLog.taken_at >= first_day,
+            MedicationLog.taken_at < last_day
+        )
+    ).all()
+    return {(medication_id, taken_at.date()) for medication_id, taken_at in rows}
+
+def reminder_payload(dose: ScheduledDose, dose_at: datetime) -> Dict:
+    return {
+        'id': dose.medication_id,
+        'name': dose.name,
+        'dosage': dose.dosage,
+        'time': dose.time.strftime('%I:%M %p'),
+        'due_at': dose_at.isoformat(timespec='minutes'),
+    }
+
+
+class ReminderWheel:
+    """
+    Every user's daily doses in one bucket per minute of the day, so the
+    doses in a time window are found by visiting that window's buckets.
+    """
+    def __init__(self):
+        self._buckets: List[Dict[int, ScheduledDose]] = [{} for _ in range(MINUTES_PER_DAY)]
+        self._slots: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def load(self, doses: Iterable[ScheduledDose]):
+        buckets = [{} for _ in range(MINUTES_PER_DAY)]
+        slots = {}
+        for dose in doses:
+            slot = dose.time.hour * 60 + dose.time.minute
+            buckets[slot][dose.medication_id] = dose
+            slots[dose.medication_id] = slot
+        with self._lock:
+            self._buckets, self._slots = buckets, slots
+
+    def add(self, dose: ScheduledDose):
+        slot = dose.time.hour * 60 + dose.time.minute
+        with self._lock:
+            self._discard(dose.medication_id)
+            self._buckets[slot][dose.medication_id] = dose
+            self._slots[dose.medication_id] = slot
+
+    def remove(self, medication_id: int):
+        with self._lock:
+            self._discard(medication_id)
+
+    def doses_between(self, start: datetime, end: datetime) -> List[Tuple[ScheduledDose, datetime]]:
+        """Doses falling in [start, end), each with the datetime it is due."""
+        due = []
+        minute = start.replace(second=0, microsecond=0)
+        while minute < end:
+            with self._lock:
+                bucket = list(self._buckets[minute.hour * 60 + minute.minute].values())
+            for dose in bucket:
+                # The bucket's own date, so a window past midnight picks tomorrow's doses
+                dose_at = datetime.combine(minute.date(), dose.time)
+                if start <= dose_at < end:
+                    due.append((dose, dose_at))
+            minute += timedelta(minutes=1)
+        return due
+
+    def _discard(self, medication_id):
+        slot = self._slots.pop(medication_id, None)
+        if slot is not None:
+            self._buckets[slot].pop(medication_id, None)
+
+
+class ReminderScheduler:
+    """
+    Publishes medication reminders for all users from one sweep a minute.
+    A reminder goes out once, when its dose comes within lead_minutes, unless
+    the dose was already logged as taken. MedicationManager keeps the wheel
+    current in this process; a periodic reload picks up changes made by
+    other processes.
+    """
+    def __init__(self, lead_minutes: int = DEFAULT_LEAD_MINUTES, refresh_seconds: int = DEFAULT_REFRESH_SECONDS,
+                 clock: Callable[[], datetime] = datetime.now):
+        self.lead = timedelta(minutes=lead_minutes)
+        self.refresh = timedelta(seconds=refresh_seconds)
+        self.clock = clock
+        self.wheel = ReminderWheel()
+        self.app = None
+        self._loaded_at: Optional[datetime] = None
+        self._swept_until: Optional[datetime] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self.in_process = False
+
+    def init_app(self, app):
+        self.stop()
+        self.app = app
+        self.lead = timedelta(minutes=app.config.get('EVENT_REMINDER_MINUTES', DEFAULT_LEAD_MINUTES))
+        self.refresh = timedelta(seconds=app.config.get('REMINDER_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS))
+        # Unset: sweep here unless the event backend carries reminders from a separate scheduler process
+        in_process = app.config.get('REMINDER_SCHEDULER_IN_PROCESS')
+        self.in_process = not event_broker.cross_process if in_process is None else in_process
+        self.wheel.load(())
+        self._loaded_at = None
+        self._swept_until = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def reload(self, db, now: Optional[datetime] = None):
+        """Rebuild the wheel from every medication in one columnar query."""
+        rows = db.session.execute(select(
+            Medication.id, Medication.user_id, Medication.name, Medication.dosage, Medication.time
+        )).all()
+        self.wheel.load(ScheduledDose(*row) for row in rows)
+        self._loaded_at = now or self.clock()
+
+    def schedule(self, medication: Medication):
+        if self.loaded:
+            self.wheel.add(ScheduledDose(medication.id, medication.user_id, medication.name,
+                                         medication.dosage, medication.time))
+
+    def unschedule(self, medication_id: int):
+        if self.loaded:
+            self.wheel.remove(medication_id)
+
+    def sweep(self, db, now: Optional[datetime] = None) -> Dict[int, List[Dict]]:
+        """
+        Reminders whose dose entered the lead window since the last sweep,
+        keyed by user. Windows are contiguous, so each dose is reminded once;
+        doses already past after a stall are skipped rather than sent late.
+        """
+        now = now or self.clock()
+        if not self.loaded or now - self._loaded_at >= self.refresh:
+            self.reload(db, now)
+
+        end = now.replace(second=0, microsecond=0) + self.lead + timedelta(minutes=1)
+        start = max(self._swept_until, now) if self._swept_until else now
+        self._swept_until = end
+        due = self.wheel.doses_between(start, end)
+
+        taken = taken_doses(db.session, ((dose.medication_id, dose_at) for dose, dose_at in due))
+        reminders: Dict[int, List[Dict]] = {}
+        for dose, dose_at in due:
+            if (dose.medication_id, dose_at.date()) not in taken:
+                reminders.setdefault(dose.user_id, []).append(reminder_payload(dose, dose_at))
+        return reminders
+
+    def publish_due(self, db, now: Optional[datetime] = None) -> int:
+        """Sweep and push each user's reminders to their event streams."""
+        reminders = self.sweep(db, now)
+        for user_id, user_reminders in reminders.items():
+            for reminder in user_reminders:
+                event_broker.publish([user_id], 'reminder', reminder)
+        return sum(len(user_reminders) for user_reminders in reminders.values())
+
+    def run(self, db, stop: Optional[threading.Event] = None):
+        """Sweep at the start of every minute until stopped."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.publish_due(db)
+            except Exception:
+                logger.exception("Reminder sweep failed")
+            finally:
+                db.session.remove()
+            stop.wait(60 - systime.time() % 60)
+
+    def ensure_running(self, db):
+        """Start the sweep in a background thread of this process, once."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        # Two streams opening at once must not start two sweeps sharing one window
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            app = self.app
+            stop = self._stop = threading.Event()
+
+            def target():
+                with app.app_context():
+                    self.run(db, stop)
+
+            self._thread = threading.Thread(target=target, name='reminder-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+
+# Shared so medication changes update the wheel the sweep reads
+reminder_scheduler = ReminderScheduler()
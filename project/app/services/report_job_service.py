@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from app.services.report_service import ReportService
+
+JOB_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+class ReportJobService:
+    """
+    Renders PDF reports on a background thread pool and keeps the finished
+    artifacts on disk until they expire. Job state is written next to the
+    artifact as JSON, so every worker process sharing the directory can
+    answer status and download requests.
+    """
+    def __init__(self, db, app, job_dir: str, ttl_seconds: int = 3600, max_workers: int = 2):
+        self.db = db
+        self.app = app
+        self.job_dir = job_dir
+        self.ttl = timedelta(seconds=ttl_seconds)
+        # max_workers=0 renders inline, which keeps tests and scripts deterministic
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-job') if max_workers else None
+
+    def submit(self, user_id: int) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Queue a PDF report for the user. Returns (success, job_id, error_message).
+        """
+        try:
+            os.makedirs(self.job_dir, exist_ok=True)
+            self.cleanup_expired()
+
+            job_id = uuid.uuid4().hex
+            self._write_job({
+                'id': job_id,
+                'user_id': user_id,
+                'status': 'pending',
+                'error': None,
+                'created_at': datetime.utcnow().isoformat(),
+                'finished_at': None,
+            })
+            if self.executor:
+                self.executor.submit(self._render, job_id, user_id)
+            else:
+                self._render(job_id, user_id)
+            return True, job_id, None
+        except Exception as e:
+            return False, None, str(e)
+
+    def get_job(self, job_id: str, user_id: int) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Look up a job owned by the user. Expired jobs are treated as missing.
+        """
+        job = self._read_job(job_id)
+        if job is None or job['user_id'] != user_id:
+            return False, None, 'Report job not found.'
+        if self._is_expired(job, datetime.utcnow()):
+            self._remove_job(job_id)
+            return False, None, 'Report job has expired.'
+        return True, job, None
+
+    def get_artifact_path(self, job_id: str, user_id: int) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Return the path of a finished report owned by the user.
+        """
+        success, job, error = self.get_job(job_id, user_id)
+        if not success:
+            return False, None, error
+        if job['status'] == 'failed':
+            return False, None, f"Report generation failed: {job['error']}"
+        if job['status'] != 'done':
+            return False, None, 'Report is not ready yet.'
+        return True, self._artifact_path(job_id), None
+
+    def cleanup_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete jobs and artifacts older than the TTL. Returns the number removed.
+        """
+        now = now or datetime.utcnow()
+        if not os.path.isdir(self.job_dir):
+            return 0
+
+        removed = 0
+        for filename in os.listdir(self.job_dir):
+            job_id, ext = os.path.splitext(filename)
+            if ext != '.json':
+                continue
+            job = self._read_job(job_id)
+            if job is None or self._is_expired(job, now):
+                self._remove_job(job_id)
+                removed += 1
+        return removed
+
+    def _render(self, job_id, user_id):
+        with self.app.app_context():
+            job = self._read_job(job_id)
+            if job is None:
+                # Expired and cleaned up before a worker reached it
+                return
+            job['status'] = 'running'
+            self._write_job(job)
+            try:
+                buffer = ReportService(self.db, user_id).generate_pdf_report()
+                tmp_path = self._artifact_path(job_id) + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(buffer.getbuffer())
+                os.replace(tmp_path, self._artifact_path(job_id))
+                job['status'] = 'done'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            job['finished_at'] = datetime.utcnow().isoformat()
+            self._write_job(job)
+
+    def _is_expired(self, job, now):
+        stamp = job.get('finished_at') or job['created_at']
+        return datetime.fromisoformat(stamp) + self.ttl < now
+
+    def _job_path(self, job_id):
+        return os.path.join(self.job_dir, f'{job_id}.json')
+
+    def _artifact_path(self, job_id):
+        return os.path.join(self.job_dir, f'{job_id}.pdf')
+
+    def _read_job(self, job_id):
+        if not JOB_ID_PATTERN.fullmatch(job_id or ''):
+            return None
+        try:
+            with open(self._job_path(job_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_job(self, job):
+        tmp_path = self._job_path(job['id']) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._job_path(job['id']))
+
+    def _remove_job(self, job_id):
+        for path in (self._artifact_path(job_id), self._job_path(job_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
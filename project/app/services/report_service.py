@@ -4,8 +4,11 @@ from datetime import datetime
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.pdfbase.pdfmetrics import stringWidth
+from sqlalchemy import select
 from app.models import GlucoseRecord, BloodPressureRecord
 
+CSV_STREAM_BATCH_SIZE = 1000
+
 class ReportService:
     def __init__(self, db, user_id):
         self.db = db
@@ -22,8 +25,8 @@ class ReportService:
         cw.writerow(['Glucose Levels'])
         cw.writerow(['Date', 'Time', 'Glucose Level (mg/dL)'])
         glucose_records = GlucoseRecord.query.filter_by(user_id=self.user_id).order_by(
-            GlucoseRecord.date.desc(),
-            GlucoseRecord.time.desc()
+            GlucoseRecord.recorded_at.desc(),
+            GlucoseRecord.id.desc()
         ).all()
         if glucose_records:
             for record in glucose_records:
@@ -42,8 +45,8 @@ class ReportService:
         cw.writerow(['Blood Pressure Levels'])
         cw.writerow(['Date', 'Time', 'Systolic (mm Hg)', 'Diastolic (mm Hg)'])
         blood_pressure_records = BloodPressureRecord.query.filter_by(user_id=self.user_id).order_by(
-            BloodPressureRecord.date.desc(),
-            BloodPressureRecord.time.desc()
+            BloodPressureRecord.recorded_at.desc(),
+            BloodPressureRecord.id.desc()
         ).all()
         if blood_pressure_records:
             for record in blood_pressure_records:
@@ -63,6 +66,60 @@ class ReportService:
 
         return output
 
+    def stream_csv_report(self, batch_size=CSV_STREAM_BATCH_SIZE):
+        """
+        Yield the same CSV report as generate_csv_report in UTF-8 encoded chunks.
+        Rows are fetched in server-side batches of batch_size, so memory use
+        stays flat no matter how much history the user has.
+        """
+        buffer = io.StringIO()
+        cw = csv.writer(buffer)
+
+        def flush():
+            chunk = buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+            return chunk
+
+        sections = [
+            (
+                ['Glucose Levels'],
+                ['Date', 'Time', 'Glucose Level (mg/dL)'],
+                select(GlucoseRecord.date, GlucoseRecord.time, GlucoseRecord.glucose_level)
+                .where(GlucoseRecord.user_id == self.user_id)
+                .order_by(GlucoseRecord.recorded_at.desc(), GlucoseRecord.id.desc()),
+                'No glucose records found.'
+            ),
+            (
+                ['Blood Pressure Levels'],
+                ['Date', 'Time', 'Systolic (mm Hg)', 'Diastolic (mm Hg)'],
+                select(BloodPressureRecord.date, BloodPressureRecord.time,
+                       BloodPressureRecord.systolic, BloodPressureRecord.diastolic)
+                .where(BloodPressureRecord.user_id == self.user_id)
+                .order_by(BloodPressureRecord.recorded_at.desc(), BloodPressureRecord.id.desc()),
+                'No blood pressure records found.'
+            ),
+        ]
+
+        for index, (title, header, statement, empty_message) in enumerate(sections):
+            if index:
+                # Add a blank row for separation
+                cw.writerow([])
+            cw.writerow(title)
+            cw.writerow(header)
+
+            result = self.db.session.execute(statement.execution_options(yield_per=batch_size))
+            found = False
+            for partition in result.partitions():
+                found = True
+                cw.writerows(partition)
+                yield flush()
+            if not found:
+                cw.writerow([empty_message])
+
+        trailer = flush()
+        if trailer:
+            yield trailer
 
     def generate_pdf_report(self):
         """
@@ -107,8 +164,8 @@ class ReportService:
         p.setFont("Helvetica", 12)
 
         glucose_records = GlucoseRecord.query.filter_by(user_id=self.user_id).order_by(
-            GlucoseRecord.date.desc(),
-            GlucoseRecord.time.desc()
+            GlucoseRecord.recorded_at.desc(),
+            GlucoseRecord.id.desc()
         ).all()
 
         if glucose_records:
@@ -134,8 +191,8 @@ class ReportService:
         p.setFont("Helvetica", 12)
 
         blood_pressure_records = BloodPressureRecord.query.filter_by(user_id=self.user_id).order_by(
-            BloodPressureRecord.date.desc(),
-            BloodPressureRecord.time.desc()
+            BloodPressureRecord.recorded_at.desc(),
+            BloodPressureRecord.id.desc()
         ).all()
 
         if blood_pressure_records:
@@ -0,0 +1,300 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models import (
+    GlucoseRecord, BloodPressureRecord, GlucoseDailyRollup, BloodPressureDailyRollup, GlucoseType, RECORD_DATE_FORMAT
+)
+
+# Inclusive mg/dL bounds of the time-in-range buckets stored on GlucoseDailyRollup
+TIME_IN_RANGE_BUCKETS = (
+    ('very_low_count', None, 53),
+    ('low_count', 54, 69),
+    ('in_range_count', 70, 180),
+    ('high_count', 181, 250),
+    ('very_high_count', 251, None),
+)
+
+# Days refreshed per statement; keeps IN lists well under SQLite's variable limit
+REFRESH_CHUNK_SIZE = 500
+
+def _day_of(model):
+    # Calendar day of the reading, taken from the normalised timestamp
+    return func.date(model.recorded_at)
+
+def _count_between(column, low, high):
+    conditions = []
+    if low is not None:
+        conditions.append(column >= low)
+    if high is not None:
+        conditions.append(column <= high)
+    return func.sum(case((and_(*conditions), 1), else_=0))
+
+def _glucose_aggregates():
+    level = GlucoseRecord.glucose_level
+    columns = {
+        'glucose_type': GlucoseRecord.glucose_type,
+        'reading_count': func.count(GlucoseRecord.id),
+        'min_level': func.min(level),
+        'max_level': func.max(level),
+        'sum_level': func.sum(level),
+    }
+    for name, low, high in TIME_IN_RANGE_BUCKETS:
+        columns[name] = _count_between(level, low, high)
+    return columns
+
+def _blood_pressure_aggregates():
+    return {
+        'reading_count': func.count(BloodPressureRecord.id),
+        'min_systolic': func.min(BloodPressureRecord.systolic),
+        'max_systolic': func.max(BloodPressureRecord.systolic),
+        'sum_systolic': func.sum(BloodPressureRecord.systolic),
+        'min_diastolic': func.min(BloodPressureRecord.diastolic),
+        'max_diastolic': func.max(BloodPressureRecord.diastolic),
+        'sum_diastolic': func.sum(BloodPressureRecord.diastolic),
+    }
+
+def _glucose_delta(reading):
+    level = reading['glucose_level']
+    delta = {
+        'glucose_type': GlucoseType(reading['glucose_type']),
+        'reading_count': 1,
+        'min_level': level,
+        'max_level': level,
+        'sum_level': level,
+    }
+    for name, low, high in TIME_IN_RANGE_BUCKETS:
+        delta[name] = int((low is None or level >= low) and (high is None or level <= high))
+    return delta
+
+def _blood_pressure_delta(reading):
+    systolic, diastolic = reading['systolic'], reading['diastolic']
+    return {
+        'reading_count': 1,
+        'min_systolic': systolic,
+        'max_systolic': systolic,
+        'sum_systolic': systolic,
+        'min_diastolic': diastolic,
+        'max_diastolic': diastolic,
+        'sum_diastolic': diastolic,
+    }
+
+def _glucose_summary(totals):
+    count = totals['reading_count'] or 0
+    if not count:
+        return {'readings': 0}
+    bands = {name.replace('_count', ''): totals[name] / count * 100 for name, _, _ in TIME_IN_RANGE_BUCKETS}
+    return {
+        'readings': count,
+        'mean': totals['sum_level'] / count,
+        'min': totals['min_level'],
+        'max': totals['max_level'],
+        'time_in_range': bands,
+        'time_below_range': bands['very_low'] + bands['low'],
+        'time_above_range': bands['high'] + bands['very_high'],
+    }
+
+def _blood_pressure_summary(totals):
+    count = totals['reading_count'] or 0
+    if not count:
+        return {'readings': 0}
+    return {
+        'readings': count,
+        'mean_systolic': totals['sum_systolic'] / count,
+        'mean_diastolic': totals['sum_diastolic'] / count,
+        'min_systolic': totals['min_systolic'],
+        'max_systolic': totals['max_systolic'],
+        'min_diastolic': totals['min_diastolic'],
+        'max_diastolic': totals['max_diastolic'],
+    }
+
+def _combine(name, current, added):
+    # Extremes keep the smaller or larger value; counts and sums add up
+    if name.startswith('min_'):
+        return func.min(current, added)
+    if name.startswith('max_'):
+        return func.max(current, added)
+    return current + added
+
+ROLLUP_KINDS = {
+    'glucose': {
+        'model': GlucoseRecord,
+        'rollup': GlucoseDailyRollup,
+        'group_by': (GlucoseRecord.glucose_type,),
+        'aggregates': _glucose_aggregates,
+        'keys': ('user_id', 'day', 'glucose_type'),
+        'values': ('reading_count', 'min_level', 'max_level', 'sum_level',
+                   *(name for name, _, _ in TIME_IN_RANGE_BUCKETS)),
+        'delta': _glucose_delta,
+        'summarize': _glucose_summary,
+    },
+    'blood_pressure': {
+        'model': BloodPressureRecord,
+        'rollup': BloodPressureDailyRollup,
+        'group_by': (),
+        'aggregates': _blood_pressure_aggregates,
+        'keys': ('user_id', 'day'),
+        'values': ('reading_count', 'min_systolic', 'max_systolic', 'sum_systolic',
+                   'min_diastolic', 'max_diastolic', 'sum_diastolic'),
+        'delta': _blood_pressure_delta,
+        'summarize': _blood_pressure_summary,
+    },
+}
+
+
+class RollupService:
+    """
+    Maintains per-user daily rollups of glucose and blood pressure readings.
+    New readings are folded into their day's row as deltas; updates and
+    deletes recompute the days they touched, since a minimum or maximum
+    cannot be taken back out. Both run inside the writer's transaction, so
+    the rollups always match the raw readings once the caller commits.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def add_readings(self, kind: str, user_id: int, readings: Iterable[Dict]):
+        """
+        Fold new readings (dicts with recorded_at and the value columns) into
+        the user's rollup rows without committing, one upsert per call.
+        """
+        spec = ROLLUP_KINDS[kind]
+        rollup, keys = spec['rollup'], spec['keys']
+        rows = {}
+        for reading in readings:
+            delta = spec['delta'](reading)
+            delta['user_id'] = user_id
+            delta['day'] = reading['recorded_at'].date()
+            key = tuple(delta[name] for name in keys)
+            row = rows.get(key)
+            if row is None:
+                rows[key] = delta
+            else:
+                for name in spec['values']:
+                    if name.startswith('min_'):
+                        row[name] = min(row[name], delta[name])
+                    elif name.startswith('max_'):
+                        row[name] = max(row[name], delta[name])
+                    else:
+                        row[name] += delta[name]
+        if not rows:
+            return
+
+        statement = sqlite_insert(rollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=[getattr(rollup, name) for name in keys],
+            set_={name: _combine(name, getattr(rollup, name), statement.excluded[name]) for name in spec['values']}
+        )
+        self.db.session.execute(statement, list(rows.values()))
+
+    def refresh_days(self, kind: str, user_id: int, days: Iterable[date]):
+        """
+        Recompute the user's rollup rows for the given days without committing.
+        """
+        spec = ROLLUP_KINDS[kind]
+        model, rollup = spec['model'], spec['rollup']
+        days = sorted(set(days))
+
+        for start in range(0, len(days), REFRESH_CHUNK_SIZE):
+            chunk = days[start:start + REFRESH_CHUNK_SIZE]
+            self.db.session.execute(
+                delete(rollup)
+                .where(rollup.user_id == user_id, rollup.day.in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            rows = self._aggregate(
+                spec,
+                model.user_id == user_id,
+                model.recorded_at >= datetime.combine(chunk[0], datetime.min.time()),
+                model.recorded_at < datetime.combine(chunk[-1] + timedelta(days=1), datetime.min.time()),
+                _day_of(model).in_([day.strftime(RECORD_DATE_FORMAT) for day in chunk]),
+            )
+            if rows:
+                self.db.session.execute(insert(rollup), rows)
+
+    def rebuild(self, user_id: Optional[int] = None) -> Tuple[bool, Optional[Dict[str, int]], Optional[str]]:
+        """
+        Recompute every rollup row from the raw readings, one user per
+        transaction. Returns (success, rows written per kind, error_message).
+        """
+        counts = {kind: 0 for kind in ROLLUP_KINDS}
+        try:
+            for kind, spec in ROLLUP_KINDS.items():
+                model, rollup = spec['model'], spec['rollup']
+                if user_id is None:
+                    user_ids = self.db.session.scalars(select(model.user_id).distinct()).all()
+                    self.db.session.execute(delete(rollup).execution_options(synchronize_session=False))
+                else:
+                    user_ids = [user_id]
+                    self.db.session.execute(
+                        delete(rollup).where(rollup.user_id == user_id).execution_options(synchronize_session=False)
+                    )
+
+                for uid in user_ids:
+                    rows = self._aggregate(spec, model.user_id == uid)
+                    if rows:
+                        self.db.session.execute(insert(rollup), rows)
+                    self.db.session.commit()
+                    counts[kind] += len(rows)
+                self.db.session.commit()
+            return True, counts, None
+        except Exception as e:
+            self.db.session.rollback()
+            return False, None, str(e)
+
+    def get_rollups(self, kind: str, user_id: int, start: Optional[date] = None,
+                    end: Optional[date] = None) -> Tuple[bool, Optional[List], Optional[str]]:
+        """
+        Rollup rows for a user, oldest day first, optionally within [start, end].
+        """
+        try:
+            rollup = ROLLUP_KINDS[kind]['rollup']
+            query = rollup.query.filter_by(user_id=user_id)
+            if start is not None:
+                query = query.filter(rollup.day >= start)
+            if end is not None:
+                query = query.filter(rollup.day <= end)
+            return True, query.order_by(rollup.day, rollup.id).all(), None
+        except Exception as e:
+            return False, None, str(e)
+
+    def get_summary(self, kind: str, user_id: int, start: Optional[date] = None,
+                    end: Optional[date] = None) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Totals for a user's readings on days within [start, end], read from
+        the rollup rows in one query however many readings there are.
+        """
+        try:
+            spec = ROLLUP_KINDS[kind]
+            rollup = spec['rollup']
+            columns = []
+            for name in spec['values']:
+                column = getattr(rollup, name)
+                total = func.min if name.startswith('min_') else func.max if name.startswith('max_') else func.sum
+                columns.append(total(column).label(name))
+            statement = select(*columns).where(rollup.user_id == user_id)
+            if start is not None:
+                statement = statement.where(rollup.day >= start)
+            if end is not None:
+                statement = statement.where(rollup.day <= end)
+            totals = self.db.session.execute(statement).mappings().one()
+            return True, spec['summarize'](totals), None
+        except Exception as e:
+            return False, None, str(e)
+
+    def _aggregate(self, spec, *criteria):
+        model = spec['model']
+        aggregates = spec['aggregates']()
+        day = _day_of(model)
+        statement = (
+            select(model.user_id, day.label('day'), *(column.label(name) for name, column in aggregates.items()))
+            .where(*criteria)
+            .group_by(model.user_id, day, *spec['group_by'])
+        )
+        rows = []
+        for row in self.db.session.execute(statement).mappings():
+            values = {name: row[name] for name in aggregates}
+            values['user_id'] = row['user_id']
+            values['day'] = row['day'] if isinstance(row['day'], date) else datetime.strptime(row['day'], RECORD_DATE_FORMAT).date()
+            rows.append(values)
+        return rows
@@ -0,0 +1,222 @@
+import random
+from datetime import datetime, time, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import func, insert, select
+from app.models import (
+    User, CompanionAccess, Medication, MedicationLog, Notification, GlucoseRecord, BloodPressureRecord,
+    GlucoseType, RECORD_DATE_FORMAT
+)
+from app.services.alert_service import glucose_alert_message, blood_pressure_alert_message
+from app.services.health_service import (
+    MIN_GLUCOSE, MAX_GLUCOSE, MIN_SYSTOLIC, MAX_SYSTOLIC, MIN_DIASTOLIC, MAX_DIASTOLIC
+)
+from app.services.password_service import PasswordHasher, password_hasher
+
+DEFAULT_BATCH_SIZE = 20000
+MINUTES_PER_DAY = 24 * 60
+
+MEDICATION_NAMES = ('Metformin', 'Insulin glargine', 'Insulin lispro', 'Sitagliptin', 'Empagliflozin',
+                    'Lisinopril', 'Amlodipine', 'Atorvastatin', 'Aspirin', 'Losartan')
+MEDICATION_TIMES = (time(7, 0), time(8, 0), time(12, 30), time(18, 0), time(20, 0), time(22, 0))
+DOSAGES = ('5 mg', '10 mg', '20 mg', '500 mg', '1000 mg', '10 units', '20 units')
+# (value, weight) per access column, roughly the mix companions are granted in practice
+ACCESS_WEIGHTS = (('VIEW', 6), ('EDIT', 2), ('NONE', 2))
+
+# Formatted once; strftime per reading would dominate generation time
+MINUTE_STRINGS = [f'{minute // 60:02d}:{minute % 60:02d}' for minute in range(MINUTES_PER_DAY)]
+
+def _clamp(value, low, high):
+    return max(low, min(high, int(value)))
+
+def _batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class SeedService:
+    """
+    Fills the database with a synthetic, production-sized population:
+    patients with readings, medications and dose logs, and companions with
+    links and notifications. Rows are generated lazily and written with Core
+    executemany inserts, batch_size rows per transaction, with ids assigned
+    up front so dependent rows never wait on a flush. The same random_seed
+    always produces the same data.
+    """
+    def __init__(self, db, rollup_service, batch_size: int = DEFAULT_BATCH_SIZE, random_seed: int = 42,
+                 hasher: Optional[PasswordHasher] = None):
+        self.db = db
+        self.rollup_service = rollup_service
+        self.batch_size = batch_size
+        self.random_seed = random_seed
+        self.hasher = hasher or password_hasher
+
+    def seed(self, patients: int, companions: int, days: int = 365, readings_per_day: int = 4,
+             medications: int = 3, links_per_companion: int = 3, notifications_per_companion: int = 50,
+             adherence: float = 0.85, password: str = 'password123',
+             end: Optional[datetime] = None) -> Tuple[bool, Optional[Dict[str, int]], Optional[str]]:
+        """
+        Generate and insert the population, then rebuild the daily rollups.
+        Readings cover the `days` days up to `end` (default: now).
+        Returns (success, rows inserted per table, error_message).
+        """
+        rng = random.Random(self.random_seed)
+        end = end or datetime.now()
+        first_day = (end - timedelta(days=days - 1)).date()
+        day_list = [first_day + timedelta(days=i) for i in range(days)]
+        counts = {}
+        try:
+            # One hash for every account, made with the configured parameters so logins never rehash
+            password_hash = self.hasher.hash(password)
+            user_base = self._next_id(User)
+            patient_ids = list(range(user_base, user_base + patients))
+            companion_ids = list(range(user_base + patients, user_base + patients + companions))
+
+            counts['users'] = self._insert(User, self._users(patient_ids, companion_ids, password_hash))
+            counts['companion_access'] = self._insert(
+                CompanionAccess, self._links(rng, patient_ids, companion_ids, links_per_companion)
+            )
+
+            medication_rows = self._medications(rng, patient_ids, medications, self._next_id(Medication))
+            counts['medications'] = self._insert(Medication, medication_rows)
+            counts['medication_logs'] = self._insert(
+                MedicationLog, self._medication_logs(rng, medication_rows, day_list, adherence, end)
+            )
+
+            counts['glucose_records'] = self._insert(
+                GlucoseRecord, self._readings(rng, patient_ids, day_list, readings_per_day, end, self._glucose_row)
+            )
+            counts['blood_pressure_records'] = self._insert(
+                BloodPressureRecord,
+                self._readings(rng, patient_ids, day_list, readings_per_day, end, self._blood_pressure_row)
+            )
+            counts['notifications'] = self._insert(
+                Notification, self._notifications(rng, companion_ids, notifications_per_companion, first_day, end)
+            )
+        except Exception as e:
+            self.db.session.rollback()
+            return False, counts, str(e)
+
+        success, rollups, error = self.rollup_service.rebuild()
+        if not success:
+            return False, counts, f"Rollup rebuild failed: {error}"
+        counts['glucose_daily_rollups'] = rollups['glucose']
+        counts['blood_pressure_daily_rollups'] = rollups['blood_pressure']
+        return True, counts, None
+
+    def _next_id(self, model) -> int:
+        return (self.db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+    def _insert(self, model, rows: Iterable[Dict]) -> int:
+        table = model.__table__
+        inserted = 0
+        for batch in _batches(rows, self.batch_size):
+            self.db.session.execute(insert(table), batch)
+            self.db.session.commit()
+            inserted += len(batch)
+        return inserted
+
+    def _users(self, patient_ids, companion_ids, password_hash):
+        for user_type, ids in (('PATIENT', patient_ids), ('COMPANION', companion_ids)):
+            prefix = user_type.lower()
+            for user_id in ids:
+                yield {
+                    'id': user_id,
+                    'username': f'{prefix}{user_id}',
+                    'email': f'{prefix}{user_id}@seed.example.com',
+                    'password_hash': password_hash,
+                    'user_type': user_type,
+                    'version': 1,
+                }
+
+    def _links(self, rng, patient_ids, companion_ids, links_per_companion):
+        levels, weights = zip(*ACCESS_WEIGHTS)
+        for companion_id in companion_ids:
+            for patient_id in rng.sample(patient_ids, min(links_per_companion, len(patient_ids))):
+                medication, glucose, blood_pressure = rng.choices(levels, weights, k=3)
+                yield {
+                    'patient_id': patient_id,
+                    'companion_id': companion_id,
+                    'medication_access': medication,
+                    'glucose_access': glucose,
+                    'blood_pressure_access': blood_pressure,
+                    'export_access': rng.random() < 0.3,
+                }
+
+    def _medications(self, rng, patient_ids, per_patient, first_id) -> List[Dict]:
+        rows = []
+        for patient_id in patient_ids:
+            for name, dose_time in zip(rng.sample(MEDICATION_NAMES, min(per_patient, len(MEDICATION_NAMES))),
+                                       rng.choices(MEDICATION_TIMES, k=per_patient)):
+                rows.append({
+                    'id': first_id + len(rows),
+                    'name': name,
+                    'dosage': rng.choice(DOSAGES),
+                    'frequency': 'daily',
+                    'time': dose_time,
+                    'user_id': patient_id,
+                })
+        return rows
+
+    def _medication_logs(self, rng, medication_rows, day_list, adherence, end):
+        for medication in medication_rows:
+            for day in day_list:
+                if rng.random() < adherence:
+                    taken_at = datetime.combine(day, medication['time']) + timedelta(minutes=rng.randint(-20, 45))
+                    if taken_at <= end:
+                        yield {'medication_id': medication['id'], 'user_id': medication['user_id'], 'taken_at': taken_at}
+
+    def _readings(self, rng, patient_ids, day_list, per_day, end, make_row):
+        # Distinct minutes per day, so no two readings of a patient share a timestamp
+        per_day = min(per_day, MINUTES_PER_DAY)
+        for patient_id in patient_ids:
+            for day in day_list:
+                day_string = day.strftime(RECORD_DATE_FORMAT)
+                midnight = datetime.combine(day, time.min)
+                for minute in sorted(rng.sample(range(MINUTES_PER_DAY), per_day)):
+                    recorded_at = midnight + timedelta(minutes=minute)
+                    if recorded_at > end:
+                        break
+                    row = make_row(rng, minute)
+                    row.update(user_id=patient_id, date=day_string, time=MINUTE_STRINGS[minute],
+                               recorded_at=recorded_at)
+                    yield row
+
+    @staticmethod
+    def _glucose_row(rng, minute):
+        # Mornings are fasting readings, the rest of the day follows meals
+        if minute < 10 * 60:
+            return {'glucose_type': GlucoseType.FASTING,
+                    'glucose_level': _clamp(rng.gauss(115, 25), MIN_GLUCOSE, MAX_GLUCOSE)}
+        return {'glucose_type': GlucoseType.POSTPRANDIAL,
+                'glucose_level': _clamp(rng.gauss(155, 40), MIN_GLUCOSE, MAX_GLUCOSE)}
+
+    @staticmethod
+    def _blood_pressure_row(rng, minute):
+        return {'systolic': _clamp(rng.gauss(128, 16), MIN_SYSTOLIC, MAX_SYSTOLIC),
+                'diastolic': _clamp(rng.gauss(82, 10), MIN_DIASTOLIC, MAX_DIASTOLIC)}
+
+    def _notifications(self, rng, companion_ids, per_companion, first_day, end):
+        start = datetime.combine(first_day, time.min)
+        span = max(int((end - start).total_seconds()), 1)
+        for companion_id in companion_ids:
+            for _ in range(per_companion):
+                timestamp = start + timedelta(seconds=rng.randrange(span))
+                if rng.random() < 0.6:
+                    glucose_type = rng.choice(('fasting_glucose', 'postprandial_glucose'))
+                    level, severity = rng.choice(((rng.randint(50, 69), 'Low'), (rng.randint(181, 250), 'High'),
+                                                  (rng.randint(251, 350), 'Critical High')))
+                    message = glucose_alert_message(glucose_type, level, severity)
+                else:
+                    message = blood_pressure_alert_message(rng.randint(140, 190), rng.randint(90, 120), 'High', None)
+                yield {
+                    'user_id': companion_id,
+                    'message': message,
+                    'timestamp': timestamp,
+                    # Older alerts have mostly been read
+                    'is_read': (end - timestamp).days > 2 and rng.random() < 0.9,
+                }
@@ -0,0 +1,50 @@
+import time
+from flask import Blueprint, Response, current_app, stream_with_context
+from flask_login import login_required, current_user
+from app.extensions import db
+from app.services.event_service import event_broker, format_sse
+from app.services.reminder_service import reminder_scheduler
+
+events = Blueprint('events', __name__)
+
+RECONNECT_MS = 5000
+
+@events.route('/events/stream')
+@login_required
+def stream():
+    """
+    Server-Sent Events for the logged-in user: new companion notifications
+    and medication reminders, replacing per-tab polling.
+    """
+    user_id = current_user.id
+    heartbeat = current_app.config['EVENT_STREAM_HEARTBEAT']
+    max_age = current_app.config['EVENT_STREAM_MAX_AGE']
+    if reminder_scheduler.in_process:
+        reminder_scheduler.ensure_running(db)
+
+    # Each open stream holds a worker thread, so one user's tabs cannot take them all
+    subscription = event_broker.subscribe(user_id, current_app.config['EVENT_STREAM_MAX_PER_USER'])
+    if subscription is None:
+        return Response("Too many open event streams.", status=429, mimetype='text/plain')
+
+    def generate():
+        try:
+            yield f"retry: {RECONNECT_MS}\n\n"
+            # Streams end after max_age so the browser reconnects and workers can recycle
+            deadline = time.monotonic() + max_age
+            while time.monotonic() < deadline:
+                event = subscription.get(heartbeat)
+                yield format_sse(event) if event else ": keep-alive\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    # The stream keeps this request's context open for up to max_age; give its pooled connection back now
+    db.session.remove()
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Also covers clients that disconnect before the first chunk is sent
+    response.call_on_close(lambda: event_broker.unsubscribe(subscription))
+    return response
@@ -1,11 +1,33 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app
+from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app, jsonify, abort
 from flask_login import login_required, current_user
 from app.models import GlucoseType
 from app.models import GlucoseRecord, BloodPressureRecord, CompanionAccess, User, Notification
 from app.extensions import db
+from app.services.chart_service import CHART_KINDS, MIN_CHART_POINTS
+from datetime import datetime, timedelta
 
 health = Blueprint('health', __name__)
 
+def get_page_args():
+    """
+    Read keyset pagination arguments from the query string.
+    """
+    page_size = request.args.get('page_size', current_app.config['RECORDS_PAGE_SIZE'], type=int)
+    page_size = max(1, min(page_size, current_app.config['RECORDS_MAX_PAGE_SIZE']))
+    direction = 'prev' if request.args.get('direction') == 'prev' else 'next'
+    return request.args.get('cursor'), direction, page_size
+
+def get_date_range_args():
+    """
+    Read optional 'start'/'end' dates (YYYY-MM-DD, inclusive) from the query
+    string as a [start, end) datetime range. Raises ValueError if malformed.
+    """
+    start = request.args.get('start')
+    end = request.args.get('end')
+    start = datetime.strptime(start, '%Y-%m-%d') if start else None
+    end = datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1) if end else None
+    return start, end
+
 @health.route('/health-logger')
 @login_required
 def health_logger():
@@ -51,12 +73,22 @@ def glucose_logger():
 @login_required
 def glucose_records():
     """
-    Route for viewing all glucose records.
+    Route for viewing glucose records one page at a time.
     """
     health_service = current_app.health_service
-    success, records, error = health_service.get_glucose_records(current_user.id)
+    cursor, direction, page_size = get_page_args()
+    success, page, error = health_service.get_glucose_records_page(
+        current_user.id,
+        cursor=cursor,
+        direction=direction,
+        page_size=page_size
+    )
     if success:
-        return render_template('pages/glucose_records.html', records=records)
+        return render_template('pages/glucose_records.html',
+                               records=page['records'],
+                               next_cursor=page['next_cursor'],
+                               prev_cursor=page['prev_cursor'],
+                               page_size=page_size)
     else:
         flash(f'Error retrieving records: {error}', 'danger')
         return redirect(url_for('pages.home'))
@@ -67,11 +99,13 @@ def edit_glucose_record(record_id):
     """
     Route for editing an existing glucose record.
     """
-    record = GlucoseRecord.query.get_or_404(record_id)
-
-    # Check permissions
+    # The record and the user's access to it come from one query, reused by the update
     health_service = current_app.health_service
-    if not health_service.glucose_manager.has_permission(record, current_user.id):
+    loaded = health_service.get_authorized_record('glucose', record_id, current_user.id)
+    if loaded is None:
+        abort(404)
+    record = loaded.record
+    if not loaded.can_edit:
         flash('You do not have permission to edit this record.', 'danger')
         return redirect(url_for('health.glucose_records'))
 
@@ -96,7 +130,8 @@ def edit_glucose_record(record_id):
             glucose_level=glucose_level,
             glucose_type=glucose_type,
             date=date,
-            time=time
+            time=time,
+            loaded=loaded
         )
 
         if success:
@@ -170,12 +205,22 @@ def blood_pressure_logger():
 @login_required
 def blood_pressure_records():
     """
-    Route for viewing all blood pressure records.
+    Route for viewing blood pressure records one page at a time.
     """
     health_service = current_app.health_service
-    success, records, error = health_service.get_blood_pressure_records(current_user.id)
+    cursor, direction, page_size = get_page_args()
+    success, page, error = health_service.get_blood_pressure_records_page(
+        current_user.id,
+        cursor=cursor,
+        direction=direction,
+        page_size=page_size
+    )
     if success:
-        return render_template('pages/blood_pressure_records.html', records=records)
+        return render_template('pages/blood_pressure_records.html',
+                               records=page['records'],
+                               next_cursor=page['next_cursor'],
+                               prev_cursor=page['prev_cursor'],
+                               page_size=page_size)
     else:
         flash(f'Error retrieving records: {error}', 'danger')
         return redirect(url_for('pages.home'))
@@ -186,11 +231,13 @@ def edit_blood_pressure_record(record_id):
     """
     Route for editing an existing blood pressure record.
     """
-    record = BloodPressureRecord.query.get_or_404(record_id)
-
-    # Check permissions
+    # The record and the user's access to it come from one query, reused by the update
     health_service = current_app.health_service
-    if not health_service.blood_pressure_manager.has_permission(record, current_user.id):
+    loaded = health_service.get_authorized_record('blood_pressure', record_id, current_user.id)
+    if loaded is None:
+        abort(404)
+    record = loaded.record
+    if not loaded.can_edit:
         flash('You do not have permission to edit this record.', 'danger')
         return redirect(url_for('health.blood_pressure_records'))
 
@@ -210,7 +257,8 @@ def edit_blood_pressure_record(record_id):
             systolic=systolic,
             diastolic=diastolic,
             date=date,
-            time=time
+            time=time,
+            loaded=loaded
         )
 
         # For 'blood_pressure', expect {'systolic': int, 'diastolic': int}.
@@ -248,3 +296,133 @@ def delete_blood_pressure_record(record_id):
     if current_user.user_type == 'COMPANION':
         return redirect(url_for('companion.view_patient_data', patient_id=current_user.id))
     return redirect(url_for('health.blood_pressure_records'))
+
+@health.route('/health/import', methods=['POST'])
+@login_required
+def import_readings():
+    """
+    API route for bulk importing readings for the current user.
+    Accepts a JSON body or a CSV/JSON file upload in the 'file' field;
+    the reading kind comes from the 'kind' argument or JSON body.
+    """
+    if current_user.user_type != 'PATIENT':
+        return jsonify({'success': False, 'error': 'Only patients can import readings.'}), 403
+    kind = request.args.get('kind') or request.form.get('kind')
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        if not kind and isinstance(payload, dict):
+            kind = payload.get('kind')
+        content, fmt = request.get_data(), 'json'
+    else:
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            return jsonify({'success': False, 'error': 'No file uploaded.'}), 400
+        fmt = 'json' if upload.filename.lower().endswith('.json') else 'csv'
+        content = upload.read()
+
+    success, summary, error = current_app.import_service.import_file(current_user.id, kind, content, fmt)
+    if summary is None:
+        return jsonify({'success': False, 'error': error}), 400
+    return jsonify({'success': success, 'error': error, **summary}), 200 if success else 500
+
+@health.route('/health/insights')
+@login_required
+def visual_insights():
+    """
+    Render the insight charts; the series are fetched from chart_data.
+    """
+    return render_template('pages/visual_insights.html')
+
+@health.route('/health/insights/summary')
+@login_required
+def insights_summary():
+    """
+    API route returning the current user's glucose and blood pressure totals
+    for the insight cards, read from the daily rollups. Accepts the same
+    optional 'start'/'end' dates as chart_data.
+    """
+    try:
+        start, end = get_date_range_args()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Dates must use the YYYY-MM-DD format.'}), 400
+
+    first_day = start.date() if start else None
+    last_day = (end - timedelta(days=1)).date() if end else None
+    rollup_service = current_app.health_service.rollup_service
+    summary = {}
+    for kind in ('glucose', 'blood_pressure'):
+        success, summary[kind], error = rollup_service.get_summary(kind, current_user.id, first_day, last_day)
+        if not success:
+            return jsonify({'success': False, 'error': error}), 500
+    return jsonify({'success': True, **summary})
+
+@health.route('/health/insights/metrics')
+@login_required
+def insights_metrics():
+    """
+    API route returning the current user's glycemic indicators (GMI, eA1c,
+    variability and MAGE) over the same optional 'start'/'end' dates.
+    """
+    try:
+        start, end = get_date_range_args()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Dates must use the YYYY-MM-DD format.'}), 400
+
+    success, metrics, error = current_app.analytics_service.get_glucose_metrics(current_user.id, start, end)
+    if not success:
+        return jsonify({'success': False, 'error': error}), 500
+    return jsonify({'success': True, 'glucose': metrics})
+
+@health.route('/health/chart-data/<kind>')
+@login_required
+def chart_data(kind):
+    """
+    API route returning a downsampled glucose or blood pressure series for
+    the current user. Accepts optional 'start'/'end' dates (YYYY-MM-DD,
+    inclusive) and a 'points' target.
+    """
+    try:
+        start, end = get_date_range_args()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Dates must use the YYYY-MM-DD format.'}), 400
+
+    points = request.args.get('points', current_app.config['CHART_DEFAULT_POINTS'], type=int)
+    points = max(MIN_CHART_POINTS, min(points, current_app.config['CHART_MAX_POINTS']))
+
+    if kind not in CHART_KINDS:
+        return jsonify({'success': False, 'error': f'Unknown chart kind: {kind}'}), 404
+    success, data, error = current_app.chart_service.get_series(current_user.id, kind, start, end, points)
+    if not success:
+        return jsonify({'success': False, 'error': error}), 500
+    return jsonify({'success': True, 'points': points, **data})
+
+@health.route('/health/alert-thresholds', methods=['GET', 'POST'])
+@login_required
+def alert_thresholds():
+    """
+    API route for reading and changing the current patient's alert targets.
+    POST a JSON body with 'metric' and either the four limits
+    (severe_low, low, high, severe_high) or 'reset': true.
+    """
+    if current_user.user_type != 'PATIENT':
+        return jsonify({'success': False, 'error': 'Only patients have alert targets.'}), 403
+
+    service = current_app.alert_threshold_service
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or {}
+        metric = payload.get('metric')
+        if payload.get('reset'):
+            success, error = service.reset_thresholds(current_user.id, metric)
+        else:
+            try:
+                limits = [int(payload[key]) for key in ('severe_low', 'low', 'high', 'severe_high')]
+            except (KeyError, TypeError, ValueError):
+                return jsonify({'success': False, 'error': 'severe_low, low, high and severe_high must be integers.'}), 400
+            success, error = service.set_thresholds(current_user.id, metric, *limits)
+        if not success:
+            return jsonify({'success': False, 'error': error}), 400
+
+    success, thresholds, error = service.get_thresholds(current_user.id)
+    if not success:
+        return jsonify({'success': False, 'error': error}), 500
+    return jsonify({'success': True, 'thresholds': thresholds})
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, redirect, url_for, send_file, flash
+from flask import Blueprint, render_template, redirect, url_for, send_file, flash, current_app, Response, stream_with_context, request, jsonify
 from flask_login import login_required, current_user
 from datetime import datetime
 from app.services.report_service import ReportService
@@ -9,17 +9,24 @@ report = Blueprint('report', __name__)
 @report.route('/health-reports', methods=['GET', 'POST'])
 @login_required
 def health_reports():
-    return render_template('pages/health_reports.html')
+    return render_template('pages/health_reports.html', job_id=request.args.get('job_id'))
 
 @report.route('/export/csv', methods=['POST'])
 @login_required
 def export_csv():
     try:
         report_service = ReportService(db, current_user.id)
-        output = report_service.generate_csv_report()
-
         csv_filename = f"health_report_{datetime.now().strftime('%Y%m%d')}.csv"
 
+        if current_app.config['CSV_EXPORT_STREAMING']:
+            chunks = report_service.stream_csv_report(batch_size=current_app.config['CSV_EXPORT_BATCH_SIZE'])
+            return Response(
+                stream_with_context(chunks),
+                mimetype='text/csv',
+                headers={'Content-Disposition': f'attachment; filename={csv_filename}'}
+            )
+
+        output = report_service.generate_csv_report()
         return send_file(
             output,
             as_attachment=True,
@@ -33,6 +40,14 @@ def export_csv():
 @report.route('/export/pdf', methods=['POST'])
 @login_required
 def export_pdf():
+    if current_app.config['REPORT_JOBS_ENABLED']:
+        success, job_id, error = current_app.report_job_service.submit(current_user.id)
+        if not success:
+            flash(f'Error generating PDF report: {error}', 'danger')
+            return redirect(url_for('report.health_reports'))
+        flash('Your PDF report is being generated. The download will start when it is ready.', 'info')
+        return redirect(url_for('report.health_reports', job_id=job_id))
+
     try:
         report_service = ReportService(db, current_user.id)
         buffer = report_service.generate_pdf_report()
@@ -47,4 +62,32 @@ def export_pdf():
         )
     except Exception as e:
         flash(f'Error generating PDF report: {str(e)}', 'danger')
-        return redirect(url_for('report.health_reports'))
\ No newline at end of file
+        return redirect(url_for('report.health_reports'))
+
+@report.route('/export/pdf/jobs/<job_id>')
+@login_required
+def pdf_job_status(job_id):
+    success, job, error = current_app.report_job_service.get_job(job_id, current_user.id)
+    if not success:
+        return jsonify({'error': error}), 404
+
+    payload = {'id': job['id'], 'status': job['status'], 'error': job['error']}
+    if job['status'] == 'done':
+        payload['download_url'] = url_for('report.download_pdf_job', job_id=job_id)
+    return jsonify(payload)
+
+@report.route('/export/pdf/jobs/<job_id>/download')
+@login_required
+def download_pdf_job(job_id):
+    success, path, error = current_app.report_job_service.get_artifact_path(job_id, current_user.id)
+    if not success:
+        flash(error, 'danger')
+        return redirect(url_for('report.health_reports'))
+
+    pdf_filename = f"health_report_{datetime.now().strftime('%Y%m%d')}.pdf"
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=pdf_filename,
+        mimetype='application/pdf'
+    )
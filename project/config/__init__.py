@@ -11,25 +11,135 @@ class Config:
     STATIC_FOLDER = 'static'
     STATIC_URL_PATH = '/static'
     TEMPLATE_FOLDER = 'templates'
+    # Health record listings
+    RECORDS_PAGE_SIZE = int(os.environ.get('RECORDS_PAGE_SIZE', 50))
+    RECORDS_MAX_PAGE_SIZE = 200
+    # Bulk reading import
+    IMPORT_BATCH_SIZE = 1000
+    IMPORT_MAX_ROWS = 100000
+    # Synthetic data from `python manage.py seed`
+    SEED_BATCH_SIZE = 20000
+    # Reports
+    CSV_EXPORT_STREAMING = True
+    CSV_EXPORT_BATCH_SIZE = 1000
+    REPORT_JOBS_ENABLED = True
+    REPORT_JOB_DIR = os.environ.get('REPORT_JOB_DIR', os.path.join(ROOT_DIR, 'report_jobs'))
+    REPORT_JOB_TTL = 3600  # seconds a finished PDF stays downloadable
+    REPORT_JOB_WORKERS = 2
+    # Insight charts
+    CHART_DEFAULT_POINTS = 500
+    CHART_MAX_POINTS = 2000
+    # Companion alert rules
+    ALERT_THRESHOLD_CACHE_TTL = 300  # seconds compiled per-patient rules are reused
+    # Notification outbox: alerts are queued with the reading and delivered in the background by
+    # `python manage.py notification-worker`, or by a thread of the web process with
+    # NOTIFICATION_WORKER_IN_PROCESS=1. Off: written inline.
+    NOTIFICATION_OUTBOX_ENABLED = os.environ.get('NOTIFICATION_OUTBOX_ENABLED', '0') == '1'
+    NOTIFICATION_WORKER_IN_PROCESS = os.environ.get('NOTIFICATION_WORKER_IN_PROCESS', '0') == '1'
+    NOTIFICATION_CHANNELS = ['app.services.outbox_service.LogChannel']
+    NOTIFICATION_BATCH_SIZE = 100
+    NOTIFICATION_MAX_ATTEMPTS = 5
+    NOTIFICATION_BACKOFF_SECONDS = 30  # doubled after each failed attempt
+    NOTIFICATION_WORKER_INTERVAL = 2  # seconds the worker sleeps when the outbox is empty
+    # Live event stream (Server-Sent Events); use RedisBackend when running more than one process
+    EVENT_BACKEND = os.environ.get('EVENT_BACKEND', 'app.services.event_service.LocalBackend')
+    EVENT_BACKEND_URL = os.environ.get('EVENT_BACKEND_URL')  # e.g. redis://localhost:6379/0
+    EVENT_QUEUE_SIZE = 100  # events buffered per open stream
+    EVENT_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+    EVENT_STREAM_MAX_AGE = 3600  # seconds before the browser is made to reconnect
+    EVENT_STREAM_MAX_PER_USER = 5  # open streams (tabs) per user and web process; more get a 429
+    EVENT_REMINDER_MINUTES = 15  # how far ahead medication reminders are pushed
+    # Medication reminders are swept by a thread of the web process, unless EVENT_BACKEND reaches
+    # other processes and `python manage.py reminder-scheduler` runs instead; set to force either way
+    REMINDER_SCHEDULER_IN_PROCESS = {'1': True, '0': False}.get(os.environ.get('REMINDER_SCHEDULER_IN_PROCESS'))
+    REMINDER_REFRESH_SECONDS = 300  # full reload picking up medication changes from other processes
+    # Companion access grants
+    ACCESS_CACHE_TTL = 60  # seconds another process may keep using a changed grant
+    ACCESS_CACHE_SIZE = 10000  # (patient, companion) pairs kept across requests
+    # Logged-in user identity handed to each request by the user_loader
+    IDENTITY_CACHE_TTL = 300  # seconds another process may keep using a changed username/user_type
+    IDENTITY_CACHE_SIZE = 10000
+    # Password hashing; stored hashes made with other parameters are upgraded at next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_SALT_LENGTH = 16
+    # Running scrypt hashes each hold 128 * N * r bytes (32 MB with the default method). Workers are
+    # capped at PASSWORD_HASH_MEMORY_MB / that size, so with the defaults 4 hashes use 128 MB per process.
+    # Waiting logins hold a gthread thread but no hash memory; keep WORKERS + QUEUE_SIZE well under
+    # WEB_THREADS so a login burst cannot occupy every thread.
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))  # hashes run at once, per process
+    PASSWORD_HASH_MEMORY_MB = int(os.environ.get('PASSWORD_HASH_MEMORY_MB', 128))  # per process
+    PASSWORD_HASH_QUEUE_SIZE = 32  # logins allowed to wait for a free hashing slot
+    PASSWORD_HASH_QUEUE_TIMEOUT = 5  # seconds a login waits before being asked to retry
+    # Per-request SQL statistics: response headers (debug) and one JSON log line per request
+    QUERY_STATS_ENABLED = True
+    QUERY_STATS_HEADERS = False
+    QUERY_STATS_LOG = False
+    QUERY_STATS_REPEAT_THRESHOLD = 3  # identical statements in one request flagged as a likely N+1
+    # Sampling profiler of request threads; collapsed stacks per endpoint go to PROFILER_OUTPUT_DIR
+    # on `kill -USR2 <pid>` or every PROFILER_DUMP_INTERVAL seconds (0: only on the signal)
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '0') == '1'
+    PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', 20))  # time between samples
+    PROFILER_MAX_DEPTH = 100  # innermost frames kept per stack
+    PROFILER_OUTPUT_DIR = os.environ.get('PROFILER_OUTPUT_DIR', os.path.join(ROOT_DIR, 'profiles'))
+    PROFILER_DUMP_SIGNAL = 'SIGUSR2'
+    PROFILER_DUMP_INTERVAL = int(os.environ.get('PROFILER_DUMP_INTERVAL', 0))
+    # Navbar badge counts
+    BADGE_COUNT_TTL = 30  # seconds before a cached count is reloaded
+    # SQLite engine profile, applied to each new connection when SQLITE_TUNING is on
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', '0') == '1'
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',        # readers no longer block on the writer
+        'synchronous': 'NORMAL',      # safe with WAL, avoids an fsync per commit
+        'busy_timeout': 5000,         # ms to wait for a lock before "database is locked"
+        'mmap_size': 268435456,       # 256 MB memory-mapped reads
+        'cache_size': -65536,         # 64 MB page cache (negative means KiB)
+        'temp_store': 'MEMORY',
+    }
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
     DEBUG = False
+    REPORT_JOB_WORKERS = 0
+    PASSWORD_HASH_WORKERS = 0
+    NOTIFICATION_OUTBOX_ENABLED = False
+    REMINDER_SCHEDULER_IN_PROCESS = False
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    QUERY_STATS_HEADERS = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(ROOT_DIR, 'dev_database.db')
 
+class LoadTestConfig(Config):
+    # Production-like settings against a throwaway database, for tests/load
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'LOADTEST_DATABASE_URI', 'sqlite:///' + os.path.join(ROOT_DIR, 'loadtest.db'))
+    SQLITE_TUNING = True
+    NOTIFICATION_OUTBOX_ENABLED = True
+    # The harness serves a single process, so it delivers its own alerts
+    NOTIFICATION_WORKER_IN_PROCESS = True
+    REPORT_JOB_DIR = os.path.join(ROOT_DIR, 'report_jobs', 'loadtest')
+
 class ProductionConfig(Config):
-    pass
+    NOTIFICATION_OUTBOX_ENABLED = os.environ.get('NOTIFICATION_OUTBOX_ENABLED', '1') == '1'
+    QUERY_STATS_LOG = os.environ.get('QUERY_STATS_LOG', '1') == '1'
+    # Opt out with SQLITE_TUNING=0, e.g. when the database lives on a network filesystem
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', '1') == '1'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    }
 
 # Dictionary mapping config names to config classes
 CONFIG = {
     'development': DevelopmentConfig,
     'testing': TestingConfig,
     'production': ProductionConfig,
+    'loadtest': LoadTestConfig,
     'default': DevelopmentConfig
 }
 
@@ -1,8 +1,14 @@
 import click
 import os
+import time
 from flask.cli import FlaskGroup
 from app import create_app
 from app.extensions import db
+from app.models import User
+from app.services.import_service import ImportService
+from app.services.seed_service import SeedService
+from app.services.event_service import event_broker
+from app.services.reminder_service import reminder_scheduler
 
 def get_app():
     return create_app('development')
@@ -15,6 +21,15 @@ def ensure_db_directory_exists(app):
     if not os.path.exists(db_path):
         os.makedirs(db_path)
 
+def require_cross_process_events(what):
+    """Refuse to run a background process whose live events could not reach the web process's streams."""
+    if not event_broker.cross_process:
+        raise click.ClickException(
+            f"EVENT_BACKEND only delivers within one process, so {what} sent from here would never reach "
+            f"an open page. The web process handles them itself; run this command only with a "
+            f"cross-process backend such as RedisBackend."
+        )
+
 @cli.command("init-db")
 def init_db():
     """Initialize the database."""
@@ -39,5 +54,150 @@ def reset_db():
             # Print the database location for verification
             click.echo(f"Database reset at: {app.config['SQLALCHEMY_DATABASE_URI']}")
 
+@cli.command("import-readings")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--email", required=True, help="Email of the patient the readings belong to.")
+@click.option("--kind", type=click.Choice(['glucose', 'blood_pressure']), required=True)
+@click.option("--batch-size", type=int, default=None, help="Rows inserted per transaction.")
+def import_readings(path, email, kind, batch_size):
+    """Bulk import glucose or blood pressure readings from a CSV or JSON file."""
+    app = get_app()
+    with app.app_context():
+        user = User.query.filter_by(email=email, user_type='PATIENT').first()
+        if not user:
+            raise click.ClickException(f"No patient account found for {email}.")
+
+        import_service = ImportService(
+            db,
+            app.health_service,
+            batch_size=batch_size or app.config['IMPORT_BATCH_SIZE'],
+            max_rows=app.config['IMPORT_MAX_ROWS']
+        )
+        fmt = 'json' if path.lower().endswith('.json') else 'csv'
+        with open(path, 'rb') as f:
+            success, summary, error = import_service.import_file(user.id, kind, f.read(), fmt)
+
+        if summary is None:
+            raise click.ClickException(error)
+        click.echo(f"Imported {summary['imported']} of {summary['received']} readings "
+                   f"({summary['duplicates']} duplicates, {summary['invalid']} invalid, "
+                   f"{summary['alerts']} companion alerts).")
+        for row_error in summary['errors']:
+            click.echo(f"  row {row_error['row']}: {row_error['error']}")
+        if not success:
+            raise click.ClickException(f"Import stopped: {error}")
+
+@cli.command("seed")
+@click.option("--patients", type=int, default=1000, show_default=True)
+@click.option("--companions", type=int, default=250, show_default=True)
+@click.option("--days", type=int, default=365, show_default=True, help="Days of history per patient.")
+@click.option("--readings-per-day", type=int, default=4, show_default=True,
+              help="Glucose and blood pressure readings per patient per day, each.")
+@click.option("--medications", type=int, default=3, show_default=True, help="Daily medications per patient.")
+@click.option("--links", type=int, default=3, show_default=True, help="Patients linked to each companion.")
+@click.option("--notifications", type=int, default=50, show_default=True, help="Alerts per companion.")
+@click.option("--password", default='password123', show_default=True, help="Password of every seeded account.")
+@click.option("--seed", "random_seed", type=int, default=42, show_default=True, help="Same seed, same data.")
+@click.option("--batch-size", type=int, default=None, help="Rows inserted per transaction.")
+def seed(patients, companions, days, readings_per_day, medications, links, notifications, password,
+         random_seed, batch_size):
+    """Generate a production-sized synthetic population for performance work."""
+    app = get_app()
+    with app.app_context():
+        seed_service = SeedService(
+            db,
+            app.health_service.rollup_service,
+            batch_size=batch_size or app.config['SEED_BATCH_SIZE'],
+            random_seed=random_seed
+        )
+        started = time.monotonic()
+        success, counts, error = seed_service.seed(
+            patients=patients,
+            companions=companions,
+            days=days,
+            readings_per_day=readings_per_day,
+            medications=medications,
+            links_per_companion=links,
+            notifications_per_companion=notifications,
+            password=password
+        )
+        for table, count in counts.items():
+            click.echo(f"  {table}: {count}")
+        if not success:
+            raise click.ClickException(f"Seeding failed: {error}")
+        click.echo(f"Seeded {sum(counts.values())} rows in {time.monotonic() - started:.1f}s.")
+
+@cli.command("cleanup-reports")
+def cleanup_reports():
+    """Delete expired background PDF report artifacts."""
+    app = get_app()
+    with app.app_context():
+        removed = app.report_job_service.cleanup_expired()
+        click.echo(f"Removed {removed} expired report job(s) from {app.config['REPORT_JOB_DIR']}.")
+
+@cli.command("rebuild-rollups")
+@click.option("--email", default=None, help="Only rebuild this patient's rollups.")
+def rebuild_rollups(email):
+    """Recompute the daily glucose and blood pressure rollups from raw readings."""
+    app = get_app()
+    with app.app_context():
+        user_id = None
+        if email:
+            user = User.query.filter_by(email=email, user_type='PATIENT').first()
+            if not user:
+                raise click.ClickException(f"No patient account found for {email}.")
+            user_id = user.id
+
+        success, counts, error = app.health_service.rollup_service.rebuild(user_id)
+        if not success:
+            raise click.ClickException(f"Rebuild failed: {error}")
+        click.echo(f"Rebuilt {counts['glucose']} glucose and "
+                   f"{counts['blood_pressure']} blood pressure daily rollup rows.")
+
+@cli.command("notification-worker")
+@click.option("--once", is_flag=True, help="Drain the outbox and exit instead of polling.")
+@click.option("--interval", type=float, default=None, help="Seconds to sleep when the outbox is empty.")
+def notification_worker(once, interval):
+    """Deliver queued companion alerts from the notification outbox."""
+    app = get_app()
+    with app.app_context():
+        outbox = app.outbox_service
+        # Notifications are stored either way; only the live push needs to reach the web process
+        outbox.live_events = event_broker.cross_process
+        if not outbox.live_events:
+            click.echo("EVENT_BACKEND only delivers within one process; companions will see "
+                       "new alerts on their next page load.")
+        interval = interval if interval is not None else app.config['NOTIFICATION_WORKER_INTERVAL']
+        click.echo(f"Notification worker started ({outbox.pending_count()} queued).")
+        try:
+            while True:
+                delivered, failed = outbox.process_batch()
+                if delivered or failed:
+                    click.echo(f"Delivered {delivered} alert(s), {failed} failed.")
+                elif once:
+                    break
+                else:
+                    time.sleep(interval)
+                db.session.remove()
+        except KeyboardInterrupt:
+            click.echo("Notification worker stopped.")
+
+@cli.command("reminder-scheduler")
+@click.option("--once", is_flag=True, help="Run a single sweep and exit.")
+def reminder_scheduler_command(once):
+    """Push medication reminders to users' event streams, sweeping once a minute."""
+    app = get_app()
+    require_cross_process_events('reminders')
+    with app.app_context():
+        if once:
+            sent = reminder_scheduler.publish_due(db)
+            click.echo(f"Sent {sent} reminder(s).")
+            return
+        click.echo("Reminder scheduler started.")
+        try:
+            reminder_scheduler.run(db)
+        except KeyboardInterrupt:
+            click.echo("Reminder scheduler stopped.")
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""add recorded_at timestamp and per-user indexes to health records
+
+Revision ID: 3f1c2a9d7b10
+Revises:
+Create Date: 2026-10-16 09:12:44.118402
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+HEALTH_TABLES = ('glucose_records', 'blood_pressure_records')
+BACKFILL_BATCH_SIZE = 5000
+TIME_FORMATS = ('%H:%M', '%H:%M:%S')
+
+
+def _parse_recorded_at(date_str, time_str):
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(f"{date_str} {time_str}", f"%Y-%m-%d {time_format}")
+        except (TypeError, ValueError):
+            continue
+    raise ValueError(f"Cannot backfill recorded_at from date={date_str!r} time={time_str!r}")
+
+
+def _backfill(connection, table_name):
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column('date', sa.String),
+        sa.column('time', sa.String),
+        sa.column('recorded_at', sa.DateTime),
+    )
+    update = (
+        table.update()
+        .where(table.c.id == sa.bindparam('row_id'))
+        .values(recorded_at=sa.bindparam('row_recorded_at'))
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, table.c.date, table.c.time)
+            .where(table.c.id > last_id, table.c.recorded_at.is_(None))
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(update, [
+            {'row_id': row.id, 'row_recorded_at': _parse_recorded_at(row.date, row.time)}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade():
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    for table_name in HEALTH_TABLES:
+        columns = {column['name'] for column in inspector.get_columns(table_name)}
+        if 'recorded_at' not in columns:
+            with op.batch_alter_table(table_name) as batch_op:
+                batch_op.add_column(sa.Column('recorded_at', sa.DateTime(), nullable=True))
+
+        _backfill(connection, table_name)
+
+        indexes = {index['name'] for index in inspector.get_indexes(table_name)}
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column('recorded_at', existing_type=sa.DateTime(), nullable=False)
+            if f'ix_{table_name}_recorded_at' not in indexes:
+                batch_op.create_index(f'ix_{table_name}_recorded_at', ['recorded_at'])
+            if f'ix_{table_name}_user_recorded_at' not in indexes:
+                batch_op.create_index(f'ix_{table_name}_user_recorded_at', ['user_id', 'recorded_at'])
+
+
+def downgrade():
+    for table_name in HEALTH_TABLES:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_index(f'ix_{table_name}_user_recorded_at')
+            batch_op.drop_index(f'ix_{table_name}_recorded_at')
+            batch_op.drop_column('recorded_at')
@@ -0,0 +1,29 @@
+"""add (medication_id, taken_at) index to medication logs
+
+Revision ID: 8b2e4d6f1a3c
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-16 11:03:27.541936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f1a3c'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_medication_logs_medication_taken_at'
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    indexes = {index['name'] for index in inspector.get_indexes('medication_logs')}
+    if INDEX_NAME not in indexes:
+        op.create_index(INDEX_NAME, 'medication_logs', ['medication_id', 'taken_at'])
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name='medication_logs')
@@ -0,0 +1,26 @@
+"""add user version stamp
+
+Revision ID: a7c2e5f9b314
+Revises: f3b8c1d4e7a5
+Create Date: 2026-10-17 02:41:08.215734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e5f9b314'
+down_revision = 'f3b8c1d4e7a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('version')
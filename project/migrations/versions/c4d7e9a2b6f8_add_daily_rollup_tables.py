@@ -0,0 +1,60 @@
+"""add daily glucose and blood pressure rollup tables
+
+Revision ID: c4d7e9a2b6f8
+Revises: 8b2e4d6f1a3c
+Create Date: 2026-10-16 13:41:08.270519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7e9a2b6f8'
+down_revision = '8b2e4d6f1a3c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'glucose_daily_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('glucose_type', sa.Enum('FASTING', 'POSTPRANDIAL', name='glucosetype', native_enum=False), nullable=False),
+        sa.Column('reading_count', sa.Integer(), nullable=False),
+        sa.Column('min_level', sa.Integer(), nullable=False),
+        sa.Column('max_level', sa.Integer(), nullable=False),
+        sa.Column('sum_level', sa.Integer(), nullable=False),
+        sa.Column('very_low_count', sa.Integer(), nullable=False),
+        sa.Column('low_count', sa.Integer(), nullable=False),
+        sa.Column('in_range_count', sa.Integer(), nullable=False),
+        sa.Column('high_count', sa.Integer(), nullable=False),
+        sa.Column('very_high_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', 'glucose_type', name='uix_glucose_rollup_user_day_type'),
+    )
+    op.create_table(
+        'blood_pressure_daily_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('reading_count', sa.Integer(), nullable=False),
+        sa.Column('min_systolic', sa.Integer(), nullable=False),
+        sa.Column('max_systolic', sa.Integer(), nullable=False),
+        sa.Column('sum_systolic', sa.Integer(), nullable=False),
+        sa.Column('min_diastolic', sa.Integer(), nullable=False),
+        sa.Column('max_diastolic', sa.Integer(), nullable=False),
+        sa.Column('sum_diastolic', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', name='uix_blood_pressure_rollup_user_day'),
+    )
+    # Existing readings are rolled up with `python manage.py rebuild-rollups`
+
+
+def downgrade():
+    op.drop_table('blood_pressure_daily_rollups')
+    op.drop_table('glucose_daily_rollups')
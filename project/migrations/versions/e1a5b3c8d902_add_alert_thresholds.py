@@ -0,0 +1,36 @@
+"""add per-patient alert thresholds
+
+Revision ID: e1a5b3c8d902
+Revises: c4d7e9a2b6f8
+Create Date: 2026-10-17 00:12:53.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1a5b3c8d902'
+down_revision = 'c4d7e9a2b6f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'alert_thresholds',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sa.String(length=30), nullable=False),
+        sa.Column('severe_low', sa.Integer(), nullable=False),
+        sa.Column('low', sa.Integer(), nullable=False),
+        sa.Column('high', sa.Integer(), nullable=False),
+        sa.Column('severe_high', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'metric', name='uix_alert_threshold_user_metric'),
+    )
+
+
+def downgrade():
+    op.drop_table('alert_thresholds')
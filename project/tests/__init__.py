@@ -14,9 +14,24 @@ from tests.unit.services.test_medication_manager import TestMedicationManager
 from tests.unit.services.test_auth_service import TestAuthService
 from tests.unit.services.test_companion_service import TestCompanionService
 from tests.unit.services.test_connection_service import TestConnectionService
+from tests.unit.services.test_import_service import TestImportService
+from tests.unit.services.test_report_job_service import TestReportJobService
+from tests.unit.services.test_badge_service import TestBadgeCounter
+from tests.unit.services.test_rollup_service import TestRollupService
+from tests.unit.services.test_chart_service import TestChartService
+from tests.unit.services.test_analytics_service import TestAnalyticsService
+from tests.unit.services.test_alert_service import TestAlertThresholds
+from tests.unit.services.test_outbox_service import TestNotificationOutbox
+from tests.unit.services.test_event_service import TestEventBroker
+from tests.unit.services.test_reminder_service import TestReminderScheduler
+from tests.unit.services.test_access_service import TestAccessCache
+from tests.unit.services.test_identity_service import TestIdentityCache
+from tests.unit.services.test_seed_service import TestSeedService
+from tests.unit.services.test_query_stats_service import TestQueryMonitor
+from tests.unit.services.test_profiler_service import TestSamplingProfiler
 
 # Model Tests
-from tests.unit.models.test_models import TestUserModel, TestNotificationModel
+from tests.unit.models.test_models import TestUserModel, TestNotificationModel, TestSqliteEngineProfile
 from tests.unit.models.test_medication import TestMedicationModel
 from tests.unit.models.test_health import TestHealthModel
 # from tests.unit.models.test_companion import TestCompanionModel
@@ -38,10 +53,26 @@ def create_test_suite():
     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAuthService))
     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCompanionService))
     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestConnectionService))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestImportService))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestReportJobService))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestBadgeCounter))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRollupService))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestChartService))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAnalyticsService))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAlertThresholds))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestNotificationOutbox))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestEventBroker))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestReminderScheduler))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAccessCache))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestIdentityCache))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSeedService))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestQueryMonitor))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSamplingProfiler))
     
     # Add Model Tests
     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestUserModel))
     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestNotificationModel))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSqliteEngineProfile))
     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestMedicationModel))
     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestHealthModel))
     # suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCompanionModel))
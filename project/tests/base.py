@@ -1,9 +1,12 @@
 # tests/base.py
+import time as clock
 import unittest
+from contextlib import contextmanager
 from datetime import time
 from app import create_app
 from app.extensions import db
 from app.models import User, Medication
+from app.services.query_stats_service import QueryStats
 from typing import Optional
 from sqlalchemy import event
 
@@ -69,4 +72,35 @@ class BaseTestCase(unittest.TestCase):
         )
         db.session.add(medication)
         db.session.commit()
-        return medication
\ No newline at end of file
+        return medication
+
+    @contextmanager
+    def assertMaxQueries(self, limit: int):
+        """Fail if the block issues more than limit SQL statements; yields the QueryStats collected."""
+        stats = QueryStats()
+
+        def before(conn, cursor, statement, parameters, context, executemany):
+            context._test_query_started = clock.perf_counter()
+
+        def after(conn, cursor, statement, parameters, context, executemany):
+            stats.record(statement, clock.perf_counter() - context._test_query_started)
+
+        event.listen(db.engine, 'before_cursor_execute', before)
+        event.listen(db.engine, 'after_cursor_execute', after)
+        try:
+            yield stats
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before)
+            event.remove(db.engine, 'after_cursor_execute', after)
+        if stats.count > limit:
+            repeated = '\n'.join(f'  {count}x {statement}' for statement, count in stats.repeated())
+            self.fail(f"{stats.count} queries, expected at most {limit}"
+                      + (f"; repeated statements:\n{repeated}" if repeated else ""))
+
+    def assertRouteMaxQueries(self, limit: int, url: str, method: str = 'get', **kwargs):
+        """Request url through the test client and fail if serving it took more than limit statements."""
+        # A fresh session, as a real request gets, so nothing is served from the identity map
+        db.session.remove()
+        with self.assertMaxQueries(limit):
+            response = getattr(self.client, method)(url, **kwargs)
+        return response
@@ -0,0 +1,2 @@
+# tests/benchmarks: service-layer benchmarks gated on baseline.json, run with `python -m tests.benchmarks.runner`.
+# Modules here are deliberately not named test_*.py so unit test discovery skips them.
@@ -0,0 +1,164 @@
+"""
+Service-layer benchmarks with a stored baseline. Every benchmark in
+tests/benchmarks/suite.py runs at each data size against a file-backed
+SQLite database; its best and median times and the SQL statements each
+call issues are recorded, and compared with baseline.json.
+
+    python -m tests.benchmarks.runner --check            # exit 1 on regression
+    python -m tests.benchmarks.runner --update-baseline  # accept current numbers
+
+A benchmark regresses when it issues more statements than its baseline (an
+N+1 shows up here first, whatever the machine) or when its best time
+exceeds the baseline's by more than --threshold and --min-delta-ms. The
+best of several calls is compared rather than the median because noise
+from the rest of the machine only ever adds time.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+import sqlalchemy
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from tests.benchmarks.suite import BENCHMARKS, SIZES, choose_subjects
+from tests.load.dataset import seed
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 2.0
+
+
+def measure(call, repeat: int) -> Dict:
+    """Median and best wall time of call over repeat runs, after one warm-up, and its statement count."""
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    db.session.remove()
+    call()
+    timings = []
+    for _ in range(repeat):
+        # A fresh session per call, as each request gets, so the identity map hides nothing
+        db.session.remove()
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+        try:
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_statement)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'queries': len(statements),
+    }
+
+
+def run(sizes: List[str], names: List[str], repeat: int) -> Dict:
+    app = create_app('loadtest')
+    results: Dict[str, Dict[str, Dict]] = {name: {} for name in names}
+    for size_name in sizes:
+        size = SIZES[size_name]
+        print(f"Seeding '{size_name}': {size.patients} patients, {size.days} days of history...", flush=True)
+        seed(app, patients=size.patients, companions=size.companions, days=size.days,
+             readings_per_day=size.readings_per_day)
+        subjects = choose_subjects(app)
+        with app.app_context():
+            for name in names:
+                results[name][size_name] = measure(BENCHMARKS[name](subjects), repeat)
+                row = results[name][size_name]
+                print(f"  {name:<42}{row['min_ms']:>10.2f} ms best{row['median_ms']:>10.2f} ms median"
+                      f"{row['queries']:>6} queries", flush=True)
+            db.session.remove()
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'machine': platform.machine(),
+            'repeat': repeat,
+            'sizes': {size_name: SIZES[size_name]._asdict() for size_name in sizes},
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """Regressions of the current run against the baseline, as human-readable lines."""
+    regressions = []
+    for name, by_size in current['results'].items():
+        for size_name, row in by_size.items():
+            base = baseline.get('results', {}).get(name, {}).get(size_name)
+            if base is None:
+                continue
+            if row['queries'] > base['queries']:
+                regressions.append(f"{name} [{size_name}]: {row['queries']} queries, baseline {base['queries']}")
+            limit = base['min_ms'] * (1 + threshold)
+            if row['min_ms'] > limit and row['min_ms'] - base['min_ms'] > min_delta_ms:
+                regressions.append(f"{name} [{size_name}]: {row['min_ms']:.2f} ms, baseline "
+                                   f"{base['min_ms']:.2f} ms (+{row['min_ms'] / base['min_ms'] - 1:.0%})")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(SIZES), help="Comma-separated data sizes to run.")
+    parser.add_argument('--only', default=None, help="Comma-separated benchmark names to run.")
+    parser.add_argument('--repeat', type=int, default=7, help="Timed calls per benchmark and size.")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--output', default=None, help="Also write this run's results to this file.")
+    parser.add_argument('--check', action='store_true', help="Exit 1 if anything regressed against the baseline.")
+    parser.add_argument('--update-baseline', action='store_true', help="Store this run as the new baseline.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative slowdown of the best time.")
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Slowdowns smaller than this are treated as noise.")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    sizes = [size for size in args.sizes.split(',') if size]
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [size for size in sizes if size not in SIZES] + [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown size or benchmark: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    current = run(sizes, names, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}.")
+        return 0
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --update-baseline first.", file=sys.stderr)
+            return 2
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), args.threshold, args.min_delta_ms)
+        if regressions:
+            print("Regressions against the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
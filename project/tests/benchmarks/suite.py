@@ -0,0 +1,104 @@
+"""
+Benchmarks of the hot service methods. Each benchmark is set up against a
+seeded population and returns the call to be timed; the runner times it
+and counts the SQL statements it issues.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from itertools import count
+from sqlalchemy import select, update
+from app.extensions import db
+from app.models import CompanionAccess
+from app.services.companion_service import CompanionManager
+from app.services.health_service import HealthService
+from app.services.medication_service import ScheduleManager
+from app.services.report_service import ReportService
+
+# Data sizes are days of history per patient; the population around them stays the same
+Size = namedtuple('Size', ['patients', 'companions', 'days', 'readings_per_day'])
+SIZES = {
+    'small': Size(patients=20, companions=10, days=30, readings_per_day=4),
+    'medium': Size(patients=20, companions=10, days=180, readings_per_day=4),
+    'large': Size(patients=20, companions=10, days=730, readings_per_day=4),
+}
+
+# The accounts every benchmark works on: a patient and a companion with full access to them
+Subjects = namedtuple('Subjects', ['app', 'patient_id', 'companion_id'])
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def choose_subjects(app) -> Subjects:
+    """Give the first companion link full access and benchmark that pair."""
+    with app.app_context():
+        link_id, patient_id, companion_id = db.session.execute(
+            select(CompanionAccess.id, CompanionAccess.patient_id, CompanionAccess.companion_id)
+            .order_by(CompanionAccess.id).limit(1)
+        ).one()
+        db.session.execute(update(CompanionAccess).where(CompanionAccess.id == link_id).values(
+            medication_access='VIEW', glucose_access='VIEW', blood_pressure_access='VIEW', export_access=True
+        ))
+        db.session.commit()
+        return Subjects(app, patient_id, companion_id)
+
+
+@benchmark('GlucoseManager.get_glucose_records')
+def get_glucose_records(subjects):
+    manager = subjects.app.health_service.glucose_manager
+    return lambda: manager.get_glucose_records(subjects.patient_id)
+
+
+@benchmark('GlucoseManager.add_glucose_record')
+def add_glucose_record(subjects):
+    manager = subjects.app.health_service.glucose_manager
+    # Each call logs a new minute well before the seeded history, so none is a duplicate
+    moments = (datetime(2000, 1, 1) + timedelta(minutes=i) for i in count())
+
+    def call():
+        moment = next(moments)
+        return manager.add_glucose_record(subjects.patient_id, 260, 'POSTPRANDIAL',
+                                          moment.strftime('%Y-%m-%d'), moment.strftime('%H:%M'))
+    return call
+
+
+@benchmark('HealthService.notify_companions')
+def notify_companions(subjects):
+    # The direct fan-out path; with the outbox on this only queues one row
+    service = HealthService(db, use_outbox=False)
+
+    def call():
+        try:
+            return service.notify_companions(subjects.patient_id, 'postprandial_glucose', {'glucose_level': 260})
+        finally:
+            db.session.rollback()
+    return call
+
+
+@benchmark('ScheduleManager.get_daily_medications')
+def get_daily_medications(subjects):
+    manager = ScheduleManager(db)
+    return lambda: manager.get_daily_medications(subjects.patient_id)
+
+
+@benchmark('CompanionManager.get_patient_data')
+def get_patient_data(subjects):
+    manager = CompanionManager(db)
+    return lambda: manager.get_patient_data(subjects.companion_id, subjects.patient_id)
+
+
+@benchmark('ReportService.generate_csv_report')
+def generate_csv_report(subjects):
+    service = ReportService(db, subjects.patient_id)
+    return lambda: service.generate_csv_report().getvalue()
+
+
+@benchmark('ReportService.generate_pdf_report')
+def generate_pdf_report(subjects):
+    service = ReportService(db, subjects.patient_id)
+    return lambda: service.generate_pdf_report().getvalue()
@@ -137,4 +137,56 @@ class TestHealthRoutes(BaseTestCase):
             mock_query.get_or_404.return_value = mock_record
             
             response = self.client.get('/blood_pressure/edit/1')
-            self.assertEqual(response.status_code, 200)
\ No newline at end of file
+            self.assertEqual(response.status_code, 200)
+
+    def test_edit_records_post_updates_and_warns(self):
+        """Test POSTing an edit updates the record and flashes the companion alert"""
+        from app.extensions import db
+        from app.models import CompanionAccess, GlucoseRecord, BloodPressureRecord, GlucoseType
+        patient_id = self.test_user.id
+        companion = self.create_test_user('companion@test.com', 'COMPANION')
+        db.session.add(CompanionAccess(patient_id=patient_id, companion_id=companion.id, medication_access='VIEW',
+                                       glucose_access='VIEW', blood_pressure_access='VIEW'))
+        db.session.commit()
+        health_service = self.app.health_service
+        glucose = health_service.add_glucose_record(patient_id, 110, GlucoseType.FASTING, '2024-01-01', '08:00')[1]
+        pressure = health_service.add_blood_pressure_record(patient_id, 120, 80, '2024-01-01', '08:00')[1]
+        glucose_id, pressure_id = glucose.id, pressure.id
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(patient_id)
+
+        response = self.client.post(f'/glucose/edit/{glucose_id}', data={
+            'glucose_level': '300', 'glucose_type': 'FASTING', 'date': '2024-01-01', 'time': '08:00'
+        })
+        self.assertEqual(response.status_code, 302)
+        with self.client.session_transaction() as session:
+            messages = [message for _, message in session.get('_flashes', [])]
+        self.assertIn('Glucose record updated successfully!', messages)
+        self.assertTrue(any(message.startswith('DANGER!!!') for message in messages))
+
+        response = self.client.post(f'/blood_pressure/edit/{pressure_id}', data={
+            'systolic': '125', 'diastolic': '82', 'date': '2024-01-01', 'time': '08:00'
+        })
+        self.assertEqual(response.status_code, 302)
+
+        db.session.expire_all()
+        self.assertEqual(db.session.get(GlucoseRecord, glucose_id).glucose_level, 300)
+        self.assertEqual(db.session.get(BloodPressureRecord, pressure_id).systolic, 125)
+
+    def test_logger_post_rejected_readings_show_error(self):
+        """Test out-of-range and duplicate readings re-render the logger with the error"""
+        self.app.health_service.add_blood_pressure_record(self.test_user.id, 120, 80, '2024-01-01', '08:00')
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.test_user.id)
+
+        response = self.client.post('/glucose/logger', data={
+            'glucose_level': '20', 'glucose_type': 'FASTING', 'date': '2024-01-01', 'time': '08:00'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Error adding glucose record: Glucose level must be between', response.data)
+
+        response = self.client.post('/blood_pressure/logger', data={
+            'systolic': '125', 'diastolic': '82', 'date': '2024-01-01', 'time': '08:00'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'already exists', response.data)
@@ -0,0 +1,2 @@
+# tests/load: throughput and latency harness, run with `python -m tests.load.harness`.
+# Modules here are deliberately not named test_*.py so unit test discovery skips them.
@@ -0,0 +1,46 @@
+"""
+Seeded population for load tests: patients with readings and medications,
+and companions linked to them, generated by SeedService.
+"""
+from collections import namedtuple
+from sqlalchemy import select
+from app.extensions import db
+from app.models import User, CompanionAccess
+from app.services.seed_service import SeedService
+
+PASSWORD = 'loadtest123'
+
+Population = namedtuple('Population', ['patients', 'companions', 'links'])
+Account = namedtuple('Account', ['id', 'email', 'user_type'])
+
+
+def seed(app, patients: int = 50, companions: int = 20, days: int = 90, readings_per_day: int = 4,
+         medications: int = 3, links_per_companion: int = 3, random_seed: int = 42) -> Population:
+    """Create a fresh schema, populate it and return the accounts clients log in as."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        seed_service = SeedService(db, app.health_service.rollup_service,
+                                   batch_size=app.config['SEED_BATCH_SIZE'], random_seed=random_seed)
+        success, counts, error = seed_service.seed(
+            patients=patients,
+            companions=companions,
+            days=days,
+            readings_per_day=readings_per_day,
+            medications=medications,
+            links_per_companion=links_per_companion,
+            password=PASSWORD
+        )
+        if not success:
+            raise RuntimeError(f"Seeding failed: {error}")
+
+        accounts = [Account(*row) for row in db.session.execute(
+            select(User.id, User.email, User.user_type).order_by(User.id)
+        )]
+        links = db.session.execute(select(CompanionAccess.patient_id, CompanionAccess.companion_id)).all()
+        return Population(
+            patients=[account for account in accounts if account.user_type == 'PATIENT'],
+            companions=[account for account in accounts if account.user_type == 'COMPANION'],
+            links=[tuple(link) for link in links]
+        )
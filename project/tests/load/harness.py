@@ -0,0 +1,260 @@
+"""
+HTTP load test: seeds a throwaway database, serves the app on a local port
+and drives it with concurrent clients that log in and mix the traffic real
+patients and companions generate. Reports latency percentiles and
+throughput per route.
+
+    python -m tests.load.harness --patients 50 --clients 16 --duration 30
+
+Pass --url to drive a server started separately (e.g. gunicorn with
+FLASK_CONFIG=loadtest) against the same LOADTEST_DATABASE_URI.
+"""
+import argparse
+import http.client
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+from werkzeug.serving import make_server
+from app import create_app
+from tests.load.dataset import PASSWORD, seed
+
+CSRF_PATTERN = re.compile(r'name="csrf_token"[^>]*value="([^"]*)"')
+
+Sample = namedtuple('Sample', ['route', 'status', 'elapsed'])
+
+
+class Client:
+    """One simulated browser: a keep-alive connection and its session cookie."""
+    def __init__(self, base_url: str, samples: List[Sample], timeout: float = 30):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+        self.cookies = SimpleCookie()
+        self.samples = samples
+
+    def request(self, route: str, method: str, path: str, form: Optional[Dict] = None):
+        headers = {}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{key}={morsel.value}' for key, morsel in self.cookies.items())
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            # Read streamed bodies (CSV exports) to the end, as a browser would
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.samples.append(Sample(route, 0, time.perf_counter() - started))
+            return 0, b''
+        self.samples.append(Sample(route, response.status, time.perf_counter() - started))
+
+        for header in response.headers.get_all('Set-Cookie') or ():
+            self.cookies.load(header)
+        return response.status, content
+
+    def login(self, email: str, user_type: str) -> bool:
+        status, page = self.request('login_form', 'GET', '/login')
+        match = CSRF_PATTERN.search(page.decode('utf-8', 'replace'))
+        form = {'email': email, 'password': PASSWORD, 'user_type': user_type}
+        if match:
+            form['csrf_token'] = match.group(1)
+        status, _ = self.request('login', 'POST', '/login', form)
+        return status == 302
+
+    def close(self):
+        self.connection.close()
+
+
+def log_glucose(client, rng, account, population):
+    now = datetime.now()
+    client.request('log_glucose', 'POST', '/glucose/logger', {
+        'glucose_level': rng.randrange(70, 250),
+        'glucose_type': rng.choice(('FASTING', 'POSTPRANDIAL')),
+        'date': now.strftime('%Y-%m-%d'),
+        'time': now.strftime('%H:%M'),
+    })
+
+
+def view_linked_patient(client, rng, account, population):
+    patient_ids = population['patients_of'].get(account.id)
+    if patient_ids:
+        client.request('companion_patient', 'GET', f'/companion/patient/{rng.choice(patient_ids)}')
+
+
+def _get(route, path):
+    return lambda client, rng, account, population: client.request(route, 'GET', path)
+
+
+def _post(route, path):
+    return lambda client, rng, account, population: client.request(route, 'POST', path, {})
+
+
+# (weight, action) per user type; weights are relative within a type
+PATIENT_MIX = [
+    (25, _get('medications_daily', '/medications/daily')),
+    (15, _get('check_reminders', '/medications/check-reminders')),
+    (20, _get('glucose_records', '/glucose/records')),
+    (10, _get('blood_pressure_records', '/blood_pressure/records')),
+    (10, log_glucose),
+    (8, _get('medication_schedule', '/medication-schedule')),
+    (5, _get('chart_data', '/health/chart-data/glucose')),
+    (4, _post('export_csv', '/export/csv')),
+    (3, _get('home', '/')),
+]
+COMPANION_MIX = [
+    (40, view_linked_patient),
+    (30, _get('companion_patients', '/companion/patients')),
+    (20, _get('companion_notifications', '/companion/notifications')),
+    (10, _get('home', '/')),
+]
+
+
+def run_client(base_url, account, population, deadline, think_time, rng, samples, stop):
+    mix = PATIENT_MIX if account.user_type == 'PATIENT' else COMPANION_MIX
+    weights = [weight for weight, _ in mix]
+    actions = [action for _, action in mix]
+    client = Client(base_url, samples)
+    try:
+        if not client.login(account.email, account.user_type):
+            return
+        while time.monotonic() < deadline and not stop.is_set():
+            rng.choices(actions, weights)[0](client, rng, account, population)
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+    finally:
+        client.close()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Dict]:
+    by_route: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_route.setdefault(sample.route, []).append(sample)
+    by_route['ALL'] = list(samples)
+
+    summary = {}
+    for route, route_samples in by_route.items():
+        latencies = sorted(sample.elapsed * 1000 for sample in route_samples)
+        summary[route] = {
+            'requests': len(route_samples),
+            'errors': sum(1 for sample in route_samples if sample.status == 0 or sample.status >= 500),
+            'throughput': len(route_samples) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': latencies[-1] if latencies else 0.0,
+        }
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict]) -> str:
+    lines = [f"{'route':<26}{'reqs':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+    for route in sorted(summary, key=lambda route: (route == 'ALL', route)):
+        row = summary[route]
+        lines.append(f"{route:<26}{row['requests']:>8}{row['errors']:>8}{row['throughput']:>9.1f}"
+                     f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}")
+    return '\n'.join(lines)
+
+
+def run(args) -> Dict[str, Dict]:
+    app = create_app('loadtest')
+    print(f"Seeding {args.patients} patients and {args.companions} companions "
+          f"({args.days} days of history)...")
+    population = seed(app, patients=args.patients, companions=args.companions, days=args.days,
+                      readings_per_day=args.readings_per_day, medications=args.medications,
+                      random_seed=args.seed)
+    patients_of = {}
+    for patient_id, companion_id in population.links:
+        patients_of.setdefault(companion_id, []).append(patient_id)
+    shared = {'patients_of': patients_of}
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        # The dev server's per-request access log would swamp the report
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, name='loadtest-server', daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+
+    rng = random.Random(args.seed)
+    accounts = population.patients + population.companions
+    # Mixed so a run with fewer clients than accounts still includes companions
+    rng.shuffle(accounts)
+    samples: List[Sample] = []
+    stop = threading.Event()
+    print(f"Driving {base_url} with {args.clients} clients for {args.duration}s...")
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(base_url, accounts[i % len(accounts)], shared, deadline, args.think,
+                  random.Random(rng.random()), samples, stop),
+            name=f'loadtest-client-{i}',
+            daemon=True
+        )
+        for i in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    elapsed = time.monotonic() - started
+
+    if server is not None:
+        server.shutdown()
+    return summarize(samples, elapsed)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patients', type=int, default=50)
+    parser.add_argument('--companions', type=int, default=20)
+    parser.add_argument('--days', type=int, default=90, help="Days of history per patient.")
+    parser.add_argument('--readings-per-day', type=int, default=4, help="Readings of each kind per patient per day.")
+    parser.add_argument('--medications', type=int, default=3, help="Medications per patient.")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent simulated users.")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of traffic after seeding.")
+    parser.add_argument('--think', type=float, default=0, help="Mean seconds a client pauses between requests.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--url', default=None, help="Drive an already running server instead of starting one.")
+    parser.add_argument('--json', dest='json_path', default=None, help="Also write the summary to this file.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    summary = run(args)
+    print(format_summary(summary))
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(summary, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,13 @@
 # tests/unit/models/test_models.py
+import os
+import tempfile
+import unittest
 from datetime import datetime
+from sqlalchemy import create_engine, text
 from tests.base import BaseTestCase
-from app.models import User, UserType, AccessLevel, CompanionAccess, Notification
+from app.models import User, UserType, AccessLevel, CompanionAccess, Notification, configure_sqlite_engine
 from app.extensions import db
+from config import Config
 
 # tests/unit/models/test_models.py
 from datetime import datetime
@@ -112,4 +117,35 @@ class TestNotificationModel(BaseTestCase):
             message='Test notification'
         )
         expected_repr = f'<Notification Test notification to User {self.test_user.id}>'
-        self.assertEqual(repr(notification), expected_repr)
\ No newline at end of file
+        self.assertEqual(repr(notification), expected_repr)
+
+
+class TestSqliteEngineProfile(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.engine = create_engine(f'sqlite:///{self.db_path}')
+
+    def tearDown(self):
+        self.engine.dispose()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def pragma(self, name):
+        with self.engine.connect() as conn:
+            return conn.execute(text(f'PRAGMA {name}')).scalar()
+
+    def test_profile_applied_to_new_connections(self):
+        configure_sqlite_engine(self.engine, Config.SQLITE_PRAGMAS)
+
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('foreign_keys'), 1)
+
+    def test_profile_skipped_without_pragmas(self):
+        configure_sqlite_engine(self.engine, {})
+
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
+
@@ -0,0 +1,98 @@
+# tests/unit/services/test_access_service.py
+from sqlalchemy import event
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import CompanionAccess
+from app.services.access_service import AccessCache, access_cache
+from app.services.companion_service import CompanionService
+from app.services.connection_service import ConnectionService
+
+
+class TestAccessCache(BaseTestCase):
+    """Tests for cached companion access grants."""
+    def setUp(self):
+        super().setUp()
+        self.companion = self.create_test_user('companion@test.com', 'COMPANION')
+        self.link = CompanionAccess(
+            patient_id=self.test_user.id,
+            companion_id=self.companion.id,
+            medication_access='EDIT',
+            glucose_access='VIEW',
+            blood_pressure_access='NONE'
+        )
+        db.session.add(self.link)
+        db.session.commit()
+        self.patient_id, self.companion_id = self.test_user.id, self.companion.id
+        self.clock = [0.0]
+        self.cache = AccessCache(ttl_seconds=60, max_entries=2, clock=lambda: self.clock[0])
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.count_statement)
+        self.addCleanup(event.remove, db.engine, 'before_cursor_execute', self.count_statement)
+
+    def count_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_one_lookup_covers_every_category(self):
+        """Test a single query answers all categories and is then cached."""
+        patient_id, companion_id = self.patient_id, self.companion_id
+
+        self.assertTrue(self.cache.allows(patient_id, companion_id, 'glucose'))
+        self.assertTrue(self.cache.allows(patient_id, companion_id, 'medication', ('EDIT',)))
+        self.assertFalse(self.cache.allows(patient_id, companion_id, 'blood_pressure'))
+        self.assertFalse(self.cache.allows(patient_id, companion_id, 'glucose', ('EDIT',)))
+        self.assertEqual(len(self.statements), 1)
+
+    def test_missing_link_is_cached(self):
+        """Test unlinked pairs resolve to None without repeating the query."""
+        stranger_id = self.create_test_user('stranger@test.com', 'COMPANION').id
+        self.statements.clear()
+
+        self.assertIsNone(self.cache.get(self.patient_id, stranger_id))
+        self.assertIsNone(self.cache.get(self.patient_id, stranger_id))
+        self.assertEqual(len(self.statements), 1)
+
+    def test_entries_expire_and_are_bounded(self):
+        """Test grants are reloaded after the TTL and the LRU evicts the oldest pair."""
+        self.cache.get(self.patient_id, self.companion_id)
+        self.clock[0] = 61
+        self.cache.get(self.patient_id, self.companion_id)
+        self.assertEqual(len(self.statements), 2)
+
+        self.cache.get(self.patient_id, 998)
+        self.cache.get(self.patient_id, 999)
+        self.cache.get(self.patient_id, self.companion_id)
+        self.assertEqual(len(self.statements), 5)
+
+    def test_request_memo(self):
+        """Test a request keeps its grants even if the shared cache is cleared."""
+        with self.app.test_request_context():
+            self.cache.get(self.patient_id, self.companion_id)
+            self.cache.clear()
+            self.cache.get(self.patient_id, self.companion_id)
+        self.assertEqual(len(self.statements), 1)
+
+    def test_connection_changes_invalidate(self):
+        """Test updating, removing and creating links is seen immediately."""
+        patient_id, companion_id = self.patient_id, self.companion_id
+        self.assertTrue(access_cache.allows(patient_id, companion_id, 'glucose'))
+
+        ConnectionService(db).update_access_levels(self.link.id, patient_id, {'glucose': 'NONE', 'blood_pressure': 'EDIT'})
+        self.assertFalse(access_cache.allows(patient_id, companion_id, 'glucose'))
+        self.assertTrue(access_cache.allows(patient_id, companion_id, 'blood_pressure'))
+
+        ConnectionService(db).remove_connection(self.link.id, patient_id)
+        self.assertIsNone(access_cache.get(patient_id, companion_id))
+
+        CompanionService(db).link_patient(companion_id, self.test_user.email)
+        self.assertEqual(access_cache.get(patient_id, companion_id).glucose_access, 'NONE')
+
+    def test_grant_attaches_without_query(self):
+        """Test a cached grant becomes the session's CompanionAccess row without loading it."""
+        grant = self.cache.get(self.patient_id, self.companion_id)
+        self.statements.clear()
+
+        self.assertIs(grant.attach(db.session), self.link)
+        db.session.expunge(self.link)
+        attached = grant.attach(db.session)
+        self.assertEqual((attached.id, attached.glucose_access), (self.link.id, 'VIEW'))
+        self.assertEqual(self.statements, [])
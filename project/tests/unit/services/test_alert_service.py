@@ -0,0 +1,79 @@
+# tests/unit/services/test_alert_service.py
+from unittest.mock import patch
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import AlertThreshold
+from app.services.alert_service import (
+    AlertThresholdService, DEFAULT_RULES, SEVERITIES
+)
+from app.services.health_service import HealthService
+
+
+class TestAlertThresholds(BaseTestCase):
+    """Tests for the compiled alert threshold rules."""
+    def setUp(self):
+        super().setUp()
+        self.health_service = HealthService(db)
+        self.threshold_service = AlertThresholdService(db)
+
+    def test_rule_bands_match_boundaries(self):
+        """Test lows are exclusive, highs inclusive, and array classification agrees."""
+        rule = DEFAULT_RULES['fasting_glucose']
+        levels = [53, 54, 69, 70, 180, 181, 250, 251]
+        expected = ['Critical Low', 'Low', 'Low', None, None, 'High', 'High', 'Critical High']
+
+        self.assertEqual([rule.severity(level) for level in levels], expected)
+        self.assertEqual([SEVERITIES[band] for band in rule.bands(levels)], expected)
+
+    def test_personal_targets_override_defaults(self):
+        """Test a patient's targets are used, cached, and refreshed when changed."""
+        reading = {'glucose_level': 190}
+        self.assertIn('High', self.health_service.classify_reading('fasting_glucose', reading, self.test_user.id))
+
+        success, error = self.threshold_service.set_thresholds(self.test_user.id, 'fasting_glucose', 60, 80, 200, 300)
+        self.assertTrue(success, error)
+        self.assertIsNone(self.health_service.classify_reading('fasting_glucose', reading, self.test_user.id))
+        # Other patients and metrics keep the defaults
+        self.assertIn('High', self.health_service.classify_reading('fasting_glucose', reading))
+        self.assertIn('High', self.health_service.classify_reading('postprandial_glucose', {'glucose_level': 210}, self.test_user.id))
+
+        with patch.object(AlertThreshold, 'query') as mock_query:
+            self.health_service.classify_reading('fasting_glucose', reading, self.test_user.id)
+            mock_query.filter_by.assert_not_called()
+
+        success, error = self.threshold_service.reset_thresholds(self.test_user.id)
+        self.assertTrue(success, error)
+        self.assertIn('High', self.health_service.classify_reading('fasting_glucose', reading, self.test_user.id))
+
+    def test_set_thresholds_validation(self):
+        """Test unknown metrics and unordered limits are rejected."""
+        success, error = self.threshold_service.set_thresholds(self.test_user.id, 'weight', 1, 2, 3, 4)
+        self.assertFalse(success)
+        self.assertEqual(error, "Unknown alert metric: weight")
+
+        success, error = self.threshold_service.set_thresholds(self.test_user.id, 'systolic', 90, 70, 140, 180)
+        self.assertFalse(success)
+        self.assertIn("severe low < low", error)
+
+        success, thresholds, error = self.threshold_service.get_thresholds(self.test_user.id)
+        self.assertEqual(thresholds['systolic'], {'severe_low': 70, 'low': 90, 'high': 140, 'severe_high': 180, 'custom': False})
+
+    def test_batch_classification_matches_single(self):
+        """Test array classification yields the same messages as one-by-one classification."""
+        self.threshold_service.set_thresholds(self.test_user.id, 'systolic', 80, 100, 130, 170)
+        readings = [
+            ('blood_pressure', {'systolic': 120, 'diastolic': 80}),
+            ('blood_pressure', {'systolic': 135, 'diastolic': 55}),
+            ('blood_pressure', {'systolic': 60, 'diastolic': 130}),
+            ('fasting_glucose', {'glucose_level': 50}),
+            ('postprandial_glucose', {'glucose_level': 120}),
+        ]
+
+        expected = [
+            message for message in (
+                self.health_service.classify_reading(data_type, value, self.test_user.id) for data_type, value in readings
+            ) if message
+        ]
+        self.assertEqual(self.health_service.classify_readings(self.test_user.id, readings), expected)
+        self.assertEqual(len(expected), 3)
+        self.assertIn('High, Low', expected[0])
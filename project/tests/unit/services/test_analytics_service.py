@@ -0,0 +1,79 @@
+# tests/unit/services/test_analytics_service.py
+from datetime import datetime, timedelta
+import numpy as np
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import GlucoseRecord, GlucoseType
+from app.services.analytics_service import AnalyticsService, glycemic_metrics, mage
+
+
+class TestAnalyticsService(BaseTestCase):
+    """Tests for the glycemic analytics engine."""
+    def setUp(self):
+        super().setUp()
+        self.analytics_service = AnalyticsService(db)
+        self.other_patient = self.create_test_user('other@test.com')
+
+    def add_levels(self, user_id, levels, start=datetime(2024, 1, 1, 6, 0)):
+        for i, level in enumerate(levels):
+            recorded_at = start + timedelta(hours=i)
+            db.session.add(GlucoseRecord(
+                user_id=user_id,
+                glucose_level=level,
+                glucose_type=GlucoseType.FASTING,
+                date=recorded_at.strftime('%Y-%m-%d'),
+                time=recorded_at.strftime('%H:%M')
+            ))
+        db.session.commit()
+
+    def test_glycemic_metrics(self):
+        """Test mean, variability, GMI/eA1c and time-in-range on a known series."""
+        metrics = glycemic_metrics(np.array([100, 200, 100, 200]))
+
+        self.assertEqual(metrics['readings'], 4)
+        self.assertEqual(metrics['mean'], 150)
+        self.assertAlmostEqual(metrics['sd'], 57.735, places=3)
+        self.assertAlmostEqual(metrics['cv'], 38.49, places=2)
+        self.assertAlmostEqual(metrics['gmi'], 6.898, places=3)
+        self.assertAlmostEqual(metrics['ea1c'], 6.8537, places=4)
+        self.assertEqual(metrics['mage'], 100)
+        self.assertEqual(metrics['time_in_range']['in_range'], 50)
+        self.assertEqual(metrics['time_above_range'], 50)
+        self.assertEqual(metrics['time_below_range'], 0)
+        self.assertEqual(glycemic_metrics(np.array([])), {'readings': 0})
+
+    def test_mage_ignores_small_excursions_and_plateaus(self):
+        """Test only excursions larger than one SD count towards MAGE."""
+        levels = np.array([100, 100, 105, 100, 250, 250, 90, 95], dtype=float)
+        # Turning points 100-105-100-250-90-95; excursions 5, 5, 150, 160, 5
+        self.assertEqual(mage(levels, 60.0), 155)
+        self.assertIsNone(mage(np.array([100.0, 100.0, 100.0]), 1.0))
+
+    def test_metrics_for_window(self):
+        """Test a patient's metrics only cover readings inside the window."""
+        self.add_levels(self.test_user.id, [100, 110, 300, 60])
+
+        success, metrics, error = self.analytics_service.get_glucose_metrics(
+            self.test_user.id, start=datetime(2024, 1, 1, 6, 0), end=datetime(2024, 1, 1, 8, 0)
+        )
+
+        self.assertTrue(success, error)
+        self.assertEqual(metrics['readings'], 2)
+        self.assertEqual(metrics['mean'], 105)
+        self.assertEqual(metrics['time_in_range']['in_range'], 100)
+
+    def test_insights_metrics_route(self):
+        """Test the insights page's metrics endpoint covers the logged-in patient's readings in range."""
+        self.add_levels(self.test_user.id, [100, 110, 300, 60])
+        self.add_levels(self.other_patient.id, [200, 220])
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.test_user.id)
+
+        data = self.client.get('/health/insights/metrics?start=2024-01-01&end=2024-01-01').get_json()
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['glucose']['readings'], 4)
+        self.assertAlmostEqual(data['glucose']['gmi'], 3.31 + 0.02392 * 142.5)
+        self.assertIn('mage', data['glucose'])
+        self.assertEqual(self.client.get('/health/insights/metrics?start=2024-01-02').get_json()['glucose'],
+                         {'readings': 0})
@@ -2,7 +2,8 @@
 from unittest.mock import patch, MagicMock
 from tests.base import BaseTestCase
 from app.services.auth_service import AuthService
-from app.models import User
+from app.services.password_service import PasswordHasher, hash_memory
+from app.models import User, CompanionAccess
 from app.extensions import db
 import uuid
 
@@ -103,6 +104,100 @@ class TestAuthService(BaseTestCase):
         self.assertEqual(user.user_type, 'COMPANION', "User type should be 'COMPANION'")
         self.assertFalse(user.patients, "User should have no patients")
 
+    def test_authenticate_companion_with_patient_skips_setup(self):
+        """Test the companion link check queries for a link without loading them"""
+        companion = self.create_test_user(f'companion_{uuid.uuid4().hex[:8]}@test.com', user_type='COMPANION')
+        db.session.add(CompanionAccess(patient_id=self.test_user.id, companion_id=companion.id))
+        db.session.commit()
+
+        success, user, redirect_url, error = self.auth_service.authenticate_user(
+            email=companion.email,
+            password='password123',
+            user_type='COMPANION'
+        )
+
+        self.assertTrue(success)
+        self.assertIsNone(redirect_url)
+        self.assertNotIn('patients', user.__dict__)
+
+    def test_authenticate_user_upgrades_outdated_hash(self):
+        """Test a hash made with other parameters is replaced at login"""
+        service = AuthService(db, PasswordHasher(method='pbkdf2:sha256:1000', max_workers=0))
+        version = self.test_user.version
+
+        success, user, redirect_url, error = service.authenticate_user(
+            email=self.test_email,
+            password='password123',
+            user_type='PATIENT'
+        )
+
+        self.assertTrue(success)
+        db.session.expire_all()
+        self.assertTrue(user.password_hash.startswith('pbkdf2:sha256:1000$'))
+        self.assertEqual(user.version, version + 1)
+        self.assertTrue(user.check_password('password123'))
+        self.assertFalse(service.hasher.needs_rehash(user.password_hash))
+
+    def test_authenticate_user_current_hash_not_rewritten(self):
+        """Test a hash made with the configured parameters is left alone"""
+        password_hash = self.test_user.password_hash
+
+        success, user, redirect_url, error = self.auth_service.authenticate_user(
+            email=self.test_email,
+            password='password123',
+            user_type='PATIENT'
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(user.password_hash, password_hash)
+
+    def test_short_method_names_match_their_hashes(self):
+        """Test werkzeug's short method forms do not make fresh hashes look outdated"""
+        for method in ('scrypt', 'pbkdf2:sha256'):
+            hasher = PasswordHasher(method=method, max_workers=0)
+            self.assertFalse(hasher.needs_rehash(hasher.hash('password123')), method)
+        self.assertTrue(PasswordHasher(method='scrypt', max_workers=0).needs_rehash(
+            PasswordHasher(method='pbkdf2:sha256:1000', max_workers=0).hash('password123')
+        ))
+
+    def test_hash_workers_fit_memory_budget(self):
+        """Test concurrent scrypt hashes are capped by the memory they would hold together"""
+        self.assertEqual(hash_memory('scrypt'), 128 * 32768 * 8)
+        self.assertEqual(hash_memory('pbkdf2:sha256'), 0)
+
+        cases = [
+            ('scrypt:32768:8:1', 8, 64 * 1024 * 1024, 2),
+            ('scrypt:16384:8:1', 8, 64 * 1024 * 1024, 4),
+            ('scrypt:32768:8:1', 8, 16 * 1024 * 1024, 1),
+            ('scrypt:32768:8:1', 8, None, 8),
+            ('pbkdf2:sha256', 8, 16 * 1024 * 1024, 8),
+        ]
+        for method, workers, budget, expected in cases:
+            hasher = PasswordHasher(method=method, max_workers=workers, memory_budget=budget)
+            self.addCleanup(hasher.executor.shutdown)
+            self.assertEqual((hasher.max_workers, hasher.executor._max_workers), (expected, expected), method)
+
+    def test_authenticate_user_hash_pool_busy(self):
+        """Test logins past the hashing queue are turned away instead of waiting"""
+        hasher = PasswordHasher(max_workers=1, queue_size=0, queue_timeout=0.01)
+        self.addCleanup(hasher.executor.shutdown)
+        service = AuthService(db, hasher)
+
+        hasher._slots.acquire()
+        try:
+            success, user, redirect_url, error = service.authenticate_user(
+                email=self.test_email,
+                password='password123',
+                user_type='PATIENT'
+            )
+        finally:
+            hasher._slots.release()
+
+        self.assertFalse(success)
+        self.assertIsNone(user)
+        self.assertIn('try again', error)
+        self.assertTrue(hasher.verify(self.test_user.password_hash, 'password123'))
+
     def test_register_user_success_patient(self):
         """Test successful patient registration"""
         unique_id = str(uuid.uuid4())[:8]
@@ -0,0 +1,84 @@
+# tests/unit/services/test_badge_service.py
+from unittest.mock import patch
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import CompanionAccess, Notification
+from app.services.badge_service import BadgeCounter, badge_counter
+from app.services.companion_service import CompanionService
+from app.services.connection_service import ConnectionService
+from app.services.health_service import HealthService
+
+
+class TestBadgeCounter(BaseTestCase):
+    """Tests for the cached navbar badge counts."""
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        self.counter = BadgeCounter(ttl_seconds=30, clock=lambda: self.now)
+        self.companion = self.create_test_user('companion@test.com', 'COMPANION')
+
+    def add_notification(self, message='Alert'):
+        db.session.add(Notification(user_id=self.companion.id, message=message))
+        db.session.commit()
+
+    def test_count_is_cached_until_ttl(self):
+        """Test a cached count is served without a query until it expires."""
+        self.add_notification()
+        self.assertEqual(self.counter.unread_notifications(self.companion.id), 1)
+
+        self.add_notification()
+        with patch.object(Notification, 'query') as mock_query:
+            self.assertEqual(self.counter.unread_notifications(self.companion.id), 1)
+            mock_query.filter_by.assert_not_called()
+
+        self.now += 31
+        self.assertEqual(self.counter.unread_notifications(self.companion.id), 2)
+
+    def test_invalidate_reloads_count(self):
+        """Test invalidating a user only reloads that user's count."""
+        db.session.add(CompanionAccess(patient_id=self.test_user.id, companion_id=self.companion.id))
+        db.session.commit()
+        self.assertEqual(self.counter.pending_connections(self.test_user.id), 1)
+        self.assertEqual(self.counter.unread_notifications(self.companion.id), 0)
+
+        self.add_notification()
+        CompanionAccess.query.delete()
+        db.session.commit()
+        self.counter.invalidate_notifications(self.companion.id)
+
+        self.assertEqual(self.counter.unread_notifications(self.companion.id), 1)
+        self.assertEqual(self.counter.pending_connections(self.test_user.id), 1)
+
+    def test_services_invalidate_shared_counter(self):
+        """Test connection and notification changes refresh the shared counts."""
+        companion_service = CompanionService(db)
+        self.assertEqual(badge_counter.pending_connections(self.test_user.id), 0)
+
+        companion_service.link_patient(self.companion.id, self.test_user.email)
+        self.assertEqual(badge_counter.pending_connections(self.test_user.id), 1)
+
+        connection = CompanionAccess.query.first()
+        ConnectionService(db).update_access_levels(connection.id, self.test_user.id, {'glucose': 'VIEW'})
+        self.assertEqual(badge_counter.pending_connections(self.test_user.id), 0)
+
+        self.assertEqual(badge_counter.unread_notifications(self.companion.id), 0)
+        HealthService(db).notify_companions(self.test_user.id, 'fasting_glucose', {'glucose_level': 300})
+        db.session.commit()
+        self.assertEqual(badge_counter.unread_notifications(self.companion.id), 1)
+
+        notification = Notification.query.first()
+        companion_service.mark_notification_read(self.companion.id, notification.id)
+        self.assertEqual(badge_counter.unread_notifications(self.companion.id), 0)
+
+    def test_notifications_invalidate_after_commit(self):
+        """Test a count re-read before the alert commits is still dropped once it does."""
+        self.assertEqual(badge_counter.unread_notifications(self.companion.id), 0)
+        HealthService(db).add_notifications([self.companion.id], 'High reading')
+        self.assertEqual(badge_counter.unread_notifications(self.companion.id), 0)
+
+        db.session.commit()
+        self.assertEqual(badge_counter.unread_notifications(self.companion.id), 1)
+
+        HealthService(db).add_notifications([self.companion.id], 'Rolled back')
+        db.session.rollback()
+        self.assertNotIn('pending_badge_invalidations', db.session.info)
@@ -0,0 +1,71 @@
+# tests/unit/services/test_chart_service.py
+from datetime import datetime, timedelta
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import GlucoseRecord, BloodPressureRecord, GlucoseType
+from app.services.chart_service import ChartService, lttb
+
+
+class TestChartService(BaseTestCase):
+    """Tests for downsampled chart series."""
+    def setUp(self):
+        super().setUp()
+        self.chart_service = ChartService(db)
+
+    def add_glucose_series(self, levels, start=datetime(2024, 1, 1, 8, 0)):
+        for i, level in enumerate(levels):
+            recorded_at = start + timedelta(hours=i)
+            db.session.add(GlucoseRecord(
+                user_id=self.test_user.id,
+                glucose_level=level,
+                glucose_type=GlucoseType.FASTING,
+                date=recorded_at.strftime('%Y-%m-%d'),
+                time=recorded_at.strftime('%H:%M')
+            ))
+        db.session.commit()
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        """Test LTTB returns the target size with the first, last and spike points kept."""
+        points = [(float(i), 100.0) for i in range(1000)]
+        points[500] = (500.0, 300.0)
+
+        sampled = lttb(points, 50)
+
+        self.assertEqual(len(sampled), 50)
+        self.assertEqual(sampled[0], points[0])
+        self.assertEqual(sampled[-1], points[-1])
+        self.assertIn((500.0, 300.0), sampled)
+        self.assertEqual(sampled, sorted(sampled))
+        self.assertEqual(lttb(points[:10], 50), points[:10])
+
+    def test_get_series_downsamples_within_range(self):
+        """Test the glucose series is limited to the range and point count."""
+        self.add_glucose_series([100 + (i % 7) for i in range(200)])
+
+        success, data, error = self.chart_service.get_series(
+            self.test_user.id, 'glucose',
+            start=datetime(2024, 1, 2), end=datetime(2024, 1, 5), max_points=20
+        )
+
+        self.assertTrue(success, error)
+        self.assertEqual(data['total'], 72)
+        points = data['series']['glucose_level']
+        self.assertEqual(len(points), 20)
+        self.assertEqual(points[0]['x'], '2024-01-02T00:00')
+        self.assertEqual(points[-1]['x'], '2024-01-04T23:00')
+
+    def test_get_series_blood_pressure_and_unknown_kind(self):
+        """Test blood pressure returns both series and unknown kinds are rejected."""
+        db.session.add(BloodPressureRecord(
+            user_id=self.test_user.id, systolic=120, diastolic=80, date='2024-01-01', time='08:00'
+        ))
+        db.session.commit()
+
+        success, data, error = self.chart_service.get_series(self.test_user.id, 'blood_pressure')
+        self.assertTrue(success, error)
+        self.assertEqual(data['series']['systolic'], [{'x': '2024-01-01T08:00', 'y': 120}])
+        self.assertEqual(data['series']['diastolic'], [{'x': '2024-01-01T08:00', 'y': 80}])
+
+        success, data, error = self.chart_service.get_series(self.test_user.id, 'weight')
+        self.assertFalse(success)
+        self.assertEqual(error, "Unknown chart kind: weight")
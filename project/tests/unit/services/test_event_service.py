@@ -0,0 +1,143 @@
+# tests/unit/services/test_event_service.py
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import CompanionAccess
+from app.services.event_service import Event, EventBackend, EventBroker, event_broker, format_sse
+from app.services.health_service import HealthService
+
+
+class RecordingBackend(EventBackend):
+    """Stands in for a cross-process backend by echoing what it publishes."""
+    def __init__(self, url=None):
+        super().__init__(url)
+        self.published = []
+
+    def publish(self, user_id, event):
+        self.published.append((user_id, event))
+        self.deliver(user_id, event)
+
+
+class TestEventBroker(BaseTestCase):
+    """Tests for the live event stream pub/sub."""
+    def setUp(self):
+        super().setUp()
+        self.companion = self.create_test_user('companion@test.com', 'COMPANION')
+
+    def test_publish_reaches_only_the_users_streams(self):
+        """Test events are queued for every stream of the target user only."""
+        backend = RecordingBackend()
+        broker = EventBroker(backend)
+        first, second = broker.subscribe(1), broker.subscribe(1)
+        other = broker.subscribe(2)
+
+        broker.publish([1], 'notification', {'message': 'hi'})
+
+        self.assertEqual(backend.published, [(1, Event('notification', {'message': 'hi'}))])
+        self.assertEqual(first.get(0), Event('notification', {'message': 'hi'}))
+        self.assertEqual(second.get(0), Event('notification', {'message': 'hi'}))
+        self.assertIsNone(other.get(0))
+
+        broker.unsubscribe(first)
+        broker.unsubscribe(second)
+        self.assertEqual(broker.subscriber_count(1), 0)
+        self.assertEqual(broker.subscriber_count(), 1)
+
+    def test_full_queue_drops_oldest_event(self):
+        """Test a stalled stream keeps the newest events without blocking publishers."""
+        broker = EventBroker(queue_size=2)
+        subscription = broker.subscribe(1)
+        for i in range(3):
+            broker.publish([1], 'reminder', {'id': i})
+
+        self.assertEqual([subscription.get(0).data['id'] for _ in range(2)], [1, 2])
+        self.assertIsNone(subscription.get(0))
+
+    def test_format_sse(self):
+        """Test events are encoded in the event-stream format."""
+        self.assertEqual(
+            format_sse(Event('reminder', {'id': 1})),
+            'event: reminder\ndata: {"id": 1}\n\n'
+        )
+
+    def test_notifications_published_after_commit(self):
+        """Test companion streams hear about an alert only once it is committed."""
+        db.session.add(CompanionAccess(
+            patient_id=self.test_user.id,
+            companion_id=self.companion.id,
+            glucose_access='VIEW'
+        ))
+        db.session.commit()
+        health_service = HealthService(db)
+        subscription = event_broker.subscribe(self.companion.id)
+        self.addCleanup(event_broker.unsubscribe, subscription)
+
+        health_service.add_notifications([self.companion.id], 'rolled back')
+        db.session.rollback()
+        health_service.add_notifications([self.companion.id], 'kept')
+        self.assertIsNone(subscription.get(0))
+        db.session.commit()
+
+        self.assertEqual(subscription.get(0), Event('notification', {'message': 'kept'}))
+        self.assertIsNone(subscription.get(0))
+
+    def test_stream_pushes_events_to_logged_in_user(self):
+        """Test the stream endpoint relays published events and cleans up on close."""
+        self.app.config['EVENT_STREAM_HEARTBEAT'] = 0.1
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.companion.id)
+
+        response = self.client.get('/events/stream', buffered=False)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        chunks = iter(response.response)
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        self.assertEqual(event_broker.subscriber_count(self.companion.id), 1)
+
+        self.assertEqual(next(chunks), b': keep-alive\n\n')
+        event_broker.publish([self.companion.id], 'notification', {'message': 'High reading'})
+        self.assertEqual(next(chunks), b'event: notification\ndata: {"message": "High reading"}\n\n')
+
+        response.close()
+        self.assertEqual(event_broker.subscriber_count(self.companion.id), 0)
+
+    def test_stream_releases_database_session(self):
+        """Test an open stream does not keep the request's session and connection."""
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.companion.id)
+        db.session.execute(db.select(CompanionAccess)).all()
+        self.assertTrue(db.session.registry.has())
+
+        response = self.client.get('/events/stream', buffered=False)
+        self.addCleanup(response.close)
+        self.assertTrue(next(iter(response.response)).startswith(b'retry:'))
+
+        self.assertFalse(db.session.registry.has())
+
+    def test_stream_refuses_past_per_user_limit(self):
+        """Test a user cannot hold more open streams than EVENT_STREAM_MAX_PER_USER."""
+        self.app.config['EVENT_STREAM_MAX_PER_USER'] = 1
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.companion.id)
+
+        first = self.client.get('/events/stream', buffered=False)
+        self.addCleanup(first.close)
+        self.assertEqual(self.client.get('/events/stream').status_code, 429)
+        self.assertEqual(event_broker.subscriber_count(self.companion.id), 1)
+
+        first.close()
+        self.assertEqual(event_broker.subscriber_count(self.companion.id), 0)
+        second = self.client.get('/events/stream', buffered=False)
+        self.addCleanup(second.close)
+        self.assertEqual(second.status_code, 200)
+
+    def test_backends_must_implement_publish(self):
+        """Test a backend without publish cannot be instantiated."""
+        class Silent(EventBackend):
+            pass
+
+        with self.assertRaises(TypeError):
+            Silent()
+
+    def test_stream_requires_login(self):
+        """Test anonymous users are redirected to log in."""
+        response = self.client.get('/events/stream')
+        self.assertEqual(response.status_code, 302)
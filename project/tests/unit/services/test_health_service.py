@@ -15,6 +15,7 @@ from sqlalchemy.exc import IntegrityError, StatementError
 from flask_login import current_user
 from app.services.health_service import HealthService  # Adjust the import path as necessary
 from unittest.mock import patch, MagicMock
+from sqlalchemy import event
 
 class TestHealthService(BaseTestCase):
     """Tests for the HealthService, GlucoseManager, and BloodPressureManager with BVA and Equivalence Class Partitioning."""
@@ -514,7 +515,11 @@ class TestHealthService(BaseTestCase):
         )
 
         notifications = Notification.query.all()
-        self.assertEqual(len(notifications), 3)  # Only companions with access should get notifications
+        self.assertEqual(len(notifications), 2)  # Only companions with glucose access should get notifications
+        self.assertEqual(
+            {n.user_id for n in notifications},
+            {self.companion.id, companion3.id}
+        )
         
         # Test blood pressure notification
         Notification.query.delete()
@@ -527,7 +532,8 @@ class TestHealthService(BaseTestCase):
         )
 
         notifications = Notification.query.all()
-        self.assertEqual(len(notifications), 3)  # Only companion with blood pressure access
+        self.assertEqual(len(notifications), 1)  # Only companion with blood pressure access
+        self.assertEqual(notifications[0].user_id, self.companion.id)
         
     def test_get_glucose_records_success(self):
         """Test retrieving glucose records successfully."""
@@ -566,11 +572,7 @@ class TestHealthService(BaseTestCase):
             time=self.get_unique_time()
         )
         
-        if len(result) == 4:
-            success, record, error, notifications = result
-        else:
-            success, record, error = result
-            notifications = None  # Or set to a default value like []
+        success, record, error, notifications = result
         
         self.assertTrue(success)
         self.assertIsNotNone(record)
@@ -586,16 +588,12 @@ class TestHealthService(BaseTestCase):
             time=self.get_unique_time()
         )
         
-        if len(result) == 4:
-            success, record, error, notifications = result
-        else:
-            success, record, error = result
-            notifications = None  # Or set to a default value like []
+        success, record, error, notifications = result
         
         self.assertFalse(success)  # Should fail due to being below minimum
         self.assertIsNone(record)
         self.assertIn("between 50 and 350", error)
-        self.assertIsNone(notifications)  # Adjust based on your method's behavior
+        self.assertEqual(notifications, [])
 
 
 
@@ -709,14 +707,7 @@ class TestHealthService(BaseTestCase):
                     time=self.get_unique_time()
                 )
 
-                # Dynamically unpack based on the length of the result
-                if len(result) == 4:
-                    success, record, error, messages = result
-                elif len(result) == 3:
-                    success, record, error = result
-                    messages = []
-                else:
-                    self.fail(f"Unexpected number of return values: {len(result)}")
+                success, record, error, messages = result
 
                 self.assertFalse(success)
                 self.assertIsNone(record)
@@ -762,16 +753,12 @@ class TestHealthService(BaseTestCase):
             time=self.get_unique_time()
         )
         
-        if len(result) == 4:
-            success, record, error, messages = result
-        else:
-            success, record, error = result
-            messages = None  # Or set to a default value like []
+        success, record, error, messages = result
         
         self.assertFalse(success)
         self.assertIsNone(record)
         self.assertIn("Systolic", error)
-        self.assertIsNone(messages)  # Adjust based on your method's behavior
+        self.assertEqual(messages, [])
 
         # Test invalid diastolic
         result = self.health_service.add_blood_pressure_record(
@@ -782,16 +769,12 @@ class TestHealthService(BaseTestCase):
             time=self.get_unique_time()
         )
         
-        if len(result) == 4:
-            success, record, error, messages = result
-        else:
-            success, record, error = result
-            messages = None  # Or set to a default value like []
+        success, record, error, messages = result
         
         self.assertFalse(success)
         self.assertIsNone(record)
         self.assertIn("Diastolic", error)
-        self.assertIsNone(messages)  # Adjust based on your method's behavior
+        self.assertEqual(messages, [])
 
     def test_duplicate_prevention(self):
         """Test prevention of duplicate records."""
@@ -806,11 +789,7 @@ class TestHealthService(BaseTestCase):
             time=test_time
         )
         
-        if len(result) == 4:
-            success, record, error, messages = result
-        else:
-            success, record, error = result
-            messages = None  # Or set to a default value like []
+        success, record, error, messages = result
         
         self.assertTrue(success)
         self.assertIsNotNone(record)
@@ -824,16 +803,12 @@ class TestHealthService(BaseTestCase):
             time=test_time
         )
         
-        if len(result) == 4:
-            success, record, error, messages = result
-        else:
-            success, record, error = result
-            messages = None  # Or set to a default value like []
+        success, record, error, messages = result
         
         self.assertFalse(success)
         self.assertIsNone(record)
         self.assertIn("already exists", error)
-        self.assertIsNone(messages)  # Adjust based on your method's behavior
+        self.assertEqual(messages, [])
 
     @patch('app.services.health_service.current_user')
     def test_companion_access_permissions(self, mock_current_user):
@@ -964,7 +939,7 @@ class TestHealthService(BaseTestCase):
         self.assertTrue(first_success)
         
         # Try to add another record with the same date and time
-        second_success, second_record, second_error = self.health_service.add_blood_pressure_record(
+        second_success, second_record, second_error, second_msg = self.health_service.add_blood_pressure_record(
             user_id=self.patient.id,
             systolic=130,
             diastolic=85,
@@ -1012,7 +987,7 @@ class TestHealthService(BaseTestCase):
         ]
 
         for case in test_cases:
-            success, record, error = self.health_service.add_blood_pressure_record(
+            success, record, error, messages = self.health_service.add_blood_pressure_record(
                 user_id=self.patient.id,
                 systolic=case['systolic'],
                 diastolic=case['diastolic'],
@@ -1054,7 +1029,7 @@ class TestHealthService(BaseTestCase):
         ]
 
         for case in test_cases:
-            success, record, error = self.health_service.add_blood_pressure_record(
+            success, record, error, messages = self.health_service.add_blood_pressure_record(
                 user_id=self.patient.id,
                 systolic=case['systolic'],
                 diastolic=case['diastolic'],
@@ -1074,7 +1049,7 @@ class TestHealthService(BaseTestCase):
             # Simulate database error during commit
             mock_commit.side_effect = Exception("Database commit error")
             
-            success, record, error = self.health_service.add_blood_pressure_record(
+            success, record, error, messages = self.health_service.add_blood_pressure_record(
                 user_id=self.patient.id,
                 systolic=120,
                 diastolic=80,
@@ -1186,25 +1161,25 @@ class TestHealthService(BaseTestCase):
         # Test companion with EDIT access
         self.companion_access.blood_pressure_access = "EDIT"
         db.session.commit()
-        has_permission = self.health_service.blood_pressure_manager.has_permission(record, self.companion.id)
+        has_permission = self.health_service.get_authorized_record('blood_pressure', record.id, self.companion.id).can_edit
         self.assertTrue(has_permission)
 
         # Test companion with VIEW access
         self.companion_access.blood_pressure_access = "VIEW"
         db.session.commit()
-        has_permission = self.health_service.blood_pressure_manager.has_permission(record, self.companion.id)
+        has_permission = self.health_service.get_authorized_record('blood_pressure', record.id, self.companion.id).can_edit
         self.assertTrue(has_permission)
 
         # Test companion with NONE access
         self.companion_access.blood_pressure_access = "NONE"
         db.session.commit()
-        has_permission = self.health_service.blood_pressure_manager.has_permission(record, self.companion.id)
+        has_permission = self.health_service.get_authorized_record('blood_pressure', record.id, self.companion.id).can_edit
         self.assertFalse(has_permission)
 
         # Test non-existent companion access
         CompanionAccess.query.delete()  # Remove all companion access records
         db.session.commit()
-        has_permission = self.health_service.blood_pressure_manager.has_permission(record, self.companion.id)
+        has_permission = self.health_service.get_authorized_record('blood_pressure', record.id, self.companion.id).can_edit
         self.assertFalse(has_permission)
 
     @patch('app.services.health_service.current_user')
@@ -1230,7 +1205,7 @@ class TestHealthService(BaseTestCase):
         mock_user.id = self.another_patient.id
         mock_current_user.return_value = mock_user
 
-        has_permission = self.health_service.blood_pressure_manager.has_permission(record, self.another_patient.id)
+        has_permission = self.health_service.get_authorized_record('blood_pressure', record.id, self.another_patient.id).can_edit
         self.assertFalse(has_permission)
 
     @patch('app.services.health_service.current_user')
@@ -1253,7 +1228,7 @@ class TestHealthService(BaseTestCase):
         mock_user.id = self.patient.id
         mock_current_user.return_value = mock_user
 
-        has_permission = self.health_service.blood_pressure_manager.has_permission(record, self.patient.id)
+        has_permission = self.health_service.get_authorized_record('blood_pressure', record.id, self.patient.id).can_edit
         self.assertTrue(has_permission)
 
     @patch('flask_login.current_user')
@@ -1432,3 +1407,194 @@ class TestHealthService(BaseTestCase):
         self.assertFalse(success)
         self.assertIn("404", str(error))
 
+
+    def test_recorded_at_populated_from_date_and_time(self):
+        """Test recorded_at is derived from the date/time strings on insert and update."""
+        record = GlucoseRecord(
+            user_id=self.patient.id,
+            glucose_level=100,
+            glucose_type=GlucoseType.FASTING,
+            date='2024-03-01',
+            time='07:45'
+        )
+        db.session.add(record)
+        db.session.commit()
+        self.assertEqual(record.recorded_at, datetime(2024, 3, 1, 7, 45))
+
+        record.time = '21:05'
+        db.session.commit()
+        self.assertEqual(record.recorded_at, datetime(2024, 3, 1, 21, 5))
+
+    def test_get_glucose_records_ordered_and_filtered_by_recorded_at(self):
+        """Test glucose records are ordered newest first and range-filtered on recorded_at."""
+        for day, level in (('2024-01-01', 100), ('2024-01-03', 120), ('2024-01-02', 110)):
+            db.session.add(GlucoseRecord(
+                user_id=self.patient.id,
+                glucose_level=level,
+                glucose_type=GlucoseType.FASTING,
+                date=day,
+                time='08:00'
+            ))
+        db.session.commit()
+
+        success, records, error = self.health_service.get_glucose_records(self.patient.id)
+        self.assertTrue(success)
+        self.assertEqual([r.glucose_level for r in records], [120, 110, 100])
+
+        success, records, error = self.health_service.get_glucose_records(
+            self.patient.id,
+            start=datetime(2024, 1, 2),
+            end=datetime(2024, 1, 3)
+        )
+        self.assertTrue(success)
+        self.assertEqual([r.glucose_level for r in records], [110])
+
+    def test_add_glucose_record_invalid_date_format(self):
+        """Test adding a glucose record with a malformed date is rejected."""
+        success, record, error, messages = self.health_service.add_glucose_record(
+            user_id=self.patient.id,
+            glucose_level=100,
+            glucose_type=GlucoseType.FASTING,
+            date='01/02/2024',
+            time='08:00'
+        )
+        self.assertFalse(success)
+        self.assertIsNone(record)
+        self.assertEqual(error, "Invalid date or time format.")
+
+    def test_get_glucose_records_page_keyset_navigation(self):
+        """Test walking glucose records forwards and backwards with page cursors."""
+        # Two readings share a timestamp so the id tie-breaker is exercised
+        readings = [('2024-01-01', '08:00'), ('2024-01-02', '08:00'), ('2024-01-03', '08:00'),
+                    ('2024-01-04', '08:00'), ('2024-01-04', '08:00')]
+        for index, (day, at) in enumerate(readings):
+            db.session.add(GlucoseRecord(
+                user_id=self.patient.id,
+                glucose_level=100 + index,
+                glucose_type=GlucoseType.FASTING,
+                date=day,
+                time=at
+            ))
+        db.session.commit()
+
+        success, page, error = self.health_service.get_glucose_records_page(self.patient.id, page_size=2)
+        self.assertTrue(success)
+        self.assertEqual([r.glucose_level for r in page['records']], [104, 103])
+        self.assertIsNone(page['prev_cursor'])
+
+        success, page, error = self.health_service.get_glucose_records_page(
+            self.patient.id, cursor=page['next_cursor'], page_size=2)
+        self.assertEqual([r.glucose_level for r in page['records']], [102, 101])
+
+        success, last_page, error = self.health_service.get_glucose_records_page(
+            self.patient.id, cursor=page['next_cursor'], page_size=2)
+        self.assertEqual([r.glucose_level for r in last_page['records']], [100])
+        self.assertIsNone(last_page['next_cursor'])
+
+        success, page, error = self.health_service.get_glucose_records_page(
+            self.patient.id, cursor=page['prev_cursor'], direction='prev', page_size=2)
+        self.assertEqual([r.glucose_level for r in page['records']], [104, 103])
+        self.assertIsNone(page['prev_cursor'])
+
+    def test_get_blood_pressure_records_page_invalid_cursor(self):
+        """Test a malformed cursor is reported as an error."""
+        success, page, error = self.health_service.get_blood_pressure_records_page(
+            self.patient.id, cursor='not-a-cursor')
+        self.assertFalse(success)
+        self.assertIsNone(page)
+        self.assertEqual(error, "Invalid page cursor.")
+
+    def test_add_glucose_record_commits_alerts_with_reading(self):
+        """Test an out-of-range reading and its companion alert are saved in one transaction."""
+        with patch.object(db.session, 'commit', wraps=db.session.commit) as mock_commit:
+            success, record, error, messages = self.health_service.add_glucose_record(
+                user_id=self.patient.id,
+                glucose_level=300,
+                glucose_type='FASTING',
+                date=self.valid_date,
+                time=self.get_unique_time()
+            )
+
+        self.assertTrue(success)
+        self.assertEqual(mock_commit.call_count, 1)
+        self.assertEqual(len(messages), 1)
+        notifications = Notification.query.filter_by(user_id=self.companion.id).all()
+        self.assertEqual(len(notifications), 1)
+        self.assertIn('Critical High', notifications[0].message)
+
+    def test_add_glucose_record_rollback_discards_alerts(self):
+        """Test a failed reading insert does not leave orphaned notifications."""
+        with patch.object(db.session, 'commit', side_effect=Exception('disk full')):
+            success, record, error, messages = self.health_service.add_glucose_record(
+                user_id=self.patient.id,
+                glucose_level=300,
+                glucose_type='FASTING',
+                date=self.valid_date,
+                time=self.get_unique_time()
+            )
+
+        self.assertFalse(success)
+        self.assertEqual(Notification.query.count(), 0)
+        self.assertEqual(GlucoseRecord.query.count(), 0)
+
+    @patch('app.services.health_service.current_user')
+    def test_get_authorized_record_single_query(self, mock_current_user):
+        """Test a record and the caller's access are loaded with one joined query."""
+        mock_current_user.user_type = "COMPANION"
+        record = GlucoseRecord(
+            user_id=self.patient.id,
+            glucose_level=100,
+            glucose_type=GlucoseType.FASTING,
+            date=self.valid_date,
+            time=self.get_unique_time()
+        )
+        db.session.add(record)
+        db.session.commit()
+        record_id, patient_id, companion_id = record.id, self.patient.id, self.companion.id
+        outsider_id = self.another_patient.id
+        db.session.expire_all()
+
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+        self.addCleanup(event.remove, db.engine, 'before_cursor_execute', count_statement)
+
+        loaded = self.health_service.get_authorized_record('glucose', record_id, companion_id)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual((loaded.record.id, loaded.access), (record_id, 'EDIT'))
+        self.assertTrue(loaded.can_edit)
+
+        self.assertEqual(self.health_service.get_authorized_record('glucose', record_id, patient_id).access, 'OWNER')
+        self.assertFalse(self.health_service.get_authorized_record('glucose', record_id, outsider_id).can_edit)
+        self.assertIsNone(self.health_service.get_authorized_record('glucose', 99999, patient_id))
+
+    @patch('app.services.health_service.current_user')
+    def test_update_reuses_loaded_record(self, mock_current_user):
+        """Test an update given an already loaded record does not load it again."""
+        mock_current_user.user_type = "COMPANION"
+        record = BloodPressureRecord(
+            user_id=self.patient.id,
+            systolic=120,
+            diastolic=80,
+            date=self.valid_date,
+            time=self.get_unique_time()
+        )
+        db.session.add(record)
+        db.session.commit()
+        loaded = self.health_service.get_authorized_record('blood_pressure', record.id, self.companion.id)
+
+        with patch.object(self.health_service, 'get_authorized_record') as mock_load:
+            success, error, messages = self.health_service.update_blood_pressure_record(
+                record_id=record.id,
+                user_id=self.companion.id,
+                systolic=125,
+                diastolic=82,
+                date=self.valid_date,
+                time=record.time,
+                loaded=loaded
+            )
+
+        self.assertTrue(success, error)
+        mock_load.assert_not_called()
+        self.assertEqual(BloodPressureRecord.query.get(record.id).systolic, 125)
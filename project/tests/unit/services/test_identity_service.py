@@ -0,0 +1,105 @@
+# tests/unit/services/test_identity_service.py
+from sqlalchemy import event
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import User
+from app.services.identity_service import CachedIdentity, IdentityCache, identity_cache
+
+
+class TestIdentityCache(BaseTestCase):
+    """Tests for the cached identity behind Flask-Login's user_loader."""
+    def setUp(self):
+        super().setUp()
+        self.user_id = self.test_user.id
+        self.clock = [0.0]
+        self.cache = IdentityCache(ttl_seconds=60, max_entries=2, clock=lambda: self.clock[0])
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.count_statement)
+        self.addCleanup(event.remove, db.engine, 'before_cursor_execute', self.count_statement)
+
+    def count_statement(self, conn, cursor, statement, parameters, context, executemany):
+        if 'users' in statement:
+            self.statements.append(statement)
+
+    def test_identity_is_cached(self):
+        """Test the identity fields are loaded once and then served from the cache."""
+        identity = self.cache.get(self.user_id)
+        self.cache.get(self.user_id)
+
+        self.assertIsInstance(identity, CachedIdentity)
+        self.assertEqual((identity.id, identity.username, identity.user_type, identity.version),
+                         (self.user_id, 'test', 'PATIENT', 1))
+        self.assertEqual(identity.get_id(), str(self.user_id))
+        self.assertTrue(identity.is_authenticated)
+        self.assertEqual(len(self.statements), 1)
+        self.assertIsNone(self.cache.get(99999))
+
+    def test_full_user_loaded_on_demand(self):
+        """Test attributes beyond the identity load the User once per identity."""
+        identity = self.cache.get(self.user_id)
+        db.session.expire_all()
+
+        self.assertEqual(identity.email, 'test@test.com')
+        self.assertTrue(identity.check_password('password123'))
+        self.assertIsInstance(identity.user, User)
+        self.assertEqual(len(self.statements), 2)
+
+    def test_changes_bump_version_and_invalidate(self):
+        """Test updating a user advances its version and drops the cached identity."""
+        identity_cache.get(self.user_id)
+        user = db.session.get(User, self.user_id)
+        user.username = 'renamed'
+        db.session.commit()
+
+        identity = identity_cache.get(self.user_id)
+        self.assertEqual((identity.username, identity.version), ('renamed', 2))
+
+    def test_invalidated_only_once_committed(self):
+        """Test an identity re-read between flush and commit is still dropped when the change commits."""
+        identity_cache.get(self.user_id)
+        user = db.session.get(User, self.user_id)
+        user.username = 'renamed'
+        db.session.flush()
+        self.assertEqual(identity_cache.get(self.user_id).username, 'test')
+
+        db.session.commit()
+        self.assertEqual(identity_cache.get(self.user_id).username, 'renamed')
+
+        user.username = 'discarded'
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(identity_cache.get(self.user_id).username, 'renamed')
+
+    def test_stale_version_detected_on_full_load(self):
+        """Test an identity older than its User row is dropped from the cache."""
+        identity = self.cache.get(self.user_id)
+        db.session.execute(User.__table__.update().values(version=5))
+        db.session.expire_all()
+        self.assertEqual(identity.user.version, 5)
+
+        self.assertEqual(self.cache.get(self.user_id).version, 5)
+
+    def test_entries_expire_and_are_bounded(self):
+        """Test identities are reloaded after the TTL and the LRU evicts the oldest."""
+        other_ids = [self.create_test_user(f'user{i}@test.com').id for i in range(2)]
+        self.statements.clear()
+
+        self.cache.get(self.user_id)
+        self.clock[0] = 61
+        self.cache.get(self.user_id)
+        for other_id in other_ids:
+            self.cache.get(other_id)
+        self.cache.get(self.user_id)
+        self.assertEqual(len(self.statements), 5)
+
+    def test_user_loader_uses_cache(self):
+        """Test logged-in requests stop querying the users table once cached."""
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.user_id)
+
+        self.client.get('/medications/check-reminders')
+        self.statements.clear()
+        response = self.client.get('/medications/check-reminders')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statements, [])
@@ -0,0 +1,145 @@
+# tests/unit/services/test_import_service.py
+import json
+from datetime import datetime
+from tests.base import BaseTestCase
+from app.models import GlucoseRecord, BloodPressureRecord, GlucoseType, CompanionAccess, Notification
+from app.extensions import db
+from app.services.health_service import HealthService
+from app.services.import_service import ImportService
+
+
+class TestImportService(BaseTestCase):
+    """Tests for bulk reading import."""
+    def setUp(self):
+        super().setUp()
+        self.health_service = HealthService(db)
+        self.import_service = ImportService(db, self.health_service, batch_size=2)
+
+        self.patient = self.create_test_user('patient@test.com', 'PATIENT')
+        self.companion = self.create_test_user('companion@test.com', 'COMPANION')
+        db.session.add(CompanionAccess(
+            patient_id=self.patient.id,
+            companion_id=self.companion.id,
+            glucose_access='VIEW',
+            blood_pressure_access='NONE'
+        ))
+        db.session.commit()
+
+    def test_import_glucose_csv(self):
+        """Test importing valid glucose readings from CSV across several batches."""
+        content = (
+            "date,time,glucose_level,glucose_type\n"
+            "2024-01-01,08:00,100,FASTING\n"
+            "2024-01-01,13:00,150,postprandial\n"
+            "2024-01-02,08:00:00,110,FASTING\n"
+        )
+        success, summary, error = self.import_service.import_file(self.patient.id, 'glucose', content, 'csv')
+
+        self.assertTrue(success)
+        self.assertIsNone(error)
+        self.assertEqual(summary['received'], 3)
+        self.assertEqual(summary['imported'], 3)
+        records = GlucoseRecord.query.filter_by(user_id=self.patient.id).order_by(GlucoseRecord.recorded_at).all()
+        self.assertEqual([r.glucose_level for r in records], [100, 150, 110])
+        self.assertEqual(records[1].glucose_type, GlucoseType.POSTPRANDIAL)
+        self.assertEqual(records[2].time, '08:00')
+        self.assertEqual(records[2].recorded_at, datetime(2024, 1, 2, 8, 0))
+
+    def test_import_reports_invalid_and_duplicate_rows(self):
+        """Test range errors, in-file duplicates and existing rows are skipped."""
+        db.session.add(BloodPressureRecord(
+            user_id=self.patient.id, systolic=120, diastolic=80, date='2024-01-01', time='08:00'
+        ))
+        db.session.commit()
+
+        readings = [
+            {'date': '2024-01-01', 'time': '08:00', 'systolic': 125, 'diastolic': 82},   # exists
+            {'date': '2024-01-02', 'time': '08:00', 'systolic': 301, 'diastolic': 82},   # out of range
+            {'date': '2024-01-03', 'time': '08:00', 'systolic': 118, 'diastolic': 79},
+            {'date': '2024-01-03', 'time': '08:00', 'systolic': 119, 'diastolic': 78},   # repeated
+            {'date': 'yesterday', 'time': '08:00', 'systolic': 118, 'diastolic': 79},    # bad date
+        ]
+        success, summary, error = self.import_service.import_file(
+            self.patient.id, 'blood_pressure', json.dumps({'readings': readings}), 'json'
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(summary['imported'], 1)
+        self.assertEqual(summary['duplicates'], 2)
+        self.assertEqual(summary['invalid'], 2)
+        self.assertEqual(
+            [e['row'] for e in summary['errors']],
+            [1, 2, 4, 5]
+        )
+        self.assertIn("between 50 and 300", summary['errors'][1]['error'])
+        self.assertEqual(BloodPressureRecord.query.filter_by(user_id=self.patient.id).count(), 2)
+
+    def test_import_matches_duplicates_to_the_minute(self):
+        """Test readings seconds apart count as one, in the upload and against stored records."""
+        db.session.add(GlucoseRecord(
+            user_id=self.patient.id, glucose_level=100, glucose_type=GlucoseType.FASTING,
+            date='2024-01-02', time='08:00'
+        ))
+        db.session.commit()
+
+        content = (
+            "date,time,glucose_level,glucose_type\n"
+            "2024-01-01,08:00:00,100,FASTING\n"
+            "2024-01-01,08:00:30,105,FASTING\n"
+            "2024-01-02,08:00:45,110,FASTING\n"
+        )
+        success, summary, error = self.import_service.import_file(self.patient.id, 'glucose', content, 'csv')
+
+        self.assertTrue(success)
+        self.assertEqual(summary['imported'], 1)
+        self.assertEqual(summary['duplicates'], 2)
+        self.assertEqual([e['row'] for e in summary['errors']], [2, 3])
+        rows = db.session.query(GlucoseRecord.date, GlucoseRecord.time).filter_by(user_id=self.patient.id).all()
+        self.assertEqual(sorted(rows), [('2024-01-01', '08:00'), ('2024-01-02', '08:00')])
+
+    def test_import_sends_one_alert_per_batch(self):
+        """Test companions receive one summary notification per batch of out-of-range readings."""
+        readings = [
+            {'date': '2024-01-01', 'time': '08:00', 'glucose_level': 60, 'glucose_type': 'FASTING'},
+            {'date': '2024-01-01', 'time': '09:00', 'glucose_level': 300, 'glucose_type': 'FASTING'},
+            {'date': '2024-01-01', 'time': '10:00', 'glucose_level': 90, 'glucose_type': 'FASTING'},
+        ]
+        success, summary, error = self.import_service.import_readings(self.patient.id, 'glucose', readings)
+
+        self.assertTrue(success)
+        self.assertEqual(summary['alerts'], 2)
+        notifications = Notification.query.filter_by(user_id=self.companion.id).all()
+        # Two batches, but only the first one contains out-of-range readings
+        self.assertEqual(len(notifications), 1)
+        self.assertIn("2 out-of-range readings", notifications[0].message)
+
+    def test_import_unknown_kind_and_bad_payload(self):
+        """Test unknown kinds and malformed uploads are rejected without a summary."""
+        success, summary, error = self.import_service.import_readings(self.patient.id, 'weight', [])
+        self.assertFalse(success)
+        self.assertIsNone(summary)
+        self.assertIn("Unknown reading kind", error)
+
+        success, summary, error = self.import_service.import_file(self.patient.id, 'glucose', '{"readings": 5}', 'json')
+        self.assertFalse(success)
+        self.assertIsNone(summary)
+        self.assertEqual(error, "JSON must be a list of readings.")
+
+    def post_import(self, user):
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+        return self.client.post('/health/import', json={'kind': 'glucose', 'readings': [
+            {'glucose_level': 110, 'glucose_type': 'FASTING', 'date': '2024-01-01', 'time': '08:00'}
+        ]})
+
+    def test_import_route_imports_for_patient(self):
+        """Test the upload route imports into the logged-in patient's account."""
+        response = self.post_import(self.patient)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual([record.user_id for record in GlucoseRecord.query.all()], [self.patient.id])
+
+    def test_import_route_rejects_companions(self):
+        """Test companions cannot import readings into their own account."""
+        response = self.post_import(self.companion)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(GlucoseRecord.query.count(), 0)
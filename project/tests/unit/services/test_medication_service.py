@@ -298,6 +298,62 @@ class TestMedicationService(BaseTestCase):
         # self.assertEqual(reminders[0]['name'], "Due Soon Med")
         self.assertIsNone(error)
 
+    def test_get_daily_medications_ignores_other_days(self):
+        """Test only today's logs mark a medication as taken"""
+        db.session.add(MedicationLog(
+            medication_id=self.test_medication.id,
+            user_id=self.test_user.id,
+            taken_at=datetime.now() - timedelta(days=1)
+        ))
+        db.session.commit()
+
+        success, medications, error = self.medication_service.get_daily_medications(
+            self.test_user.id
+        )
+
+        self.assertTrue(success)
+        test_med = next(m for m in medications if m['id'] == self.test_medication.id)
+        self.assertFalse(test_med['taken'])
+
+    def test_get_upcoming_reminders_skips_taken(self):
+        """Test medications already taken today are not reminded again"""
+        due_soon_time = (datetime.now() + timedelta(minutes=5)).time()
+        if due_soon_time < datetime.now().time():
+            self.skipTest("Reminder window crosses midnight")
+        due_soon = self.create_test_medication("Due Soon Med", due_soon_time)
+        self.medication_service.log_medication_taken(
+            medication_id=due_soon.id,
+            user_id=self.test_user.id
+        )
+
+        success, reminders, error = self.medication_service.get_upcoming_reminders(
+            user_id=self.test_user.id,
+            minutes_ahead=15
+        )
+
+        self.assertTrue(success)
+        self.assertNotIn(due_soon.id, [r['id'] for r in reminders])
+
+    def test_get_upcoming_reminders_single_query(self):
+        """Test upcoming reminders and their taken flags load in one query however many medications there are"""
+        start = datetime.now()
+        if (start + timedelta(minutes=20)).date() != start.date():
+            self.skipTest("Reminder window crosses midnight")
+        for minutes in range(1, 6):
+            med = self.create_test_medication(f"Due Med {minutes}", (start + timedelta(minutes=minutes)).time())
+            if minutes % 2:
+                self.medication_service.log_medication_taken(medication_id=med.id, user_id=self.test_user.id)
+        user_id = self.test_user.id
+
+        with self.assertMaxQueries(1):
+            success, reminders, error = self.medication_service.get_upcoming_reminders(
+                user_id=user_id,
+                minutes_ahead=15
+            )
+
+        self.assertTrue(success)
+        self.assertEqual([r['name'] for r in reminders], ["Due Med 2", "Due Med 4"])
+
     def test_log_medication_taken_success(self):
         """Test logging a taken medication"""
         success, error = self.medication_service.log_medication_taken(
@@ -0,0 +1,149 @@
+# tests/unit/services/test_outbox_service.py
+import time
+from datetime import datetime, timedelta
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import CompanionAccess, Notification, NotificationOutbox
+from app.services.event_service import event_broker
+from app.services.health_service import HealthService
+from app.services.outbox_service import DeliveryChannel, NotificationOutboxService
+
+
+class RecordingChannel(DeliveryChannel):
+    name = 'recording'
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, entry, companion_ids):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('gateway timeout')
+        self.sent.append((entry.message, companion_ids))
+
+
+class TestNotificationOutbox(BaseTestCase):
+    """Tests for queued companion alerts and the delivery worker."""
+    def setUp(self):
+        super().setUp()
+        self.health_service = HealthService(db, use_outbox=True)
+        self.companion = self.create_test_user('companion@test.com', 'COMPANION')
+        db.session.add(CompanionAccess(
+            patient_id=self.test_user.id,
+            companion_id=self.companion.id,
+            glucose_access='VIEW'
+        ))
+        db.session.commit()
+        self.now = datetime.utcnow() + timedelta(minutes=1)
+
+    def make_outbox(self, channel, **kwargs):
+        return NotificationOutboxService(db, self.health_service, channels=[channel], **kwargs)
+
+    def add_high_reading(self):
+        success, record, error, messages = self.health_service.add_glucose_record(
+            self.test_user.id, 300, 'FASTING', '2024-01-01', '08:00'
+        )
+        self.assertTrue(success, error)
+        return messages
+
+    def test_reading_queues_alert_for_worker(self):
+        """Test saving a reading only queues the alert and the worker delivers it."""
+        messages = self.add_high_reading()
+
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(Notification.query.count(), 0)
+        entry = NotificationOutbox.query.one()
+        self.assertEqual((entry.patient_id, entry.data_type, entry.status), (self.test_user.id, 'fasting_glucose', 'pending'))
+
+        channel = RecordingChannel()
+        delivered, failed = self.make_outbox(channel).process_batch(self.now)
+
+        self.assertEqual((delivered, failed), (1, 0))
+        self.assertEqual([n.user_id for n in Notification.query.all()], [self.companion.id])
+        self.assertEqual(channel.sent, [(messages[0], [self.companion.id])])
+        self.assertEqual(NotificationOutbox.query.one().status, 'done')
+        self.assertEqual(self.make_outbox(channel).process_batch(self.now), (0, 0))
+
+    def test_failed_delivery_backs_off_then_gives_up(self):
+        """Test channel failures are retried with backoff without duplicating notifications."""
+        self.add_high_reading()
+        channel = RecordingChannel(failures=5)
+        outbox = self.make_outbox(channel, max_attempts=3, backoff_seconds=10)
+
+        self.assertEqual(outbox.process_batch(self.now), (0, 1))
+        entry = NotificationOutbox.query.one()
+        self.assertEqual((entry.status, entry.attempts), ('pending', 1))
+        self.assertEqual(entry.next_attempt_at, self.now + timedelta(seconds=10))
+        self.assertEqual(entry.last_error, 'gateway timeout')
+
+        # Not due yet
+        self.assertEqual(outbox.process_batch(self.now + timedelta(seconds=5)), (0, 0))
+        self.assertEqual(outbox.process_batch(self.now + timedelta(seconds=10)), (0, 1))
+        self.assertEqual(NotificationOutbox.query.one().next_attempt_at, self.now + timedelta(seconds=30))
+        self.assertEqual(outbox.process_batch(self.now + timedelta(seconds=30)), (0, 1))
+
+        entry = NotificationOutbox.query.one()
+        self.assertEqual((entry.status, entry.attempts), ('failed', 3))
+        self.assertEqual(Notification.query.count(), 1)
+
+    def test_expired_claims_are_picked_up_again(self):
+        """Test an entry claimed by a crashed worker is retried after its lease."""
+        self.add_high_reading()
+        outbox = self.make_outbox(RecordingChannel(), lease_seconds=60)
+        claimed = outbox._claim(self.now)
+        self.assertEqual(len(claimed), 1)
+
+        self.assertEqual(outbox.process_batch(self.now + timedelta(seconds=30)), (0, 0))
+        self.assertEqual(outbox.process_batch(self.now + timedelta(seconds=60)), (1, 0))
+
+    def test_alert_without_recipients_is_not_queued(self):
+        """Test the outbox and inline paths both report nothing when no companion may see the reading."""
+        CompanionAccess.query.delete()
+        db.session.commit()
+
+        self.assertEqual(self.add_high_reading(), [])
+        self.assertEqual(NotificationOutbox.query.count(), 0)
+        inline = HealthService(db, use_outbox=False)
+        self.assertEqual(inline.notify_companions(self.test_user.id, 'fasting_glucose', {'glucose_level': 300}), [])
+
+    def test_worker_without_live_events_still_notifies(self):
+        """Test a worker that cannot reach the web process's streams stores notifications without publishing."""
+        self.add_high_reading()
+        subscription = event_broker.subscribe(self.companion.id)
+        self.addCleanup(event_broker.unsubscribe, subscription)
+
+        delivered, failed = self.make_outbox(RecordingChannel(), live_events=False).process_batch(self.now)
+
+        self.assertEqual((delivered, failed), (1, 0))
+        self.assertEqual(Notification.query.filter_by(user_id=self.companion.id).count(), 1)
+        self.assertIsNone(subscription.get(0))
+
+    def test_channels_must_implement_send(self):
+        """Test a channel without send cannot be instantiated."""
+        class Silent(DeliveryChannel):
+            name = 'silent'
+
+        with self.assertRaises(TypeError):
+            Silent()
+
+    def test_background_thread_drains_outbox(self):
+        """Test the in-process runner delivers queued alerts without a worker process."""
+        self.add_high_reading()
+        channel = RecordingChannel()
+        outbox = self.make_outbox(channel)
+        self.addCleanup(outbox.stop)
+
+        outbox.ensure_running(self.app, interval=0.01)
+        thread = outbox._thread
+        outbox.ensure_running(self.app, interval=0.01)
+        self.assertIs(outbox._thread, thread)
+        deadline = time.monotonic() + 5
+        while not channel.sent and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(channel.sent), 1)
+        outbox.stop()
+        thread.join(1)
+        db.session.expire_all()
+        self.assertEqual(NotificationOutbox.query.one().status, 'done')
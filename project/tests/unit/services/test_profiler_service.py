@@ -0,0 +1,116 @@
+# tests/unit/services/test_profiler_service.py
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from app.services.profiler_service import SamplingProfiler, collapse, sampling_profiler
+from tests.base import BaseTestCase
+
+
+def outer(probe):
+    return inner(probe)
+
+def inner(probe):
+    return probe()
+
+
+class TestSamplingProfiler(BaseTestCase):
+    """Tests for the per-endpoint stack-sampling profiler."""
+    def setUp(self):
+        super().setUp()
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, True)
+        self.profiler = SamplingProfiler(output_dir=self.output_dir)
+        self.addCleanup(self.profiler.stop)
+
+    def test_collapse_orders_outermost_first(self):
+        """Test a stack is collapsed root to leaf, with module-qualified function names."""
+        stack = outer(lambda: collapse(sys._getframe(1)))
+        frames = stack.split(';')
+
+        self.assertEqual(frames[-2:], [f'{__name__}:outer', f'{__name__}:inner'])
+        self.assertEqual(collapse(sys._getframe(), max_depth=1), f'{__name__}:test_collapse_orders_outermost_first')
+
+    def test_samples_only_request_threads(self):
+        """Test only threads registered as serving a request are sampled, under their endpoint."""
+        release = threading.Event()
+        worker = threading.Thread(target=outer, args=(release.wait,))
+        worker.start()
+        self.addCleanup(worker.join)
+        self.addCleanup(release.set)
+        self.profiler._active[worker.ident] = 'health.glucose_records'
+
+        self.profiler.sample()
+        self.profiler.sample()
+
+        stacks = self.profiler.stacks()
+        self.assertEqual(list(stacks), ['health.glucose_records'])
+        (stack, count), = stacks['health.glucose_records'].items()
+        self.assertEqual(count, 2)
+        self.assertIn(f'{__name__}:outer;{__name__}:inner', stack)
+        self.assertEqual(self.profiler.samples_taken, 2)
+
+    def test_request_hooks_register_endpoint(self):
+        """Test an enabled profiler samples requests under their endpoint and forgets them afterwards."""
+        self.app.config['PROFILER_ENABLED'] = True
+        self.app.config['PROFILER_INTERVAL_MS'] = 60000
+        self.profiler.init_app(self.app)
+
+        @self.app.route('/_profiled')
+        def profiled():
+            self.profiler.sample()
+            return 'ok'
+
+        self.client.get('/_profiled')
+
+        self.assertIn('profiled', self.profiler.stacks())
+        self.assertEqual(self.profiler._active, {})
+        self.assertTrue(self.profiler._thread.is_alive())
+
+    def test_disabled_by_default(self):
+        """Test requests are not tracked and no thread is started unless enabled."""
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.test_user.id)
+        self.client.get('/medications/daily')
+
+        self.assertFalse(sampling_profiler.enabled)
+        self.assertEqual(sampling_profiler._active, {})
+        self.assertIsNone(sampling_profiler._thread)
+
+    def test_dump_writes_folded_files(self):
+        """Test a dump writes one collapsed-stack file per endpoint and starts a new window."""
+        self.profiler._active[threading.get_ident()] = 'report.export_csv'
+        for _ in range(3):
+            self.profiler.sample()
+        self.profiler._active[threading.get_ident()] = 'unmatched'
+        self.profiler.sample()
+
+        paths = self.profiler.dump()
+
+        self.assertEqual([os.path.basename(path) for path in paths], ['report.export_csv.folded', 'unmatched.folded'])
+        with open(paths[0]) as f:
+            stack, count = f.read().strip().rsplit(' ', 1)
+        self.assertEqual(count, '3')
+        self.assertTrue(stack.endswith(f'{__name__}:test_dump_writes_folded_files;'
+                                       'app.services.profiler_service:sample'))
+        self.assertEqual(self.profiler.stacks(), {})
+        self.assertEqual(self.profiler.dump(), [])
+
+    def test_run_dumps_on_request(self):
+        """Test the sampler thread writes the stacks once a dump is requested."""
+        self.profiler.interval = 0.001
+        self.profiler._active[threading.get_ident()] = 'pages.home'
+        stop = threading.Event()
+        original_dump = self.profiler.dump
+
+        def dump_and_stop():
+            paths = original_dump()
+            stop.set()
+            return paths
+
+        self.profiler.dump = dump_and_stop
+        self.profiler.request_dump()
+        self.profiler.run(stop)
+
+        self.assertEqual(len(os.listdir(self.output_dir)), 1)
@@ -0,0 +1,130 @@
+# tests/unit/services/test_query_stats_service.py
+import json
+from datetime import time
+from app.extensions import db
+from app.models import CompanionAccess
+from app.services.query_stats_service import QueryStats, query_monitor
+from tests.base import BaseTestCase
+
+
+class TestQueryMonitor(BaseTestCase):
+    """Tests for the per-request SQL counter and the query-count helpers."""
+    def setUp(self):
+        super().setUp()
+        self.user_id = self.test_user.id
+
+    def login(self, user_id):
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+
+    def warm(self, url):
+        # The identity and badge caches fill on the first request; measure the ones after
+        self.assertEqual(self.client.get(url).status_code, 200)
+        db.session.remove()
+
+    def link(self, patient_id, companion_id, level='VIEW'):
+        db.session.add(CompanionAccess(patient_id=patient_id, companion_id=companion_id, medication_access=level,
+                                       glucose_access=level, blood_pressure_access=level))
+        db.session.commit()
+
+    def test_repeated_statements(self):
+        """Test statements are grouped and only those past the threshold are reported."""
+        stats = QueryStats()
+        for statement in ('SELECT a', 'SELECT b', 'SELECT a', 'SELECT a', 'SELECT b'):
+            stats.record(statement, 0.001)
+
+        self.assertEqual(stats.count, 5)
+        self.assertAlmostEqual(stats.duration_ms, 5.0)
+        self.assertEqual(stats.repeated(3), [('SELECT a', 3)])
+        self.assertEqual(stats.repeated(), [('SELECT a', 3), ('SELECT b', 2)])
+
+    def test_headers_report_request_queries(self):
+        """Test the response headers carry the statements the request issued."""
+        query_monitor.headers = True
+        self.login(self.user_id)
+
+        response = self.client.get('/medications/daily')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response.headers['X-Query-Count']), 0)
+        self.assertEqual(response.headers['X-Query-Repeated'], '0')
+        self.assertIn('db;desc=', response.headers['Server-Timing'])
+        self.assertGreaterEqual(float(response.headers['X-Query-Time-Ms']), 0)
+
+    def test_no_headers_by_default(self):
+        """Test the headers stay off outside debug."""
+        self.login(self.user_id)
+        response = self.client.get('/medications/daily')
+        self.assertNotIn('X-Query-Count', response.headers)
+
+    def test_log_line_warns_on_repeats(self):
+        """Test each request is logged as JSON, at WARNING once a statement repeats."""
+        query_monitor.log = True
+        query_monitor.repeat_threshold = 2
+
+        @self.app.route('/_repeats')
+        def repeats():
+            for _ in range(3):
+                db.session.execute(db.select(CompanionAccess).where(CompanionAccess.patient_id == 1)).all()
+            return 'ok'
+
+        with self.assertLogs(query_monitor.logger, level='INFO') as logs:
+            self.client.get('/_repeats')
+
+        self.assertEqual(logs.records[-1].levelname, 'WARNING')
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((line['event'], line['path'], line['status']), ('request_sql', '/_repeats', 200))
+        self.assertEqual(line['queries'], 3)
+        self.assertEqual(line['repeated'][0]['count'], 3)
+
+    def test_assert_max_queries_lists_repeats(self):
+        """Test the helper fails past the limit and names the repeated statement."""
+        with self.assertRaises(AssertionError) as raised:
+            with self.assertMaxQueries(1):
+                for _ in range(2):
+                    db.session.execute(db.select(CompanionAccess)).all()
+        self.assertIn('2 queries, expected at most 1', str(raised.exception))
+        self.assertIn('2x SELECT', str(raised.exception))
+
+    def test_connections_page_query_count_is_constant(self):
+        """Test a patient's connections page costs the same however many companions are linked."""
+        companion_ids = [self.create_test_user(f'companion{i}@test.com', 'COMPANION').id for i in range(4)]
+        self.link(self.user_id, companion_ids[0])
+        self.link(self.user_id, companion_ids[1], level='NONE')
+        self.login(self.user_id)
+        self.warm('/connections')
+        with self.assertMaxQueries(20) as few:
+            self.assertEqual(self.client.get('/connections').status_code, 200)
+
+        self.link(self.user_id, companion_ids[2])
+        self.link(self.user_id, companion_ids[3], level='NONE')
+        response = self.assertRouteMaxQueries(few.count, '/connections')
+        self.assertIn(b'companion3', response.data)
+
+    def test_companion_patients_query_count_is_constant(self):
+        """Test a companion's patient list costs the same however many patients are linked."""
+        companion_id = self.create_test_user('companion@test.com', 'COMPANION').id
+        patient_ids = [self.create_test_user(f'patient{i}@test.com').id for i in range(4)]
+        self.link(patient_ids[0], companion_id)
+        self.link(patient_ids[1], companion_id, level='NONE')
+        self.login(companion_id)
+        self.warm('/companion/patients')
+        with self.assertMaxQueries(20) as few:
+            self.assertEqual(self.client.get('/companion/patients').status_code, 200)
+
+        self.link(patient_ids[2], companion_id)
+        self.link(patient_ids[3], companion_id, level='NONE')
+        response = self.assertRouteMaxQueries(few.count, '/companion/patients')
+        self.assertIn(b'patient3', response.data)
+
+    def test_daily_medications_query_count_is_constant(self):
+        """Test the daily schedule costs the same however many medications there are."""
+        self.login(self.user_id)
+        self.warm('/medications/daily')
+        response = self.assertRouteMaxQueries(2, '/medications/daily')
+        self.assertEqual(len(response.get_json()), 1)
+
+        for hour in range(10, 15):
+            self.create_test_medication(f'Med {hour}', time(hour, 0), self.user_id)
+        response = self.assertRouteMaxQueries(2, '/medications/daily')
+        self.assertEqual(len(response.get_json()), 6)
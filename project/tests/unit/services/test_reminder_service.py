@@ -0,0 +1,152 @@
+# tests/unit/services/test_reminder_service.py
+import threading
+from datetime import datetime, time
+from unittest.mock import patch
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import MedicationLog
+from app.services.event_service import LocalBackend, event_broker
+from app.services.medication_service import MedicationService
+from app.services.reminder_service import ReminderScheduler, ReminderWheel, ScheduledDose
+
+
+class FixedDatetime(datetime):
+    current = datetime(2024, 1, 1, 23, 55)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class TestReminderScheduler(BaseTestCase):
+    """Tests for the medication reminder time-wheel."""
+    def setUp(self):
+        super().setUp()
+        self.scheduler = ReminderScheduler(lead_minutes=15)
+        self.medication_service = MedicationService(db)
+
+    def sweep_ids(self, now):
+        reminders = self.scheduler.sweep(db, now)
+        return {user_id: [r['id'] for r in user_reminders] for user_id, user_reminders in reminders.items()}
+
+    def test_wheel_window_crosses_midnight(self):
+        """Test doses just after midnight are found with tomorrow's date."""
+        wheel = ReminderWheel()
+        wheel.load([
+            ScheduledDose(1, 1, 'Night', '5mg', time(23, 58)),
+            ScheduledDose(2, 1, 'Early', '5mg', time(0, 5)),
+            ScheduledDose(3, 1, 'Noon', '5mg', time(12, 0)),
+        ])
+
+        due = wheel.doses_between(datetime(2024, 1, 1, 23, 55), datetime(2024, 1, 2, 0, 10))
+
+        self.assertEqual(
+            [(dose.medication_id, dose_at) for dose, dose_at in due],
+            [(1, datetime(2024, 1, 1, 23, 58)), (2, datetime(2024, 1, 2, 0, 5))]
+        )
+
+    def test_each_dose_is_reminded_once(self):
+        """Test consecutive sweeps remind a dose only when it enters the lead window."""
+        other = self.create_test_user('other@test.com')
+        other_med = self.create_test_medication('Other Med', time(9, 10), other.id)
+
+        self.assertEqual(self.sweep_ids(datetime(2024, 1, 1, 8, 44)), {})
+        self.assertEqual(self.sweep_ids(datetime(2024, 1, 1, 8, 45)), {self.test_user.id: [self.test_medication.id]})
+        self.assertEqual(self.sweep_ids(datetime(2024, 1, 1, 8, 46)), {})
+        # After missed sweeps, doses still ahead are caught up without repeats
+        self.assertEqual(self.sweep_ids(datetime(2024, 1, 1, 8, 58)), {other.id: [other_med.id]})
+
+    def test_taken_doses_are_skipped_per_day(self):
+        """Test a dose logged on its own day is skipped, but not the next day's."""
+        early = self.create_test_medication('Early Med', time(0, 5))
+        db.session.add(MedicationLog(medication_id=early.id, user_id=self.test_user.id,
+                                     taken_at=datetime(2024, 1, 1, 0, 6)))
+        db.session.commit()
+
+        self.assertEqual(self.sweep_ids(datetime(2024, 1, 1, 23, 55)), {self.test_user.id: [early.id]})
+
+        db.session.add(MedicationLog(medication_id=self.test_medication.id, user_id=self.test_user.id,
+                                     taken_at=datetime(2024, 1, 2, 8, 30)))
+        db.session.commit()
+        self.assertEqual(self.sweep_ids(datetime(2024, 1, 2, 8, 45)), {})
+
+    def test_medication_changes_update_wheel(self):
+        """Test adding, moving and deleting medications updates a loaded wheel."""
+        self.scheduler.reload(db, datetime(2024, 1, 1, 8, 0))
+        with patch('app.services.medication_service.reminder_scheduler', self.scheduler):
+            self.medication_service.add_medication(self.test_user.id, 'New Med', '1mg', 'once_daily', time(20, 0))
+            self.medication_service.update_medication(self.test_medication.id, 'Test Med', '100mg', 'once_daily', time(21, 0))
+            self.assertEqual(len(self.scheduler.wheel), 2)
+            self.assertEqual(
+                [dose.name for dose, _ in self.scheduler.wheel.doses_between(datetime(2024, 1, 1, 19, 0), datetime(2024, 1, 1, 22, 0))],
+                ['New Med', 'Test Med']
+            )
+
+            self.medication_service.delete_medication(self.test_medication.id, self.test_user.id)
+            self.assertEqual(len(self.scheduler.wheel), 1)
+
+    def test_publish_due_pushes_to_event_streams(self):
+        """Test swept reminders reach the user's open streams."""
+        subscription = event_broker.subscribe(self.test_user.id)
+        self.addCleanup(event_broker.unsubscribe, subscription)
+
+        self.assertEqual(self.scheduler.publish_due(db, datetime(2024, 1, 1, 8, 45)), 1)
+
+        event = subscription.get(0)
+        self.assertEqual(event.name, 'reminder')
+        self.assertEqual(event.data['id'], self.test_medication.id)
+        self.assertEqual(event.data['due_at'], '2024-01-01T09:00')
+
+    def test_sweeps_in_process_unless_backend_crosses_processes(self):
+        """Test the web process sweeps itself when its events cannot come from a scheduler process."""
+        class SharedBackend(LocalBackend):
+            cross_process = True
+
+        self.app.config['REMINDER_SCHEDULER_IN_PROCESS'] = None
+        self.scheduler.init_app(self.app)
+        self.assertTrue(self.scheduler.in_process)
+
+        event_broker.set_backend(SharedBackend())
+        self.addCleanup(event_broker.set_backend, LocalBackend())
+        self.scheduler.init_app(self.app)
+        self.assertFalse(self.scheduler.in_process)
+
+        self.app.config['REMINDER_SCHEDULER_IN_PROCESS'] = True
+        self.scheduler.init_app(self.app)
+        self.assertTrue(self.scheduler.in_process)
+
+    def test_concurrent_starts_run_one_sweep(self):
+        """Test streams opening together start a single sweep thread."""
+        self.scheduler.init_app(self.app)
+        self.addCleanup(self.scheduler.stop)
+        runs = []
+
+        def run(db, stop):
+            runs.append(threading.get_ident())
+            stop.wait(5)
+
+        self.scheduler.run = run
+        barrier = threading.Barrier(8)
+
+        def start():
+            barrier.wait()
+            self.scheduler.ensure_running(db)
+
+        starters = [threading.Thread(target=start) for _ in range(8)]
+        for starter in starters:
+            starter.start()
+        for starter in starters:
+            starter.join()
+        self.scheduler._thread.join(0.2)
+
+        self.assertEqual(len(runs), 1)
+
+    @patch('app.services.medication_service.datetime', FixedDatetime)
+    def test_upcoming_reminders_cross_midnight(self):
+        """Test a patient's upcoming reminders include doses just after midnight."""
+        early = self.create_test_medication('Early Med', time(0, 5))
+
+        success, reminders, error = self.medication_service.get_upcoming_reminders(self.test_user.id, minutes_ahead=15)
+
+        self.assertTrue(success)
+        self.assertEqual([r['id'] for r in reminders], [early.id])
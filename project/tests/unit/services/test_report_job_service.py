@@ -0,0 +1,78 @@
+# tests/unit/services/test_report_job_service.py
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.services.report_job_service import ReportJobService
+
+
+class TestReportJobService(BaseTestCase):
+    """Tests for background PDF report jobs."""
+    def setUp(self):
+        super().setUp()
+        self.job_dir = tempfile.mkdtemp()
+        # max_workers=0 renders inline so results are available immediately
+        self.job_service = ReportJobService(db, self.app, job_dir=self.job_dir, ttl_seconds=60, max_workers=0)
+        self.other_user = self.create_test_user('other@test.com')
+
+    def tearDown(self):
+        shutil.rmtree(self.job_dir, ignore_errors=True)
+        super().tearDown()
+
+    def test_submit_renders_pdf_artifact(self):
+        """Test a submitted job finishes and exposes its PDF to the owner only."""
+        success, job_id, error = self.job_service.submit(self.test_user.id)
+        self.assertTrue(success)
+        self.assertIsNone(error)
+
+        success, job, error = self.job_service.get_job(job_id, self.test_user.id)
+        self.assertTrue(success)
+        self.assertEqual(job['status'], 'done')
+
+        success, path, error = self.job_service.get_artifact_path(job_id, self.test_user.id)
+        self.assertTrue(success)
+        with open(path, 'rb') as f:
+            self.assertTrue(f.read().startswith(b'%PDF'))
+
+        success, job, error = self.job_service.get_job(job_id, self.other_user.id)
+        self.assertFalse(success)
+        self.assertEqual(error, 'Report job not found.')
+
+    def test_failed_render_is_reported(self):
+        """Test rendering errors are stored on the job."""
+        with patch('app.services.report_job_service.ReportService.generate_pdf_report',
+                   side_effect=Exception('reportlab exploded')):
+            success, job_id, error = self.job_service.submit(self.test_user.id)
+
+        success, job, error = self.job_service.get_job(job_id, self.test_user.id)
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], 'reportlab exploded')
+
+        success, path, error = self.job_service.get_artifact_path(job_id, self.test_user.id)
+        self.assertFalse(success)
+        self.assertEqual(error, 'Report generation failed: reportlab exploded')
+
+    def test_render_skips_removed_job(self):
+        """Test a job cleaned up before its worker starts is dropped without rendering."""
+        with patch('app.services.report_job_service.ReportService') as report_service:
+            self.job_service._render('0' * 32, self.test_user.id)
+
+        report_service.assert_not_called()
+        self.assertEqual(os.listdir(self.job_dir), [])
+
+    def test_cleanup_expired_removes_artifacts(self):
+        """Test jobs past their TTL are deleted from disk."""
+        success, job_id, error = self.job_service.submit(self.test_user.id)
+        self.assertEqual(self.job_service.cleanup_expired(), 0)
+
+        removed = self.job_service.cleanup_expired(now=datetime.utcnow() + timedelta(seconds=120))
+        self.assertEqual(removed, 1)
+        self.assertEqual(os.listdir(self.job_dir), [])
+
+    def test_rejects_malformed_job_ids(self):
+        """Test job ids that could escape the job directory are rejected."""
+        success, job, error = self.job_service.get_job('../../etc/passwd', self.test_user.id)
+        self.assertFalse(success)
@@ -1,7 +1,8 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from app.services.report_service import ReportService
-from app.models import GlucoseRecord, BloodPressureRecord
+from app.models import GlucoseRecord, BloodPressureRecord, GlucoseType
+from app.extensions import db
 import io
 import csv
 from datetime import datetime
@@ -200,5 +201,33 @@ class TestReportService(BaseTestCase):
         self.assertIn("Health Report", first_page_text)
         self.assertIn("Summary:", last_page_text)
 
+    def test_stream_csv_report_matches_buffered_report(self):
+        """Test the streamed CSV is identical to the buffered report and arrives in batches."""
+        for day in range(1, 6):
+            db.session.add(GlucoseRecord(
+                user_id=self.user_id, glucose_level=100 + day, glucose_type=GlucoseType.FASTING,
+                date=f'2024-01-0{day}', time='08:00'
+            ))
+        db.session.add(BloodPressureRecord(
+            user_id=self.user_id, systolic=120, diastolic=80, date='2024-01-01', time='08:00'
+        ))
+        db.session.commit()
+
+        report_service = ReportService(db, self.user_id)
+        chunks = list(report_service.stream_csv_report(batch_size=2))
+        buffered = report_service.generate_csv_report().getvalue()
+
+        self.assertEqual(b''.join(chunks), buffered)
+        # One chunk per batch: three glucose batches and one blood pressure batch
+        self.assertEqual(len(chunks), 4)
+        self.assertIn(b'2024-01-05,08:00,105', chunks[0])
+
+    def test_stream_csv_report_no_records(self):
+        """Test the streamed CSV reports empty sections like the buffered report."""
+        report_service = ReportService(db, self.user_id)
+        streamed = b''.join(report_service.stream_csv_report())
+        self.assertEqual(streamed, report_service.generate_csv_report().getvalue())
+        self.assertIn(b'No glucose records found.', streamed)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
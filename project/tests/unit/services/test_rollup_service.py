@@ -0,0 +1,164 @@
+# tests/unit/services/test_rollup_service.py
+from datetime import date
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import GlucoseRecord, GlucoseType, GlucoseDailyRollup, BloodPressureDailyRollup
+from app.services.health_service import HealthService
+from app.services.import_service import ImportService
+
+
+class TestRollupService(BaseTestCase):
+    """Tests for the daily glucose and blood pressure rollups."""
+    def setUp(self):
+        super().setUp()
+        self.health_service = HealthService(db)
+        self.rollup_service = self.health_service.rollup_service
+
+    def add_glucose(self, level, glucose_type='FASTING', day='2024-01-01', time='08:00'):
+        success, record, error, _ = self.health_service.add_glucose_record(
+            self.test_user.id, level, glucose_type, day, time
+        )
+        self.assertTrue(success, error)
+        return record
+
+    def glucose_rollups(self):
+        success, rollups, error = self.rollup_service.get_rollups('glucose', self.test_user.id)
+        self.assertTrue(success)
+        return rollups
+
+    def test_add_maintains_glucose_rollup(self):
+        """Test adding readings updates counts, extremes and time-in-range buckets."""
+        self.add_glucose(50, time='07:00')
+        self.add_glucose(100, time='08:00')
+        self.add_glucose(260, time='09:00')
+        self.add_glucose(150, glucose_type='POSTPRANDIAL', time='13:00')
+
+        fasting, postprandial = sorted(self.glucose_rollups(), key=lambda r: r.glucose_type.value)
+        self.assertEqual(fasting.day, date(2024, 1, 1))
+        self.assertEqual(fasting.reading_count, 3)
+        self.assertEqual((fasting.min_level, fasting.max_level), (50, 260))
+        self.assertAlmostEqual(fasting.mean_level, 410 / 3)
+        self.assertEqual(
+            (fasting.very_low_count, fasting.low_count, fasting.in_range_count,
+             fasting.high_count, fasting.very_high_count),
+            (1, 0, 1, 0, 1)
+        )
+        self.assertEqual(postprandial.glucose_type, GlucoseType.POSTPRANDIAL)
+        self.assertEqual(postprandial.reading_count, 1)
+
+    def test_update_and_delete_refresh_affected_days(self):
+        """Test moving a reading refreshes both days and deleting the last one drops the row."""
+        record = self.add_glucose(100, day='2024-01-01')
+        self.add_glucose(120, day='2024-01-01', time='09:00')
+
+        success, error, _ = self.health_service.update_glucose_record(
+            record.id, self.test_user.id, 140, GlucoseType.FASTING, '2024-01-02', '08:00'
+        )
+        self.assertTrue(success, error)
+        rollups = {r.day: r for r in self.glucose_rollups()}
+        self.assertEqual(rollups[date(2024, 1, 1)].sum_level, 120)
+        self.assertEqual(rollups[date(2024, 1, 2)].sum_level, 140)
+
+        success, error = self.health_service.delete_glucose_record(record.id, self.test_user.id)
+        self.assertTrue(success, error)
+        self.assertEqual([r.day for r in self.glucose_rollups()], [date(2024, 1, 1)])
+
+    def test_blood_pressure_rollup_and_import(self):
+        """Test single adds and bulk imports both maintain blood pressure rollups."""
+        self.health_service.add_blood_pressure_record(self.test_user.id, 120, 80, '2024-01-01', '08:00')
+        import_service = ImportService(db, self.health_service, batch_size=1)
+        success, summary, error = import_service.import_readings(self.test_user.id, 'blood_pressure', [
+            {'date': '2024-01-01', 'time': '20:00', 'systolic': 140, 'diastolic': 90},
+            {'date': '2024-01-02', 'time': '08:00', 'systolic': 110, 'diastolic': 70},
+        ])
+        self.assertTrue(success, error)
+
+        success, rollups, error = self.rollup_service.get_rollups(
+            'blood_pressure', self.test_user.id, start=date(2024, 1, 1), end=date(2024, 1, 1)
+        )
+        self.assertEqual(len(rollups), 1)
+        self.assertEqual(rollups[0].reading_count, 2)
+        self.assertEqual((rollups[0].min_systolic, rollups[0].max_systolic), (120, 140))
+        self.assertEqual(rollups[0].mean_diastolic, 85)
+        self.assertEqual(BloodPressureDailyRollup.query.count(), 2)
+
+    def test_rebuild_from_raw_readings(self):
+        """Test rebuild recreates rollups for readings written without the service."""
+        db.session.add_all([
+            GlucoseRecord(user_id=self.test_user.id, glucose_level=90, glucose_type=GlucoseType.FASTING,
+                          date='2024-02-01', time='08:00'),
+            GlucoseRecord(user_id=self.test_user.id, glucose_level=110, glucose_type=GlucoseType.FASTING,
+                          date='2024-02-01', time='09:00'),
+        ])
+        db.session.commit()
+        self.assertEqual(GlucoseDailyRollup.query.count(), 0)
+
+        success, counts, error = self.rollup_service.rebuild()
+
+        self.assertTrue(success, error)
+        self.assertEqual(counts, {'glucose': 1, 'blood_pressure': 0})
+        rollup = GlucoseDailyRollup.query.one()
+        self.assertEqual((rollup.reading_count, rollup.mean_level, rollup.in_range_count), (2, 100, 2))
+
+    def rollup_snapshot(self, kind):
+        success, rollups, error = self.rollup_service.get_rollups(kind, self.test_user.id)
+        columns = [c.name for c in rollups[0].__table__.columns if c.name != 'id'] if rollups else []
+        return sorted((tuple(getattr(r, c) for c in columns) for r in rollups), key=repr)
+
+    def test_added_deltas_match_rebuild(self):
+        """Test rollups folded in reading by reading and batch by batch equal a recompute from raw readings."""
+        self.add_glucose(100, time='07:00')
+        self.add_glucose(52, time='08:00')
+        self.add_glucose(190, glucose_type='POSTPRANDIAL', time='13:00')
+        import_service = ImportService(db, self.health_service, batch_size=2)
+        success, summary, error = import_service.import_readings(self.test_user.id, 'glucose', [
+            {'date': '2024-01-01', 'time': '09:00', 'glucose_level': 300, 'glucose_type': 'FASTING'},
+            {'date': '2024-01-01', 'time': '10:00', 'glucose_level': 60, 'glucose_type': 'FASTING'},
+            {'date': '2024-01-02', 'time': '08:00', 'glucose_level': 120, 'glucose_type': 'FASTING'},
+        ])
+        self.assertTrue(success, error)
+        self.health_service.add_blood_pressure_record(self.test_user.id, 150, 95, '2024-01-01', '08:00')
+        self.health_service.add_blood_pressure_record(self.test_user.id, 110, 70, '2024-01-01', '09:00')
+
+        maintained = {kind: self.rollup_snapshot(kind) for kind in ('glucose', 'blood_pressure')}
+        success, counts, error = self.rollup_service.rebuild(self.test_user.id)
+        self.assertTrue(success, error)
+
+        self.assertEqual({kind: self.rollup_snapshot(kind) for kind in maintained}, maintained)
+        fasting = next(r for r in self.glucose_rollups() if r.day == date(2024, 1, 1)
+                       and r.glucose_type == GlucoseType.FASTING)
+        self.assertEqual((fasting.reading_count, fasting.min_level, fasting.max_level), (4, 52, 300))
+
+    def test_summary_totals_rollups_in_range(self):
+        """Test the summary combines every rollup row in the range, and is empty without readings."""
+        self.add_glucose(50, time='07:00')
+        self.add_glucose(150, glucose_type='POSTPRANDIAL', time='13:00')
+        self.add_glucose(100, day='2024-01-02')
+        self.add_glucose(300, day='2024-01-05')
+
+        success, summary, error = self.rollup_service.get_summary(
+            'glucose', self.test_user.id, start=date(2024, 1, 1), end=date(2024, 1, 2)
+        )
+
+        self.assertTrue(success, error)
+        self.assertEqual((summary['readings'], summary['mean'], summary['min'], summary['max']), (3, 100, 50, 150))
+        self.assertAlmostEqual(summary['time_in_range']['in_range'], 200 / 3)
+        self.assertAlmostEqual(summary['time_below_range'], 100 / 3)
+        success, summary, error = self.rollup_service.get_summary('blood_pressure', self.test_user.id)
+        self.assertEqual(summary, {'readings': 0})
+
+    def test_insights_summary_route(self):
+        """Test the insights page's summary endpoint reads the logged-in user's rollups."""
+        self.add_glucose(100)
+        self.health_service.add_blood_pressure_record(self.test_user.id, 120, 80, '2024-01-01', '08:00')
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.test_user.id)
+
+        data = self.client.get('/health/insights/summary?start=2024-01-01&end=2024-01-01').get_json()
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['glucose']['readings'], 1)
+        self.assertEqual(data['blood_pressure']['mean_systolic'], 120)
+        self.assertEqual(self.client.get('/health/insights/summary?start=2024-01-02').get_json()['glucose'],
+                         {'readings': 0})
+        self.assertEqual(self.client.get('/health/insights/summary?end=01/02/2024').status_code, 400)
@@ -0,0 +1,105 @@
+# tests/unit/services/test_seed_service.py
+from datetime import datetime
+from sqlalchemy import func, select
+from tests.base import BaseTestCase
+from app.extensions import db
+from app.models import (
+    User, CompanionAccess, Medication, MedicationLog, Notification, GlucoseRecord, BloodPressureRecord,
+    GlucoseDailyRollup
+)
+from app.services.auth_service import AuthService
+from app.services.password_service import PasswordHasher
+from app.services.rollup_service import RollupService
+from app.services.seed_service import SeedService
+
+END = datetime(2024, 3, 10, 18, 0)
+
+
+class TestSeedService(BaseTestCase):
+    """Tests for bulk synthetic data generation."""
+    def setUp(self):
+        super().setUp()
+        self.hasher = PasswordHasher(method='pbkdf2:sha256:1000', max_workers=0)
+        self.service = SeedService(db, RollupService(db), batch_size=50, hasher=self.hasher)
+
+    def seed(self, service=None):
+        return (service or self.service).seed(
+            patients=4, companions=2, days=3, readings_per_day=5, medications=2,
+            links_per_companion=2, notifications_per_companion=3, end=END
+        )
+
+    def count(self, model, *conditions):
+        return db.session.scalar(select(func.count()).select_from(model).where(*conditions))
+
+    def test_seed_counts(self):
+        """Test every table gets the requested population, in batches."""
+        existing_users = self.count(User)
+        success, counts, error = self.seed()
+
+        self.assertTrue(success, error)
+        self.assertEqual(counts['users'], 6)
+        self.assertEqual(self.count(User), existing_users + 6)
+        self.assertEqual(counts['companion_access'], 4)
+        self.assertEqual(counts['medications'], 8)
+        # The last day stops at END (18:00), so some of its readings are never generated
+        self.assertLessEqual(counts['glucose_records'], 4 * 3 * 5)
+        self.assertGreater(counts['glucose_records'], 4 * 2 * 5)
+        self.assertEqual(self.count(GlucoseRecord), counts['glucose_records'])
+        self.assertEqual(self.count(BloodPressureRecord), counts['blood_pressure_records'])
+        self.assertEqual(self.count(MedicationLog), counts['medication_logs'])
+        self.assertEqual(self.count(Notification), 6)
+        self.assertEqual(self.count(GlucoseDailyRollup), counts['glucose_daily_rollups'])
+        self.assertGreater(counts['glucose_daily_rollups'], 0)
+
+    def test_seeded_readings_are_consistent(self):
+        """Test readings have unique timestamps matching their date/time strings."""
+        self.seed()
+        rows = db.session.execute(select(
+            GlucoseRecord.user_id, GlucoseRecord.date, GlucoseRecord.time, GlucoseRecord.recorded_at
+        )).all()
+
+        self.assertEqual(len({(user_id, recorded_at) for user_id, _, _, recorded_at in rows}), len(rows))
+        for _, date, time, recorded_at in rows:
+            self.assertEqual(recorded_at.strftime('%Y-%m-%d %H:%M'), f'{date} {time}')
+            self.assertLessEqual(recorded_at, END)
+        self.assertFalse(db.session.scalar(select(func.count()).where(
+            MedicationLog.user_id.not_in(select(Medication.user_id))
+        )))
+
+    def test_seed_is_deterministic(self):
+        """Test the same seed produces the same readings and links."""
+        self.seed()
+        first_users = db.session.scalars(select(User.id).where(User.email.like('%@seed.example.com'))).all()
+        self.seed(SeedService(db, RollupService(db), batch_size=7, hasher=self.hasher))
+        second_users = db.session.scalars(
+            select(User.id).where(User.email.like('%@seed.example.com'), User.id.not_in(first_users))
+        ).all()
+
+        def readings(user_ids):
+            return db.session.execute(
+                select(GlucoseRecord.glucose_level, GlucoseRecord.recorded_at)
+                .where(GlucoseRecord.user_id.in_(user_ids)).order_by(GlucoseRecord.id)
+            ).all()
+
+        def links(user_ids):
+            offset = min(user_ids)
+            return sorted((patient_id - offset, companion_id - offset) for patient_id, companion_id in db.session.execute(
+                select(CompanionAccess.patient_id, CompanionAccess.companion_id)
+                .where(CompanionAccess.companion_id.in_(user_ids))
+            ))
+
+        self.assertEqual(len(second_users), 6)
+        self.assertEqual(readings(first_users), readings(second_users))
+        self.assertEqual(links(first_users), links(second_users))
+
+    def test_seeded_accounts_can_log_in(self):
+        """Test seeded accounts share a pre-hashed password made with the configured method."""
+        self.seed()
+        patient = db.session.scalars(select(User).where(User.email.like('patient%@seed.example.com'))).first()
+
+        success, user, redirect_url, error = AuthService(db, self.hasher).authenticate_user(
+            email=patient.email, password='password123', user_type='PATIENT'
+        )
+
+        self.assertTrue(success, error)
+        self.assertFalse(self.hasher.needs_rehash(user.password_hash))